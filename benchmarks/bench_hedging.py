@@ -0,0 +1,115 @@
+"""
+Tail latency of the word evaluator with and without hedged model calls.
+
+Runs ``WordUsageHandler`` against ``fake_openai_server`` with an injected
+latency distribution, once without hedging and once with the given policy,
+and reports p50/p95/p99 latency and the extra requests hedging cost.
+
+Usage:
+    python benchmarks/bench_hedging.py [--latency bimodal:40:1500:0.05] [--requests 200]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "handlers"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from openai import AsyncOpenAI  # noqa: E402
+
+import base_handler  # noqa: E402
+from base_handler import HedgingPolicy  # noqa: E402
+from fake_openai_server import FakeOpenAIServer  # noqa: E402
+from metrics import NullMetricsSink  # noqa: E402
+from result_cache import ResultCache  # noqa: E402
+from word_evaluator import WordUsageHandler  # noqa: E402
+
+
+class FakeSSMClient:
+    def get_parameters(self, Names, WithDecryption):
+        parameters = [{"Name": name, "Value": "sk-benchmark"} for name in Names]
+        return {"Parameters": parameters}
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run(server: FakeOpenAIServer, policy, requests: int, concurrency: int) -> dict:
+    WordUsageHandler.HEDGING = policy
+    base_handler.reset_registry(
+        FakeSSMClient,
+        result_cache_factory=lambda: ResultCache(max_entries=0),
+        async_openai_client_factory=lambda api_key: AsyncOpenAI(
+            api_key=api_key, base_url=server.base_url, max_retries=0
+        ),
+        metrics_sink_factory=NullMetricsSink,
+    )
+    handler = base_handler.get_handler(WordUsageHandler)
+    sent_before = server.requests
+
+    async def one(index: int, semaphore: asyncio.Semaphore) -> float:
+        event = {
+            "httpMethod": "POST",
+            "headers": {},
+            "body": json.dumps({"word": "run", "sentence": f"I run {index} miles."}),
+        }
+        async with semaphore:
+            start = time.perf_counter()
+            response = await handler.handle_async(event, None)
+            assert response["statusCode"] == 200, response
+            return (time.perf_counter() - start) * 1000
+
+    async def run_all() -> list:
+        semaphore = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(one(i, semaphore) for i in range(requests)))
+
+    latencies = base_handler.registry.run(run_all())
+    sent = server.requests - sent_before
+    result = {
+        "p50_ms": round(percentile(latencies, 0.50), 1),
+        "p95_ms": round(percentile(latencies, 0.95), 1),
+        "p99_ms": round(percentile(latencies, 0.99), 1),
+        "mean_ms": round(statistics.mean(latencies), 1),
+        "model_requests": sent,
+        "extra_spend": round(sent / requests - 1, 4),
+    }
+    if handler.hedger is not None:
+        result["hedger"] = handler.hedger.as_dict()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", default="bimodal:40:1500:0.05")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--percentile", type=float, default=0.9)
+    parser.add_argument("--min-delay-ms", type=float, default=100)
+    parser.add_argument("--max-extra-ratio", type=float, default=0.1)
+    args = parser.parse_args()
+
+    policy = HedgingPolicy(
+        percentile=args.percentile,
+        initial_delay_seconds=1.0,
+        min_delay_seconds=args.min_delay_ms / 1000,
+        max_extra_ratio=args.max_extra_ratio,
+    )
+    with FakeOpenAIServer(args.latency, seed=1) as server:
+        results = {
+            "latency": args.latency,
+            "unhedged": run(server, None, args.requests, args.concurrency),
+            "hedged": run(server, policy, args.requests, args.concurrency),
+        }
+    base_handler.reset_registry()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
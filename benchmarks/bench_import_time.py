@@ -0,0 +1,136 @@
+"""
+Import-time budget for the Lambda handler modules.
+
+Imports each handler in a fresh interpreter under ``python -X importtime`` and
+reports the cumulative import cost (median of ``--runs``) plus its heaviest
+dependencies. A second fresh interpreter answers an OPTIONS preflight and an
+invalid POST and checks that none of the heavy client libraries were loaded.
+
+Exits with status 1 when a handler goes over ``--budget-ms`` or a cheap path
+loads a heavy library, so it can run as a CI gate.
+
+Usage:
+    python benchmarks/bench_import_time.py [--budget-ms 150] [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+HANDLERS_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "handlers"
+)
+
+HANDLER_MODULES = [
+    "word_evaluator",
+    "verb_tense_evaluator",
+    "writing_evaluator",
+    "reading_generator",
+]
+
+# Libraries that must only load once a request actually needs them
+HEAVY_MODULES = ["openai", "httpx", "boto3", "botocore", "sqlite3"]
+
+# Invokes the cheap paths and prints the heavy modules they loaded
+LAZY_CHECK = """
+import json, sys
+import {module} as handler
+handler.lambda_handler({{"httpMethod": "OPTIONS", "headers": {{}}}}, None)
+if {post_invalid}:
+    invalid = {{"httpMethod": "POST", "headers": {{}}, "body": "{{}}"}}
+    handler.lambda_handler(invalid, None)
+print(json.dumps([name for name in {heavy!r} if name in sys.modules]))
+"""
+
+
+def run_python(args: List[str]) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=HANDLERS_DIR)
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=HANDLERS_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """
+    Parses ``-X importtime`` output.
+
+    Returns:
+        (module, self_us, cumulative_us) for every import, in output order
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        imports.append((name.strip(), int(self_us), int(cumulative_us)))
+    return imports
+
+
+def measure(module: str, runs: int, top: int) -> Dict[str, object]:
+    totals = []
+    imports: List[Tuple[str, int, int]] = []
+    for _ in range(runs):
+        imports = parse_importtime(
+            run_python(["-X", "importtime", "-c", f"import {module}"]).stderr
+        )
+        totals.append(next(cum for name, _, cum in imports if name == module))
+    heaviest = sorted(imports, key=lambda entry: entry[2], reverse=True)[1 : top + 1]
+    return {
+        "import_ms": round(statistics.median(totals) / 1000, 1),
+        "heaviest": {name: round(cum / 1000, 1) for name, _, cum in heaviest},
+    }
+
+
+def loaded_on_cheap_paths(module: str) -> List[str]:
+    script = LAZY_CHECK.format(
+        module=module,
+        post_invalid=module != "reading_generator",
+        heavy=HEAVY_MODULES,
+    )
+    return json.loads(run_python(["-c", script]).stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=150)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    # Compile once so the measured runs do not include writing .pyc files
+    run_python(["-c", "; ".join(f"import {module}" for module in HANDLER_MODULES)])
+
+    results = {}
+    failures = []
+    for module in HANDLER_MODULES:
+        result = measure(module, args.runs, args.top)
+        result["heavy_loaded_on_cheap_paths"] = loaded_on_cheap_paths(module)
+        results[module] = result
+        if result["import_ms"] > args.budget_ms:
+            failures.append(
+                f"{module} imports in {result['import_ms']} ms "
+                f"(budget {args.budget_ms} ms)"
+            )
+        if result["heavy_loaded_on_cheap_paths"]:
+            failures.append(
+                f"{module} loads {', '.join(result['heavy_loaded_on_cheap_paths'])} "
+                "on OPTIONS or invalid requests"
+            )
+
+    print(json.dumps(results, indent=2))
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
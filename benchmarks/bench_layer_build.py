@@ -0,0 +1,107 @@
+"""
+Time of incremental dependency layer builds, offline.
+
+Builds a local wheelhouse of synthetic pure-Python packages (each requiring
+the next, so pip has a dependency graph to resolve), then runs
+``deploy.prepare_layer_directory`` against it with no network access:
+
+* cold: empty wheel cache and no layer, the old full-install path;
+* unchanged: same inputs, the layer is reused;
+* reordered: same requirements in another order, still reused;
+* added requirement: rebuilt, with only the new wheel fetched;
+* forced rebuild: reinstalled from the warm wheel cache.
+
+Usage:
+    python benchmarks/bench_layer_build.py [--packages 20] [--module-kb 64]
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import deploy  # noqa: E402
+
+
+def build_wheel(directory: str, name: str, requires: List[str], size: int) -> None:
+    """Writes a minimal ``py3-none-any`` wheel for package ``name``."""
+    dist_info = f"{name}-1.0.dist-info"
+    files = {
+        f"{name}/__init__.py": f"VALUE = {name!r}\n" + "# padding\n" * (size // 10),
+        f"{dist_info}/METADATA": "\n".join(
+            ["Metadata-Version: 2.1", f"Name: {name}", "Version: 1.0"]
+            + [f"Requires-Dist: {requirement}" for requirement in requires]
+        )
+        + "\n",
+        f"{dist_info}/WHEEL": (
+            "Wheel-Version: 1.0\nGenerator: bench\nRoot-Is-Purelib: true\n"
+            "Tag: py3-none-any\n"
+        ),
+    }
+    record = []
+    for path, content in files.items():
+        digest = hashlib.sha256(content.encode()).digest()
+        encoded = base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+        record.append(f"{path},sha256={encoded},{len(content.encode())}")
+    files[f"{dist_info}/RECORD"] = "\n".join(record + [f"{dist_info}/RECORD,,"]) + "\n"
+    with zipfile.ZipFile(
+        os.path.join(directory, f"{name}-1.0-py3-none-any.whl"), "w"
+    ) as wheel:
+        for path, content in files.items():
+            wheel.writestr(path, content)
+
+
+def timed(call) -> float:
+    started = time.perf_counter()
+    call()
+    return round(time.perf_counter() - started, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--packages", type=int, default=20)
+    parser.add_argument("--module-kb", type=int, default=64)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        wheelhouse = os.path.join(root, "wheelhouse")
+        os.makedirs(wheelhouse)
+        names = [f"benchpkg{index}" for index in range(args.packages + 1)]
+        for index, name in enumerate(names):
+            # Every package but the last requires its successor
+            requires = [names[index + 1]] if index < args.packages - 1 else []
+            build_wheel(wheelhouse, name, requires, args.module_kb * 1024)
+
+        deploy.WHEEL_CACHE = os.path.join(root, "cache")
+        layer_dir = os.path.join(root, "layer")
+        requirements = names[: args.packages // 2] + [names[args.packages - 1]]
+        extra = names[args.packages]
+
+        def build(reqs: List[str], force: bool = False) -> None:
+            deploy.prepare_layer_directory(
+                layer_dir, deploy.PYTHON_VERSION, reqs, wheelhouse, force=force
+            )
+
+        results: Dict[str, Any] = {
+            "packages": args.packages,
+            "cold_s": timed(lambda: build(requirements)),
+            "unchanged_s": timed(lambda: build(requirements)),
+            "reordered_s": timed(lambda: build(list(reversed(requirements)))),
+            "added_requirement_s": timed(lambda: build(requirements + [extra])),
+            "forced_rebuild_s": timed(lambda: build(requirements + [extra], True)),
+            "cached_wheels": len(os.listdir(deploy.WHEEL_CACHE)),
+            "stamp": deploy.read_layer_stamp(layer_dir)["inputs_hash"][:12],
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
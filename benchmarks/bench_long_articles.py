@@ -0,0 +1,213 @@
+"""
+Latency of summary evaluations as articles grow, with and without chunking.
+
+Runs ``SummaryEvaluationHandler`` against ``fake_openai_server``, whose latency
+grows with the prompt (``--prompt-ms-per-1k-tokens``, standing in for prefill
+time), on articles of increasing size built from the summary corpus. For each
+size it reports p50 latency, model calls and prompt tokens per evaluation in
+three modes:
+
+* single prompt: the whole article in the evaluation call, as before;
+* map-reduce: the article condensed in parallel chunks, then evaluated
+  against the notes, with no cache (every evaluation condenses again);
+* map-reduce, cached: notes cached by chunk, as for a class summarizing the
+  same long article.
+
+It also times the rejection of an article over the token limit (no model
+call) and its truncation with ``ARTICLE_OVERSIZE=truncate``, and, when
+tiktoken and its o200k encoding are available, how far
+``token_budget.estimate_tokens`` is from the real count.
+
+Usage:
+    python benchmarks/bench_long_articles.py [--sizes 1000,4000,8000,16000,30000]
+        [--requests 10] [--prompt-ms-per-1k-tokens 40]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+HANDLERS_DIR = os.path.join(BENCHMARKS_DIR, "..", "handlers")
+sys.path.insert(0, HANDLERS_DIR)
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from openai import AsyncOpenAI  # noqa: E402
+
+import base_handler  # noqa: E402
+from fake_openai_server import FakeOpenAIServer  # noqa: E402
+from metrics import InMemoryMetricsSink  # noqa: E402
+from result_cache import ResultCache  # noqa: E402
+from token_budget import estimate_tokens  # noqa: E402
+from writing_evaluator import SummaryEvaluationHandler  # noqa: E402
+
+CORPUS = os.path.join(BENCHMARKS_DIR, "data", "summary_corpus.json")
+MODES = {
+    "single_prompt": {"ARTICLE_CHUNK_ABOVE_TOKENS": str(10**9)},
+    "map_reduce": {},
+    "map_reduce_cached": {},
+}
+
+
+class FakeSSMClient:
+    def get_parameters(self, Names, WithDecryption):
+        parameters = [{"Name": name, "Value": "sk-benchmark"} for name in Names]
+        return {"Parameters": parameters}
+
+
+def corpus_texts() -> Dict[str, str]:
+    with open(CORPUS, encoding="utf-8") as f:
+        articles = json.load(f)
+    with open(os.path.join(HANDLERS_DIR, "base_handler.py"), encoding="utf-8") as f:
+        code = f.read()[:20000]
+    return {
+        "articles": "\n\n".join(article["article"] for article in articles),
+        "summaries": "\n\n".join(
+            summary["summary"]
+            for article in articles
+            for summary in article["summaries"]
+        ),
+        "code": code,
+    }
+
+
+def estimator_accuracy() -> Dict[str, Any]:
+    """Compares the estimate with tiktoken's o200k count, when available."""
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        return {"skipped": f"tiktoken o200k_base unavailable ({type(e).__name__})"}
+    return {
+        name: round(estimate_tokens(text) / len(encoding.encode(text)), 3)
+        for name, text in corpus_texts().items()
+    }
+
+
+def long_article(tokens: int, rng: random.Random) -> str:
+    """Builds an article of about ``tokens`` tokens from corpus paragraphs."""
+    with open(CORPUS, encoding="utf-8") as f:
+        paragraphs = [
+            paragraph
+            for article in json.load(f)
+            for paragraph in article["article"].split("\n\n")[1:]
+        ]
+    parts = ["## A Long Article"]
+    size = estimate_tokens(parts[0])
+    while size < tokens:
+        # Numbered, so no two chunks are identical and share a call
+        paragraph = f"Part {len(parts)}. {rng.choice(paragraphs)}"
+        parts.append(paragraph)
+        size += estimate_tokens(paragraph) + 1
+    return "\n\n".join(parts)
+
+
+def evaluate(handler: SummaryEvaluationHandler, article: str, summary: str) -> dict:
+    event = {
+        "httpMethod": "POST",
+        "headers": {},
+        "body": json.dumps({"article": article, "summary": summary}),
+    }
+    return handler.handle(event, None)
+
+
+def make_handler(
+    server: FakeOpenAIServer,
+    sink: InMemoryMetricsSink,
+    env: Dict[str, str],
+    cache: bool,
+) -> SummaryEvaluationHandler:
+    for name in ("ARTICLE_CHUNK_ABOVE_TOKENS", "ARTICLE_OVERSIZE"):
+        os.environ.pop(name, None)
+    os.environ.update(env)
+    base_handler.reset_registry(
+        FakeSSMClient,
+        result_cache_factory=lambda: ResultCache(max_entries=1000 if cache else 0),
+        async_openai_client_factory=lambda api_key: AsyncOpenAI(
+            api_key=api_key, base_url=server.base_url, max_retries=0
+        ),
+        metrics_sink_factory=lambda: sink,
+    )
+    return base_handler.get_handler(SummaryEvaluationHandler)
+
+
+def run_mode(
+    server: FakeOpenAIServer, mode: str, article: str, requests: int
+) -> Dict[str, Any]:
+    sink = InMemoryMetricsSink()
+    handler = make_handler(server, sink, MODES[mode], mode.endswith("cached"))
+    calls_before = server.requests
+    latencies: List[float] = []
+    for index in range(requests):
+        summary = f"Summary number {index}: the article describes bees and markets."
+        started = time.perf_counter()
+        response = evaluate(handler, article, summary)
+        latencies.append((time.perf_counter() - started) * 1000)
+        assert response["statusCode"] == 200, response
+    return {
+        "p50_ms": round(statistics.median(latencies), 1),
+        "max_ms": round(max(latencies), 1),
+        "model_calls": round((server.requests - calls_before) / requests, 2),
+        "prompt_tokens": round(sum(sink.values("PromptTokens")) / requests),
+        "chunks": max(sink.values("ArticleChunks") or [0]),
+    }
+
+
+def oversize(server: FakeOpenAIServer, tokens: int) -> Dict[str, Any]:
+    article = long_article(tokens, random.Random(1))
+    results: Dict[str, Any] = {"article_tokens": estimate_tokens(article)}
+    for label, env in (("reject", {}), ("truncate", {"ARTICLE_OVERSIZE": "truncate"})):
+        sink = InMemoryMetricsSink()
+        handler = make_handler(server, sink, env, cache=False)
+        calls_before = server.requests
+        started = time.perf_counter()
+        response = evaluate(handler, article, "The article is about bees.")
+        results[label] = {
+            "status": response["statusCode"],
+            "ms": round((time.perf_counter() - started) * 1000, 1),
+            "model_calls": server.requests - calls_before,
+            "truncated": max(sink.values("ArticleTruncated") or [0]),
+        }
+    os.environ.pop("ARTICLE_OVERSIZE", None)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1000,4000,8000,16000,30000")
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--latency", default="lognormal:300:0.3")
+    parser.add_argument("--prompt-ms-per-1k-tokens", type=float, default=40.0)
+    parser.add_argument("--oversize-tokens", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    results: Dict[str, Any] = {"estimator_vs_o200k": estimator_accuracy()}
+    server = FakeOpenAIServer(
+        args.latency,
+        seed=1,
+        prompt_delay_per_1k=args.prompt_ms_per_1k_tokens / 1000,
+    )
+    with server:
+        by_size: Dict[str, Any] = {}
+        for size in (int(size) for size in args.sizes.split(",")):
+            article = long_article(size, rng)
+            by_size[str(size)] = {
+                mode: run_mode(server, mode, article, args.requests) for mode in MODES
+            }
+        results["by_article_tokens"] = by_size
+        results["oversize"] = oversize(server, args.oversize_tokens)
+    os.environ.pop("ARTICLE_CHUNK_ABOVE_TOKENS", None)
+    base_handler.reset_registry()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
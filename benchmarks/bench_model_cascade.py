@@ -0,0 +1,140 @@
+"""
+Latency, cost and escalation rate of a model cascade vs. single models.
+
+Runs ``WordUsageHandler`` against ``fake_openai_server`` with three model
+configurations: the cheap model alone, the strong model alone, and a cascade
+that asks the cheap model first and escalates answers below the confidence
+threshold. The fake server gives the strong model its own latency and makes
+a share of the cheap model's answers low-confidence (``--low-confidence-rate``,
+standing in for the hard cases).
+
+For each configuration it reports p50/p95 latency, the mean cost per request
+(list prices of ``model_cascade.MODEL_PRICES``, with the fake server's word
+counts as tokens), the requests sent to each model and, for the cascade, the
+escalation rate and the calls, latency and cost of each tier.
+
+Usage:
+    python benchmarks/bench_model_cascade.py [--requests 200]
+        [--low-confidence-rate 0.15] [--cascade gpt-4o-mini:0.8,gpt-4o]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "handlers"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from openai import AsyncOpenAI  # noqa: E402
+
+import base_handler  # noqa: E402
+import model_cascade  # noqa: E402
+from fake_openai_server import FakeOpenAIServer  # noqa: E402
+from metrics import InMemoryMetricsSink  # noqa: E402
+from result_cache import ResultCache  # noqa: E402
+from word_evaluator import WordUsageHandler  # noqa: E402
+
+
+class FakeSSMClient:
+    def get_parameters(self, Names, WithDecryption):
+        parameters = [{"Name": name, "Value": "sk-benchmark"} for name in Names]
+        return {"Parameters": parameters}
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run(server: FakeOpenAIServer, models: str, requests: int, concurrency: int) -> dict:
+    os.environ["MODELS"] = models
+    model_cascade.cascade_stats.clear()
+    sink = InMemoryMetricsSink()
+    base_handler.reset_registry(
+        FakeSSMClient,
+        result_cache_factory=lambda: ResultCache(max_entries=0),
+        async_openai_client_factory=lambda api_key: AsyncOpenAI(
+            api_key=api_key, base_url=server.base_url, max_retries=0
+        ),
+        metrics_sink_factory=lambda: sink,
+    )
+    handler = base_handler.get_handler(WordUsageHandler)
+    by_model_before = dict(server.requests_by_model)
+
+    async def one(index: int, semaphore: asyncio.Semaphore) -> float:
+        event = {
+            "httpMethod": "POST",
+            "headers": {},
+            "body": json.dumps(
+                {"word": "borrow", "sentence": f"Can I borrow {index} pencils?"}
+            ),
+        }
+        async with semaphore:
+            start = time.perf_counter()
+            with handler.instrument(None):
+                response = await handler.handle_async(event, None)
+            assert response["statusCode"] == 200, response
+            return (time.perf_counter() - start) * 1000
+
+    async def run_all() -> list:
+        semaphore = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(one(i, semaphore) for i in range(requests)))
+
+    latencies = base_handler.registry.run(run_all())
+    result = {
+        "models": models,
+        "p50_ms": round(percentile(latencies, 0.50), 1),
+        "p95_ms": round(percentile(latencies, 0.95), 1),
+        "mean_ms": round(statistics.mean(latencies), 1),
+        "cost_per_1k_requests_usd": round(
+            sum(sink.values("ModelCost")) * 1000 / requests, 6
+        ),
+        "model_requests": {
+            model: count - by_model_before.get(model, 0)
+            for model, count in server.requests_by_model.items()
+            if count > by_model_before.get(model, 0)
+        },
+    }
+    if len(handler.model_tiers) > 1:
+        result["cascade"] = handler.cascade_stats.as_dict()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--cascade", default="gpt-4o-mini:0.8,gpt-4o")
+    parser.add_argument("--low-confidence-rate", type=float, default=0.15)
+    parser.add_argument("--cheap-latency", default="lognormal:300:0.4")
+    parser.add_argument("--strong-latency", default="lognormal:900:0.4")
+    args = parser.parse_args()
+
+    # Keep every request a model call: no near-duplicate reuse between them
+    os.environ["NEAR_DUPLICATE_MAX_ENTRIES"] = "0"
+    tiers = model_cascade.parse_tiers(args.cascade)
+    cheap, strong = tiers[0].model, tiers[-1].model
+    server = FakeOpenAIServer(
+        args.cheap_latency,
+        seed=1,
+        low_confidence_rate=args.low_confidence_rate,
+        strong_models=[strong],
+        model_latency={strong: args.strong_latency},
+    )
+    with server:
+        results = {
+            "cheap_only": run(server, cheap, args.requests, args.concurrency),
+            "strong_only": run(server, strong, args.requests, args.concurrency),
+            "cascade": run(server, args.cascade, args.requests, args.concurrency),
+        }
+    os.environ.pop("MODELS")
+    base_handler.reset_registry()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Near-duplicate index: reuse rate, false reuse, latency and size vs. corpus size.
+
+Fills a ``NearDuplicateIndex`` with synthetic learner sentences, then looks up
+three kinds of follow-up submissions:
+
+* reformatted: the same sentence with other capitalization, punctuation and
+  spacing, which should reuse the earlier result;
+* word forms: the same sentence with one verb inflected differently, which
+  must never reuse it (counted as false reuse);
+* unseen: new sentences, which must miss too.
+
+The index is capped at ``--max-entries``, like in production, so corpora past
+the cap show that memory and latency stay flat; lookups sample the sentences
+still indexed. For each corpus size it reports insert and lookup latency
+percentiles and process memory.
+
+Usage:
+    python benchmarks/bench_near_duplicate.py [--sizes 1000,10000,50000]
+        [--max-entries 10000] [--lookups 500]
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "handlers"))
+
+from near_duplicate import NearDuplicateIndex  # noqa: E402
+
+SUBJECTS = ["I", "She", "My brother", "The teacher", "We", "Our neighbours", "He"]
+VERBS = [
+    ("walks", "walk"),
+    ("visited", "visits"),
+    ("has eaten", "has ate"),
+    ("is reading", "is read"),
+    ("bought", "buyed"),
+    ("writes", "write"),
+    ("went", "goed"),
+]
+OBJECTS = [
+    "a long letter",
+    "the old museum",
+    "three apples",
+    "an interesting novel",
+    "the new bakery",
+    "her grandmother",
+    "a small garden",
+    "the river bank",
+]
+TIMES = [
+    "every morning",
+    "last weekend",
+    "after school",
+    "before dinner",
+    "during the holidays",
+    "on Sunday afternoon",
+    "with a friend",
+    "at night",
+]
+SCOPE = "benchmark-scope"
+
+
+def sentence(rng: random.Random) -> Tuple[str, str]:
+    """Returns a random sentence and the same sentence with the verb altered."""
+    subject = rng.choice(SUBJECTS)
+    verb, other_form = rng.choice(VERBS)
+    tail = f"{rng.choice(OBJECTS)} {rng.choice(TIMES)} {rng.randrange(10**6)}"
+    return f"{subject} {verb} {tail}.", f"{subject} {other_form} {tail}."
+
+
+def reformat(text: str, rng: random.Random) -> str:
+    """Changes capitalization, punctuation and spacing only."""
+    words = text.rstrip(".").split()
+    words = [w.upper() if rng.random() < 0.2 else w.lower() for w in words]
+    return "  ".join(words) + rng.choice(["!", "", " .", "..."])
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    return {
+        "p50_us": round(ordered[len(ordered) // 2], 1),
+        "p99_us": round(ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))], 1),
+        "mean_us": round(statistics.mean(ordered), 1),
+    }
+
+
+def timed(call: Callable[[], object]) -> Tuple[object, float]:
+    started = time.perf_counter()
+    result = call()
+    return result, (time.perf_counter() - started) * 1e6
+
+
+def rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def run(size: int, max_entries: int, lookups: int, seed: int) -> Dict[str, object]:
+    rng = random.Random(seed)
+    index = NearDuplicateIndex(max_entries=max_entries)
+    indexed: List[Tuple[str, str]] = []
+    insert_us = []
+    for number in range(size):
+        text, altered = sentence(rng)
+        indexed.append((text, altered))
+        _, elapsed = timed(lambda: index.add(SCOPE, text, {"n": number}))
+        insert_us.append(elapsed)
+
+    retained = indexed[-max_entries:]
+    samples = rng.sample(retained, min(lookups, len(retained)))
+    results: Dict[str, object] = {
+        "corpus": size,
+        "entries": len(index),
+        "insert": percentiles(insert_us),
+    }
+    for kind, texts in (
+        ("reformatted", [reformat(text, rng) for text, _ in samples]),
+        ("word_forms", [altered for _, altered in samples]),
+        ("unseen", [sentence(rng)[0] for _ in samples]),
+    ):
+        latencies, hits = [], 0
+        for text in texts:
+            value, elapsed = timed(lambda: index.lookup(SCOPE, text))
+            latencies.append(elapsed)
+            hits += value is not None
+        results[kind] = {
+            "reuse_rate": round(hits / len(texts), 3),
+            **percentiles(latencies),
+        }
+    results["rss_mb"] = round(rss_mb(), 1)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1000,10000,50000")
+    parser.add_argument("--max-entries", type=int, default=10_000)
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = {
+        size: run(size, args.max_entries, args.lookups, args.seed)
+        for size in (int(value) for value in args.sizes.split(","))
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
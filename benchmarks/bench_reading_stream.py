@@ -0,0 +1,140 @@
+"""
+Time to first byte of the streaming reading generator against the JSON one.
+
+Serves ``reading_stream`` on a local port with ``fake_openai_server`` emitting
+one word every ``--token-delay-ms``, and compares, per request, when the
+first byte, the topic and the first article chunk reach the client with the
+total time of the buffered ``lambda_handler`` path. The article pool starts
+empty for every request, so both paths call the model.
+
+Exits with status 1 if streaming does not deliver its first chunk before the
+JSON response completes.
+
+Usage:
+    python benchmarks/bench_reading_stream.py [--requests 5] [--token-delay-ms 20]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "handlers"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from openai import AsyncOpenAI  # noqa: E402
+
+import base_handler  # noqa: E402
+from fake_openai_server import FakeOpenAIServer  # noqa: E402
+from metrics import NullMetricsSink  # noqa: E402
+from reading_generator import ArticleGeneratorHandler  # noqa: E402
+from reading_stream import handle_connection  # noqa: E402
+
+
+class FakeSSMClient:
+    def get_parameters(self, Names, WithDecryption):
+        parameters = [{"Name": name, "Value": "sk-benchmark"} for name in Names]
+        return {"Parameters": parameters}
+
+
+def reset(server: FakeOpenAIServer) -> None:
+    """Starts from a cold pool and store, with warm clients built on demand."""
+    base_handler.reset_registry(
+        FakeSSMClient,
+        async_openai_client_factory=lambda api_key: AsyncOpenAI(
+            api_key=api_key, base_url=server.base_url, max_retries=0
+        ),
+        metrics_sink_factory=NullMetricsSink,
+    )
+
+
+async def stream_once() -> dict:
+    """Requests one streamed article and times its milestones in milliseconds."""
+    listener = await asyncio.start_server(handle_connection, "127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    try:
+        start = time.perf_counter()
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET / HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        await writer.drain()
+
+        timings = {}
+        received = b""
+        while True:
+            data = await reader.read(4096)
+            if not data:
+                break
+            elapsed = (time.perf_counter() - start) * 1000
+            timings.setdefault("ttfb_ms", elapsed)
+            received += data
+            if b"event: topic" in received:
+                timings.setdefault("topic_ms", elapsed)
+            if b"event: chunk" in received:
+                timings.setdefault("first_chunk_ms", elapsed)
+        timings["total_ms"] = (time.perf_counter() - start) * 1000
+        writer.close()
+    finally:
+        listener.close()
+        await listener.wait_closed()
+
+    if b"event: done" not in received:
+        raise RuntimeError(f"Stream ended without a done event: {received[-300:]!r}")
+    return timings
+
+
+def json_once() -> float:
+    """Requests one article through the buffered handler, in milliseconds."""
+    handler = base_handler.get_handler(ArticleGeneratorHandler)
+    event = {"httpMethod": "GET", "headers": {}, "body": None}
+    start = time.perf_counter()
+    response = handler.handle(event, None)
+    elapsed = (time.perf_counter() - start) * 1000
+    if response["statusCode"] != 200:
+        raise RuntimeError(f"JSON handler failed: {response}")
+    return elapsed
+
+
+def summarize(values: list) -> float:
+    return round(statistics.median(values), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5)
+    parser.add_argument("--latency", default="lognormal:300:0.2")
+    parser.add_argument("--token-delay-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    os.environ.pop("ARTICLE_POOL_TABLE", None)
+    os.environ.pop("ARTICLE_STORE_TABLE", None)
+    streamed, buffered = [], []
+    with FakeOpenAIServer(
+        args.latency, seed=1, token_delay=args.token_delay_ms / 1000
+    ) as server:
+        for _ in range(args.requests):
+            reset(server)
+            streamed.append(base_handler.registry.run(stream_once()))
+            reset(server)
+            buffered.append(json_once())
+    base_handler.reset_registry()
+
+    results = {
+        "latency": args.latency,
+        "token_delay_ms": args.token_delay_ms,
+        "requests": args.requests,
+        "stream": {
+            name: summarize([timing[name] for timing in streamed])
+            for name in ("ttfb_ms", "topic_ms", "first_chunk_ms", "total_ms")
+        },
+        "json": {"total_ms": summarize(buffered)},
+    }
+    print(json.dumps(results, indent=2))
+    if results["stream"]["first_chunk_ms"] >= results["json"]["total_ms"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
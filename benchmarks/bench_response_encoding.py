@@ -0,0 +1,146 @@
+"""
+Serialization time and response size of each handler's payload.
+
+Builds a representative response body for every endpoint (a word or tense
+verdict, a batch of 25 verdicts, a summary evaluation, a reading article)
+and reports, per payload:
+
+* encode time with ``json.dumps`` and with orjson (when installed);
+* body size uncompressed and with gzip and brotli (when installed), with the
+  time each takes, as sent to the client after API Gateway decodes base64;
+* the time ``APIGatewayResponse`` takes to build the whole response for a
+  client without compression, with gzip and with brotli.
+
+Article text is assembled from the sentences of the tense corpus, so it is
+English prose, but more repetitive than a real article: read its savings as
+an upper bound.
+
+Usage:
+    python benchmarks/bench_response_encoding.py [--repeat 2000]
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Callable, Dict
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, "..", "handlers"))
+
+import response_encoding  # noqa: E402
+from base_handler import APIGatewayResponse  # noqa: E402
+
+CORPUS = os.path.join(BENCHMARKS_DIR, "data", "tense_corpus.json")
+
+
+def article_text(rng: random.Random, words: int = 700) -> str:
+    """Returns a Markdown article of about ``words`` words."""
+    with open(CORPUS, encoding="utf-8") as f:
+        sentences = [item["sentence"] for item in json.load(f)]
+    paragraphs, count = ["## A Day at the Market"], 0
+    while count < words:
+        paragraph = " ".join(rng.choice(sentences) for _ in range(6))
+        paragraphs.append(paragraph)
+        count += len(paragraph.split())
+    return "\n\n".join(paragraphs)
+
+
+def payloads(rng: random.Random) -> Dict[str, Any]:
+    verdict = {
+        "correct": False,
+        "explanation": (
+            "The word 'borrow' means to take something that you will give "
+            "back; here the sentence needs 'lend', because the speaker gives "
+            "the book to a friend."
+        ),
+    }
+    article = article_text(rng)
+    feedback = " ".join(article.split()[:60])
+    return {
+        "word": verdict,
+        "tense": {
+            "correct": True,
+            "explanation": "'has eaten' is the present perfect of 'eat'.",
+        },
+        "word_batch": {"results": [{"result": verdict} for _ in range(25)]},
+        "writing": {
+            "grammar_spelling": {"score": 82, "feedback": feedback},
+            "coherence": {"score": 76, "feedback": feedback[::-1]},
+        },
+        "reading": {
+            "topic": "A Day at the Market",
+            "article": article,
+            "article_id": "3f2a9c1e5b7d4e8f",
+        },
+    }
+
+
+def timed_us(call: Callable[[], Any], repeat: int) -> float:
+    call()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        call()
+    return round((time.perf_counter() - started) / repeat * 1e6, 2)
+
+
+def measure(name: str, payload: Any, repeat: int) -> Dict[str, Any]:
+    data = json.dumps(payload).encode("utf-8")
+    result: Dict[str, Any] = {"bytes": len(data)}
+
+    result["encode_us"] = {"json": timed_us(lambda: json.dumps(payload), repeat)}
+    orjson = response_encoding.json_backend()
+    if orjson is not None:
+        result["encode_us"]["orjson"] = timed_us(lambda: orjson.dumps(payload), repeat)
+
+    for encoding in ("gzip", "br"):
+        if encoding not in response_encoding.available_encodings():
+            continue
+        compressed = response_encoding.compress(data, encoding)
+        result[encoding] = {
+            "bytes": len(compressed),
+            "saved": round(1 - len(compressed) / len(data), 3),
+            "compress_us": timed_us(
+                lambda: response_encoding.compress(data, encoding), repeat // 10 or 1
+            ),
+        }
+
+    def build(accept_encoding: str) -> Dict[str, Any]:
+        return APIGatewayResponse.success(payload, accept_encoding)
+
+    result["response_us"] = {
+        label: timed_us(lambda: build(accept), repeat // 10 or 1)
+        for label, accept in (("identity", ""), ("gzip", "gzip"), ("br", "br, gzip"))
+    }
+    sent = build("br, gzip")
+    result["sent_encoding"] = sent["headers"].get("Content-Encoding", "identity")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {
+        "orjson": response_encoding.json_backend() is not None,
+        "encodings": list(response_encoding.available_encodings()),
+        "min_compression_bytes": response_encoding.MIN_COMPRESSION_BYTES,
+    }
+    for name, payload in payloads(random.Random(args.seed)).items():
+        results[name] = measure(name, payload, args.repeat)
+    # Sanity check: compressed bodies decode back to the original
+    article = payloads(random.Random(args.seed))["reading"]
+    sent = APIGatewayResponse.success(article, "gzip")
+    decoded = gzip.decompress(base64.b64decode(sent["body"]))
+    assert json.loads(decoded) == article
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Coverage and accuracy of the local tense rules.
+
+Runs ``tense_rules.judge_tense`` over a labelled corpus of tense questions
+(``benchmarks/data/tense_corpus.json``) and reports:
+
+* coverage: the share of questions answered without the model, i.e. the model
+  calls saved;
+* accuracy: how often the local verdicts match the reference labels;
+* the questions where they disagree, and the cost of a local verdict.
+
+With ``--against-model`` every question is also sent to the model with the
+rules switched off (the OpenAI key is read like in production, so
+``OPENAI_API_KEY`` can be set for a local run), and local verdicts are compared
+with the model's as well as with the labels.
+
+Exits with status 1 when accuracy on the labels falls below ``--min-accuracy``,
+so it can run as a CI gate.
+
+Usage:
+    python benchmarks/bench_tense_rules.py [--min-accuracy 0.98]
+        [--against-model] [--corpus path.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, "..", "handlers"))
+
+from tense_rules import judge_tense  # noqa: E402
+
+DEFAULT_CORPUS = os.path.join(BENCHMARKS_DIR, "data", "tense_corpus.json")
+
+
+def ask_model(items: List[Dict[str, Any]]) -> List[Optional[bool]]:
+    """Returns the model's verdict on each item, None where the call failed."""
+    from base_handler import get_handler
+    from verb_tense_evaluator import TenseAnalysisHandler
+
+    class ModelOnlyHandler(TenseAnalysisHandler):
+        LOCAL_RULES = False
+
+    handler = get_handler(ModelOnlyHandler)
+    verdicts: List[Optional[bool]] = []
+    for item in items:
+        event = {
+            "httpMethod": "POST",
+            "headers": {},
+            "body": json.dumps(
+                {"verb_tense": item["verb_tense"], "sentence": item["sentence"]}
+            ),
+        }
+        response = handler.handle(event, None)
+        body = json.loads(response["body"])
+        verdicts.append(body.get("correct") if response["statusCode"] == 200 else None)
+    return verdicts
+
+
+def agreement(local: List[Optional[Dict[str, Any]]], labels: List[Any]) -> float:
+    """Share of locally answered items whose verdict matches ``labels``."""
+    pairs = [
+        (verdict["correct"], label)
+        for verdict, label in zip(local, labels)
+        if verdict is not None and label is not None
+    ]
+    if not pairs:
+        return 1.0
+    return sum(mine == theirs for mine, theirs in pairs) / len(pairs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--min-accuracy", type=float, default=0.98)
+    parser.add_argument("--against-model", action="store_true")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with open(args.corpus, encoding="utf-8") as f:
+        items: List[Dict[str, Any]] = json.load(f)
+
+    local = [judge_tense(item["verb_tense"], item["sentence"]) for item in items]
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        for item in items:
+            judge_tense(item["verb_tense"], item["sentence"])
+    per_call_us = (time.perf_counter() - started) / (args.repeat * len(items)) * 1e6
+
+    answered = sum(verdict is not None for verdict in local)
+    labels = [item["correct"] for item in items]
+    results: Dict[str, Any] = {
+        "items": len(items),
+        "answered_locally": answered,
+        "coverage": round(answered / len(items), 3),
+        "accuracy": round(agreement(local, labels), 3),
+        "per_call_us": round(per_call_us, 1),
+        "disagreements": [
+            {**item, "local": verdict["correct"]}
+            for item, verdict in zip(items, local)
+            if verdict is not None and verdict["correct"] != item["correct"]
+        ],
+    }
+
+    if args.against_model:
+        model = ask_model(items)
+        results["model_accuracy"] = round(
+            sum(verdict == label for verdict, label in zip(model, labels))
+            / len(items),
+            3,
+        )
+        results["agreement_with_model"] = round(agreement(local, model), 3)
+
+    print(json.dumps(results, indent=2))
+    if results["accuracy"] < args.min_accuracy:
+        print(
+            f"FAIL: accuracy {results['accuracy']} < {args.min_accuracy}",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Per-request overhead of cold vs. warm handler setup.
+
+Simulates the SSM round trip and the OpenAI TLS handshake with fixed delays and
+compares two modes:
+
+* ``per-request``: the registry is reset before every invocation, which is what
+  ``lambda_handler`` did before handlers and clients were cached.
+* ``warm``: the registry is kept, so only the first invocation pays setup.
+
+Usage:
+    python benchmarks/bench_warm_invocations.py [--requests 50]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "handlers"))
+
+import base_handler  # noqa: E402
+import word_evaluator  # noqa: E402
+from metrics import NullMetricsSink  # noqa: E402
+from result_cache import ResultCache  # noqa: E402
+
+SSM_LATENCY_S = 0.030
+HANDSHAKE_LATENCY_S = 0.050
+COMPLETION_LATENCY_S = 0.005
+
+EVENT = {
+    "httpMethod": "POST",
+    "body": json.dumps(
+        {"word": "serendipity", "sentence": "Meeting her was pure serendipity."}
+    ),
+    "headers": {},
+}
+
+
+class FakeSSMClient:
+    def get_parameters(self, Names, WithDecryption):
+        time.sleep(SSM_LATENCY_S)
+        parameters = [{"Name": name, "Value": "sk-benchmark"} for name in Names]
+        return {"Parameters": parameters}
+
+
+class FakeAsyncOpenAI:
+    """Pays the handshake on the first request of each client, like a fresh pool."""
+
+    def __init__(self, api_key):
+        self._connected = False
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        if not self._connected:
+            await asyncio.sleep(HANDSHAKE_LATENCY_S)
+            self._connected = True
+        await asyncio.sleep(COMPLETION_LATENCY_S)
+        message = SimpleNamespace(content='{"correct": true, "explanation": "ok"}')
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    def with_options(self, **kwargs):
+        return self
+
+    async def close(self):
+        pass
+
+
+def reset():
+    base_handler.reset_registry(
+        FakeSSMClient,
+        result_cache_factory=lambda: ResultCache(max_entries=0),
+        async_openai_client_factory=FakeAsyncOpenAI,
+        metrics_sink_factory=NullMetricsSink,
+    )
+
+
+def run(requests: int, reset_each: bool) -> list:
+    reset()
+    timings = []
+    for _ in range(requests):
+        if reset_each:
+            reset()
+        start = time.perf_counter()
+        response = word_evaluator.lambda_handler(EVENT, None)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response["statusCode"] == 200, response
+    return timings
+
+
+def summarize(timings: list) -> dict:
+    return {
+        "mean_ms": round(statistics.mean(timings), 2),
+        "p50_ms": round(statistics.median(timings), 2),
+        "max_ms": round(max(timings), 2),
+        "overhead_ms": round(statistics.mean(timings) - COMPLETION_LATENCY_S * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    results = {
+        "per-request": summarize(run(args.requests, reset_each=True)),
+        "warm": summarize(run(args.requests, reset_each=False)),
+    }
+    base_handler.reset_registry()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
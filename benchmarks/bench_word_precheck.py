@@ -0,0 +1,88 @@
+"""
+Coverage and safety of the local word-usage pre-check.
+
+Runs ``word_precheck.precheck_word_usage`` over a labelled corpus of word-usage
+questions (``benchmarks/data/word_usage_corpus.json``) and reports:
+
+* coverage: the share of questions answered without the model, i.e. the model
+  calls saved;
+* false rejections: correct usages the pre-check answered as wrong. The
+  pre-check only ever answers "incorrect", so it must never answer a correct
+  usage; each one is listed, and any exception raised is reported as well;
+* the cost of a pre-check call.
+
+Exits with status 1 on any false rejection or exception, so it can run as a CI
+gate.
+
+Usage:
+    python benchmarks/bench_word_precheck.py [--corpus path.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, "..", "handlers"))
+
+from word_precheck import precheck_word_usage  # noqa: E402
+
+DEFAULT_CORPUS = os.path.join(BENCHMARKS_DIR, "data", "word_usage_corpus.json")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with open(args.corpus, encoding="utf-8") as f:
+        items: List[Dict[str, Any]] = json.load(f)
+
+    verdicts: List[Any] = []
+    errors: List[Dict[str, Any]] = []
+    for item in items:
+        try:
+            verdicts.append(precheck_word_usage(item["word"], item["sentence"]))
+        except Exception as e:
+            verdicts.append(None)
+            errors.append({**item, "error": repr(e)})
+
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        for item in items:
+            try:
+                precheck_word_usage(item["word"], item["sentence"])
+            except Exception:
+                pass
+    per_call_us = (time.perf_counter() - started) / (args.repeat * len(items)) * 1e6
+
+    answered = sum(verdict is not None for verdict in verdicts)
+    results: Dict[str, Any] = {
+        "items": len(items),
+        "answered_locally": answered,
+        "coverage": round(answered / len(items), 3),
+        "per_call_us": round(per_call_us, 1),
+        "false_rejections": [
+            {**item, "local": verdict}
+            for item, verdict in zip(items, verdicts)
+            if verdict is not None and item["correct"]
+        ],
+        "errors": errors,
+    }
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if results["false_rejections"] or errors:
+        print(
+            f"FAIL: {len(results['false_rejections'])} false rejection(s), "
+            f"{len(errors)} error(s)",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
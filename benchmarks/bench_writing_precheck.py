@@ -0,0 +1,274 @@
+"""
+Accuracy and cost of the local writing pre-pass, and its effect on the model.
+
+Runs ``writing_precheck.check_writing`` over a labelled corpus of learner
+summaries (``benchmarks/data/summary_corpus.json``) and reports:
+
+* labelled: precision and recall of the issues shown to the user against the
+  labels, and how often a spelling suggestion is the labelled fix. The labels
+  include real-word errors ("there" for "their") that a spell checker cannot
+  find. Unsure findings, which only reach the model, are listed apart;
+* synthetic typos: recall and correct suggestions for typos injected into the
+  clean summaries (one deletion, insertion, substitution or transposition in
+  a word), and false flags per 100 untouched words, shown or unsure;
+* the time to build the spelling index (once per container) and to check a
+  summary, and the size of the hints added to the prompt.
+
+With ``--against-model`` every summary is also evaluated by
+``SummaryEvaluationHandler`` with and without the pre-pass (the OpenAI key is
+read like in production, so ``OPENAI_API_KEY`` can be set for a local run),
+comparing model latency, prompt and completion tokens, and how far the
+scores of the two runs are apart.
+
+Exits with status 1 if a labelled summary gets a finding shown to the user
+that is not in its labels.
+
+Usage:
+    python benchmarks/bench_writing_precheck.py [--rounds 50] [--against-model]
+        [--corpus path.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import string
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, "..", "handlers"))
+
+from writing_precheck import (  # noqa: E402
+    WORDS_PATH,
+    SpellingIndex,
+    check_writing,
+    issue_hints,
+    spelling_index,
+    vocabulary,
+)
+
+DEFAULT_CORPUS = os.path.join(BENCHMARKS_DIR, "data", "summary_corpus.json")
+
+
+def load_corpus(path: str) -> List[Dict[str, Any]]:
+    """Flattens the corpus into one item per summary, with its article."""
+    with open(path, encoding="utf-8") as f:
+        articles = json.load(f)
+    return [
+        {"article": article["article"], **summary}
+        for article in articles
+        for summary in article["summaries"]
+    ]
+
+
+def labelled_accuracy(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    found_total = labelled_total = matched = fixed = spelling_matched = 0
+    missed, false_flags, unsure = [], [], []
+    for item in items:
+        labels = {(kind, text.lower()): fix for kind, text, fix in item["issues"]}
+        found = check_writing(item["summary"], vocabulary(item["article"]))
+        unsure += [
+            [issue.text, issue.suggestion] for issue in found if not issue.confident
+        ]
+        found = [issue for issue in found if issue.confident]
+        found_total += len(found)
+        labelled_total += len(labels)
+        hits = set()
+        for issue in found:
+            key = (issue.kind, issue.text.lower())
+            if key not in labels:
+                false_flags.append([issue.kind, issue.text, issue.suggestion])
+                continue
+            hits.add(key)
+            matched += 1
+            if issue.kind == "spelling":
+                spelling_matched += 1
+                fixed += issue.suggestion.lower() == labels[key].lower()
+        missed += [[kind, text] for kind, text in labels if (kind, text) not in hits]
+    return {
+        "labelled_issues": labelled_total,
+        "found": found_total,
+        "precision": round(matched / found_total, 3) if found_total else 1.0,
+        "recall": round(matched / labelled_total, 3) if labelled_total else 1.0,
+        "correct_suggestions": (
+            round(fixed / spelling_matched, 3) if spelling_matched else 1.0
+        ),
+        "missed": missed,
+        "false_flags": false_flags,
+        "unsure": unsure,
+    }
+
+
+def add_typo(word: str, rng: random.Random) -> str:
+    """Applies one random edit to a word."""
+    i = rng.randrange(1, len(word) - 1)
+    edit = rng.choice(["delete", "insert", "substitute", "transpose"])
+    letter = rng.choice(string.ascii_lowercase)
+    if edit == "delete":
+        return word[:i] + word[i + 1 :]
+    if edit == "insert":
+        return word[:i] + letter + word[i:]
+    if edit == "substitute":
+        return word[:i] + letter + word[i + 1 :]
+    return word[:i] + word[i + 1] + word[i] + word[i + 2 :]
+
+
+def synthetic_accuracy(
+    items: List[Dict[str, Any]], rounds: int, typos: int, seed: int
+) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    index = spelling_index()
+    clean = [item for item in items if not item["issues"]]
+    injected = found = fixed = real_words = flags = unsure_flags = untouched = 0
+    for _ in range(rounds):
+        for item in clean:
+            words = item["summary"].split(" ")
+            candidates = [
+                i
+                for i, word in enumerate(words)
+                if word.isalpha() and word.islower() and len(word) >= 5
+            ]
+            originals: Dict[str, str] = {}
+            for i in rng.sample(candidates, min(typos, len(candidates))):
+                typo = add_typo(words[i], rng)
+                if typo in index:
+                    # A real word: no spell checker can tell
+                    real_words += 1
+                    continue
+                originals[typo] = words[i]
+                words[i] = typo
+            injected += len(originals)
+            issues = [
+                issue
+                for issue in check_writing(" ".join(words), vocabulary(item["article"]))
+                if issue.kind == "spelling"
+            ]
+            for issue in issues:
+                if issue.text in originals:
+                    found += 1
+                    fixed += issue.suggestion == originals[issue.text]
+                elif issue.confident:
+                    flags += 1
+                else:
+                    unsure_flags += 1
+            untouched += len(words) - len(originals)
+    return {
+        "typos_injected": injected,
+        "real_word_typos_skipped": real_words,
+        "recall": round(found / injected, 3) if injected else 1.0,
+        "correct_suggestions": round(fixed / found, 3) if found else 1.0,
+        "false_flags_per_100_words": round(flags / untouched * 100, 3),
+        "unsure_flags_per_100_words": round(unsure_flags / untouched * 100, 3),
+    }
+
+
+def cost(items: List[Dict[str, Any]], repeat: int) -> Dict[str, Any]:
+    started = time.perf_counter()
+    SpellingIndex.from_file(WORDS_PATH)
+    build_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            check_writing(item["summary"], vocabulary(item["article"]))
+    per_call_us = (time.perf_counter() - started) / (repeat * len(items)) * 1e6
+    hints = [
+        json.dumps(issue_hints(check_writing(i["summary"], vocabulary(i["article"]))))
+        for i in items
+    ]
+    return {
+        "index_words": len(spelling_index()),
+        "index_build_ms": round(build_ms, 1),
+        "per_call_us": round(per_call_us, 1),
+        "mean_hint_chars": round(statistics.mean(len(h) for h in hints), 1),
+    }
+
+
+def against_model(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Evaluates every summary with and without the pre-pass."""
+    import base_handler
+    from metrics import InMemoryMetricsSink
+    from writing_evaluator import SummaryEvaluationHandler
+
+    class ModelOnlyHandler(SummaryEvaluationHandler):
+        SPELLING_PRECHECK = False
+
+    def run(handler_class) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        sink = InMemoryMetricsSink()
+        base_handler.reset_registry(metrics_sink_factory=lambda: sink)
+        handler = base_handler.get_handler(handler_class)
+        results = []
+        for item in items:
+            event = {
+                "httpMethod": "POST",
+                "headers": {},
+                "body": json.dumps(
+                    {"article": item["article"], "summary": item["summary"]}
+                ),
+            }
+            response = handler.handle(event, None)
+            assert response["statusCode"] == 200, response
+            results.append(json.loads(response["body"]))
+        summary = {
+            name: round(statistics.mean(sink.values(metric) or [0]), 1)
+            for name, metric in (
+                ("mean_model_ms", "ModelLatency"),
+                ("mean_prompt_tokens", "PromptTokens"),
+                ("mean_completion_tokens", "CompletionTokens"),
+            )
+        }
+        return results, summary
+
+    baseline, baseline_summary = run(ModelOnlyHandler)
+    prechecked, prechecked_summary = run(SummaryEvaluationHandler)
+    base_handler.reset_registry()
+
+    def differences(category: str) -> List[int]:
+        return [
+            abs(a[category]["score"] - b[category]["score"])
+            for a, b in zip(baseline, prechecked)
+        ]
+
+    return {
+        "model_only": baseline_summary,
+        "with_precheck": prechecked_summary,
+        "score_agreement": {
+            category: {
+                "mean_abs_difference": round(statistics.mean(differences(category)), 1),
+                "within_10_points": round(
+                    sum(d <= 10 for d in differences(category)) / len(items), 3
+                ),
+            }
+            for category in ("grammar_spelling", "coherence")
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--typos", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--against-model", action="store_true")
+    args = parser.parse_args()
+
+    items = load_corpus(args.corpus)
+    results: Dict[str, Any] = {
+        "summaries": len(items),
+        "cost": cost(items, args.repeat),
+        "labelled": labelled_accuracy(items),
+        "synthetic": synthetic_accuracy(items, args.rounds, args.typos, args.seed),
+    }
+    if args.against_model:
+        results["model"] = against_model(items)
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if results["labelled"]["false_flags"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""
+Local stand-in for the OpenAI chat completions API.
+
+Serves ``POST /v1/chat/completions`` with canned replies after a latency drawn
+from a configurable distribution, so handlers can be benchmarked without
+spending tokens. Point a client at it with ``base_url=server.base_url``.
+
+Replies are chosen by the request's json_schema name, so each handler gets a
+payload it can parse; ``--payloads`` overrides them from a JSON file. A share
+of requests (``--error-rate``) fail with ``--error-status``. ``--token-delay-ms``
+is the time spent per word of a reply: requests with ``"stream": true`` are
+answered as Server-Sent Events, one word every delay after the sampled
+latency, and other replies are sent once every word is generated.
+
+Schemas asking for a ``confidence`` (model cascades) get 0.95, or 0.4 for a
+share ``--low-confidence-rate`` of the requests to models other than the
+``--strong-models``. ``--model-latency`` gives some models their own latency
+spec, e.g. ``gpt-4o=lognormal:900:0.5``. ``--prompt-ms-per-1k-tokens`` adds
+latency in proportion to the prompt (counted in words), like prefill time.
+
+Latency specs (all values in milliseconds):
+
+* ``fixed:50``
+* ``uniform:20:80``
+* ``lognormal:50:0.5`` (median, sigma)
+* ``bimodal:40:2000:0.05`` (fast, slow, probability of slow)
+
+Usage:
+    python benchmarks/fake_openai_server.py --port 8787 --latency bimodal:40:2000:0.05
+        [--error-rate 0.01] [--token-delay-ms 5] [--payloads payloads.json]
+        [--low-confidence-rate 0.2] [--model-latency gpt-4o=fixed:900]
+        [--prompt-ms-per-1k-tokens 50]
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+# Replies keyed on the json_schema name of the request's response_format
+CANNED_CONTENT: Dict[str, str] = {
+    "WordUsageResult": json.dumps(
+        {"correct": True, "explanation": "The word is used correctly."}
+    ),
+    "TenseAnalysisResult": json.dumps(
+        {"correct": True, "explanation": "The sentence uses the requested tense."}
+    ),
+    "SummaryEvaluationResult": json.dumps(
+        {
+            "grammar_spelling": {"score": 85, "feedback": "Mostly correct."},
+            "coherence": {"score": 80, "feedback": "Clear and on topic."},
+        }
+    ),
+    "ArticleNotes": json.dumps(
+        {
+            "notes": [
+                "The part describes an event and its causes.",
+                "It gives an example and a consequence.",
+                "It ends with an expert's opinion.",
+            ]
+        }
+    ),
+    "ArticleDigest": json.dumps(
+        {
+            "key_points": ["The article introduces its topic.", "It gives an example."],
+            "reference_summary": "A short article introducing a topic with an example.",
+        }
+    ),
+}
+HIGH_CONFIDENCE = 0.95
+LOW_CONFIDENCE = 0.4
+DEFAULT_CONTENT = (
+    "## A Short Article\n\nThis is a **canned** article used for local benchmarks."
+)
+
+
+def parse_latency(spec: str, rng: random.Random) -> Callable[[], float]:
+    """
+    Builds a latency sampler from a spec string.
+
+    Args:
+        spec: The distribution spec, e.g. ``lognormal:50:0.5``
+        rng: Random source, seeded for repeatable runs
+
+    Returns:
+        A function returning a latency in seconds
+    """
+    kind, *values = spec.split(":")
+    params = [float(value) for value in values]
+    if kind == "fixed":
+        return lambda: params[0] / 1000
+    if kind == "uniform":
+        return lambda: rng.uniform(params[0], params[1]) / 1000
+    if kind == "lognormal":
+        median, sigma = params
+        return lambda: rng.lognormvariate(math.log(median), sigma) / 1000
+    if kind == "bimodal":
+        fast, slow, p_slow = params
+        return lambda: (slow if rng.random() < p_slow else fast) / 1000
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Hedged and timed-out calls hang up early; that is expected here
+        pass
+
+
+class FakeOpenAIServer:
+    """Threaded fake chat completions server."""
+
+    def __init__(
+        self,
+        latency: str = "fixed:0",
+        port: int = 0,
+        seed: Optional[int] = 0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        token_delay: float = 0.0,
+        payloads: Optional[Dict[str, str]] = None,
+        low_confidence_rate: float = 0.0,
+        strong_models: Iterable[str] = ("gpt-4o", "gpt-4.1"),
+        model_latency: Optional[Dict[str, str]] = None,
+        prompt_delay_per_1k: float = 0.0,
+    ):
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._sample_latency = parse_latency(latency, self._rng)
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.token_delay = token_delay
+        self.payloads = {**CANNED_CONTENT, **(payloads or {})}
+        self.low_confidence_rate = low_confidence_rate
+        self.strong_models = set(strong_models)
+        self._model_latency = {
+            model: parse_latency(spec, self._rng)
+            for model, spec in (model_latency or {}).items()
+        }
+        self.prompt_delay_per_1k = prompt_delay_per_1k
+        self.requests_by_model: Dict[str, int] = {}
+        self.requests = 0
+        self.errors = 0
+        self.streams = 0
+        self._server = _QuietServer(("127.0.0.1", port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def latency(self, model: Optional[str] = None) -> float:
+        with self._rng_lock:
+            return self._model_latency.get(model, self._sample_latency)()
+
+    @staticmethod
+    def prompt_tokens(request: dict) -> int:
+        return sum(
+            len(str(message.get("content", "")).split())
+            for message in request.get("messages", [])
+        )
+
+    def should_fail(self) -> bool:
+        with self._rng_lock:
+            failed = self._rng.random() < self.error_rate
+            if failed:
+                self.errors += 1
+            return failed
+
+    def content_for(self, request: dict) -> str:
+        schema = (request.get("response_format") or {}).get("json_schema") or {}
+        content = self.payloads.get(schema.get("name"), DEFAULT_CONTENT)
+        if "confidence" not in (schema.get("schema") or {}).get("properties", {}):
+            return content
+        with self._rng_lock:
+            low = (
+                request.get("model") not in self.strong_models
+                and self._rng.random() < self.low_confidence_rate
+            )
+        confidence = LOW_CONFIDENCE if low else HIGH_CONFIDENCE
+        return json.dumps({**json.loads(content), "confidence": confidence})
+
+    def stream_chunks(self, request: dict) -> Iterator[dict]:
+        """Yields ``chat.completion.chunk`` objects, one per word of the reply."""
+        chunk_id = f"chatcmpl-fake-{self.requests}"
+        words = self.content_for(request).split(" ")
+        for index, word in enumerate(words):
+            text = word if index == len(words) - 1 else f"{word} "
+            yield {
+                "id": chunk_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get("model", "fake"),
+                "choices": [
+                    {"index": 0, "delta": {"content": text}, "finish_reason": None}
+                ],
+            }
+        yield {
+            "id": chunk_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        }
+
+    def completion(self, request: dict) -> dict:
+        content = self.content_for(request)
+        prompt_tokens = self.prompt_tokens(request)
+        completion_tokens = len(content.split())
+        return {
+            "id": f"chatcmpl-fake-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", "0"))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                model = request.get("model", "fake")
+                with server._rng_lock:
+                    server.requests += 1
+                    by_model = server.requests_by_model
+                    by_model[model] = by_model.get(model, 0) + 1
+                prefill = server.prompt_tokens(request) / 1000
+                time.sleep(server.latency(model) + prefill * server.prompt_delay_per_1k)
+                if server.should_fail():
+                    error = {"message": "Injected failure", "type": "server_error"}
+                    self._send_json(server.error_status, {"error": error})
+                elif request.get("stream"):
+                    self._send_stream(request)
+                else:
+                    completion = server.completion(request)
+                    tokens = completion["usage"]["completion_tokens"]
+                    time.sleep(server.token_delay * tokens)
+                    self._send_json(200, completion)
+
+            def _send_stream(self, request: dict) -> None:
+                with server._rng_lock:
+                    server.streams += 1
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for chunk in server.stream_chunks(request):
+                    self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+                    time.sleep(server.token_delay)
+                self._write_chunk(b"data: [DONE]\n\n")
+                self._write_chunk(b"")
+
+            def _write_chunk(self, data: bytes) -> None:
+                self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def _send_json(self, status: int, payload: dict) -> None:
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def start(self) -> "FakeOpenAIServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency", default="lognormal:300:0.6")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--token-delay-ms", type=float, default=0.0)
+    parser.add_argument("--payloads", help="JSON file of schema name to reply")
+    parser.add_argument("--low-confidence-rate", type=float, default=0.0)
+    parser.add_argument("--strong-models", default="gpt-4o,gpt-4.1")
+    parser.add_argument(
+        "--model-latency",
+        action="append",
+        default=[],
+        help="model=latency spec; may be repeated",
+    )
+    parser.add_argument("--prompt-ms-per-1k-tokens", type=float, default=0.0)
+    args = parser.parse_args()
+
+    payloads = None
+    if args.payloads:
+        with open(args.payloads, encoding="utf-8") as f:
+            payloads = json.load(f)
+    server = FakeOpenAIServer(
+        args.latency,
+        args.port,
+        args.seed,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        token_delay=args.token_delay_ms / 1000,
+        payloads=payloads,
+        low_confidence_rate=args.low_confidence_rate,
+        strong_models=args.strong_models.split(","),
+        model_latency=dict(spec.split("=", 1) for spec in args.model_latency),
+        prompt_delay_per_1k=args.prompt_ms_per_1k_tokens / 1000,
+    )
+    print(f"Fake OpenAI API listening on {server.base_url}")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
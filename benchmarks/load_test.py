@@ -0,0 +1,310 @@
+"""
+Load test of the Lambda handlers against the fake OpenAI server.
+
+Starts ``fake_openai_server`` and, for each handler, spawns ``--concurrency``
+worker processes. Each worker stands in for one Lambda container: it imports
+the handler module from scratch, then calls ``lambda_handler`` with synthetic
+API Gateway events one at a time. The first invocation of each worker is the
+cold start (reported with and without the module import); the rest are warm.
+
+Reports throughput, p50/p95/p99 latency, cold vs. warm timings, status codes,
+model requests, peak RSS and the mean of each per-invocation metric (phase
+timings, token counts) on warm invocations, and writes everything as JSON
+with the git commit so runs can be compared across commits.
+
+Inputs vary per request, so the result cache only helps with ``--result-cache``.
+Once warm, the reading generator serves pooled articles like it does in
+production.
+
+Usage:
+    python benchmarks/load_test.py [--handlers word,tense,writing,reading]
+        [--requests 200] [--concurrency 10] [--latency lognormal:300:0.6]
+        [--error-rate 0.0] [--output results.json]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+HANDLERS_DIR = os.path.join(BENCHMARKS_DIR, "..", "handlers")
+sys.path.insert(0, HANDLERS_DIR)
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from fake_openai_server import FakeOpenAIServer  # noqa: E402
+
+WORDS = ["run", "bright", "quickly", "serendipity", "borrow", "although"]
+TENSES = ["present simple", "past simple", "present perfect", "future simple"]
+SUMMARY_ARTICLE = (
+    "Honeybees communicate the location of flowers with a waggle dance. The "
+    "angle of the dance shows the direction and its length shows the distance."
+)
+
+
+def word_body(index: int) -> Dict[str, Any]:
+    word = WORDS[index % len(WORDS)]
+    return {"word": word, "sentence": f"I {word} every day, {index} times."}
+
+
+def tense_body(index: int) -> Dict[str, Any]:
+    return {
+        "verb_tense": TENSES[index % len(TENSES)],
+        "sentence": f"She has visited {index} museums this year.",
+    }
+
+
+def writing_body(index: int) -> Dict[str, Any]:
+    return {
+        "article": SUMMARY_ARTICLE,
+        "summary": f"Bees dance to share where flowers are. Attempt {index}.",
+    }
+
+
+# Handler key -> (module, HTTP method, request body builder)
+SCENARIOS: Dict[str, tuple] = {
+    "word": ("word_evaluator", "POST", word_body),
+    "tense": ("verb_tense_evaluator", "POST", tense_body),
+    "writing": ("writing_evaluator", "POST", writing_body),
+    "reading": ("reading_generator", "GET", None),
+}
+
+
+def build_event(
+    method: str, body_for: Callable[[int], Dict[str, Any]], index: int
+) -> Dict[str, Any]:
+    """Builds a synthetic API Gateway proxy event."""
+    return {
+        "httpMethod": method,
+        "headers": {"Content-Type": "application/json"},
+        "queryStringParameters": None,
+        "body": json.dumps(body_for(index)) if body_for else None,
+    }
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    if not latencies:
+        return {}
+    return {
+        "count": len(latencies),
+        "mean_ms": round(statistics.mean(latencies), 1),
+        "p50_ms": round(percentile(latencies, 0.50), 1),
+        "p95_ms": round(percentile(latencies, 0.95), 1),
+        "p99_ms": round(percentile(latencies, 0.99), 1),
+        "max_ms": round(max(latencies), 1),
+    }
+
+
+def worker(
+    scenario: str,
+    indexes: List[int],
+    base_url: str,
+    result_cache: bool,
+    ready,
+    start,
+    results,
+) -> None:
+    """Runs one simulated container; always reports, even on failure."""
+    report: Dict[str, Any] = {
+        "latencies": [],
+        "statuses": {},
+        "metrics": {},
+        "error": None,
+    }
+    try:
+        module_name, method, body_for = SCENARIOS[scenario]
+        started = time.perf_counter()
+        module = __import__(module_name)
+        report["import_ms"] = (time.perf_counter() - started) * 1000
+
+        import base_handler
+        from metrics import InMemoryMetricsSink
+        from openai import AsyncOpenAI
+        from parameter_cache import InMemoryParameterSource, ParameterCache
+        from result_cache import ResultCache
+
+        key = base_handler.OPENAI_API_KEY_PARAMETER
+        sink = InMemoryMetricsSink()
+        base_handler.reset_registry(
+            result_cache_factory=lambda: ResultCache(
+                max_entries=1024 if result_cache else 0
+            ),
+            async_openai_client_factory=lambda api_key: AsyncOpenAI(
+                api_key=api_key, base_url=base_url
+            ),
+            parameter_cache_factory=lambda: ParameterCache(
+                [InMemoryParameterSource({key: "sk-load-test"})]
+            ),
+            metrics_sink_factory=lambda: sink,
+        )
+    except Exception as e:
+        report["error"] = repr(e)
+        ready.set()
+        results.put(report)
+        return
+
+    ready.set()
+    start.wait()
+    for index in indexes:
+        event = build_event(method, body_for, index)
+        began = time.perf_counter()
+        try:
+            status = str(module.lambda_handler(event, None)["statusCode"])
+        except Exception as e:
+            status = type(e).__name__
+        report["latencies"].append((time.perf_counter() - began) * 1000)
+        report["statuses"][status] = report["statuses"].get(status, 0) + 1
+    for record in sink.records[1:]:
+        for name, (value, _) in record.metrics.items():
+            report["metrics"].setdefault(name, []).append(value)
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    report["peak_rss_mb"] = rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    results.put(report)
+
+
+def run_scenario(
+    scenario: str, server: FakeOpenAIServer, args: argparse.Namespace
+) -> Dict[str, Any]:
+    """Drives one handler with ``args.concurrency`` containers."""
+    context = multiprocessing.get_context("spawn")
+    ready_events = [context.Event() for _ in range(args.concurrency)]
+    start = context.Event()
+    results = context.Queue()
+    processes = [
+        context.Process(
+            target=worker,
+            args=(
+                scenario,
+                list(range(slot, args.requests, args.concurrency)),
+                server.base_url,
+                args.result_cache,
+                ready_events[slot],
+                start,
+                results,
+            ),
+        )
+        for slot in range(args.concurrency)
+    ]
+    for process in processes:
+        process.start()
+    for ready in ready_events:
+        ready.wait()
+
+    model_requests_before = server.requests
+    began = time.perf_counter()
+    start.set()
+    reports = [results.get() for _ in processes]
+    elapsed = time.perf_counter() - began
+    for process in processes:
+        process.join()
+
+    failures = [report["error"] for report in reports if report["error"]]
+    reports = [report for report in reports if not report["error"]]
+    latencies = [ms for report in reports for ms in report["latencies"]]
+    cold = [report["latencies"][0] for report in reports if report["latencies"]]
+    warm = [ms for report in reports for ms in report["latencies"][1:]]
+    statuses: Dict[str, int] = {}
+    warm_metrics: Dict[str, List[float]] = {}
+    for report in reports:
+        for status, count in report["statuses"].items():
+            statuses[status] = statuses.get(status, 0) + count
+        for name, values in report["metrics"].items():
+            warm_metrics.setdefault(name, []).extend(values)
+
+    return {
+        "requests": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency": summarize(latencies),
+        "cold": {
+            **summarize(cold),
+            "import_ms": round(
+                statistics.mean(report["import_ms"] for report in reports), 1
+            )
+            if reports
+            else None,
+        },
+        "warm": summarize(warm),
+        "warm_metric_means": {
+            name: round(statistics.mean(values), 2)
+            for name, values in sorted(warm_metrics.items())
+        },
+        "statuses": statuses,
+        "model_requests": server.requests - model_requests_before,
+        "peak_rss_mb": round(max(report["peak_rss_mb"] for report in reports), 1)
+        if reports
+        else None,
+        "worker_failures": failures,
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCHMARKS_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--handlers", default=",".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", default="lognormal:300:0.6")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--result-cache", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON results to this file")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.handlers.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown handlers: {', '.join(unknown)}")
+
+    results: Dict[str, Any] = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "config": vars(args),
+        "handlers": {},
+    }
+    with FakeOpenAIServer(
+        args.latency,
+        seed=args.seed,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+    ) as server:
+        for scenario in scenarios:
+            results["handlers"][scenario] = run_scenario(scenario, server, args)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,40 @@
+import argparse
+import hashlib
+import json
 import subprocess
+import sys
+import tempfile
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 import boto3
 import os
 import shutil
 
+from layer_optimizer import RUNTIME_PROVIDED, optimize_layer
+
 # Configuration
 BUCKET_NAME = "english-learning-artifacts"  # S3 bucket to store deployment artifacts
 REGION = "us-east-1"
 STACK_NAME = "EnglishLearningStack"
+# "split" (one function per endpoint) or "router" (one function for all)
+DEPLOYMENT_LAYOUT = os.environ.get("DEPLOYMENT_LAYOUT", "split")
+# "enabled" adds the lock table sharing identical model calls across containers
+DISTRIBUTED_SINGLE_FLIGHT = os.environ.get("DISTRIBUTED_SINGLE_FLIGHT", "disabled")
+# Evaluator model cascade, e.g. "gpt-4o-mini:0.8,gpt-4o"; empty keeps the defaults
+EVALUATOR_MODELS = os.environ.get("EVALUATOR_MODELS", "")
 LAYER_NAME = "EnglishLearningDependencies"  # Name of the Lambda layer
 LAYER_DIR = "dependencies_layer"  # Local folder for the layer content
 PYTHON_VERSION = "python3.12"  # Target Python version for the layer
+PLATFORM = "manylinux2014_x86_64"  # Target platform of the layer's wheels
+BUILD_DIR = ".build"  # Local build state: wheel cache and artifact hashes
+WHEEL_CACHE = os.environ.get("WHEEL_CACHE", os.path.join(BUILD_DIR, "wheels"))
+# A directory of wheels to build the layer from instead of PyPI (offline builds)
+WHEELHOUSE = os.environ.get("WHEELHOUSE")
+DOWNLOAD_WORKERS = 8  # Wheels downloaded in parallel
+LAYER_STAMP = ".layer-inputs.json"  # Records what the layer was built from
+LAYER_BUILD_VERSION = 2  # Bump to rebuild every layer after changing the build
+PACKAGED_TEMPLATE = "packaged.yaml"
 REQUIREMENTS = [
     "openai>=1.0.0",
     "pydantic",
@@ -17,57 +42,244 @@ REQUIREMENTS = [
     "typing-extensions",
     "annotated-types",
     "boto3",
+    # Optional speedups: faster JSON responses and brotli compression
+    "orjson",
+    "brotli",
 ]  # List of packages to include in the layer
 
 # Initialize AWS S3 client
 s3_client = boto3.client("s3", region_name=REGION)
 
 
-def prepare_layer_directory(layer_dir, python_version, requirements):
+def pip_platform_args(python_version):
+    """Arguments selecting wheels for the Lambda runtime rather than this machine."""
+    return [
+        "--platform",
+        PLATFORM,
+        "--implementation",
+        "cp",
+        "--python-version",
+        python_version.replace("python", "").replace(".", ""),
+        "--only-binary=:all:",
+    ]
+
+
+def index_args(wheelhouse):
+    """Arguments pointing pip at PyPI, or only at a local wheelhouse."""
+    if wheelhouse:
+        return ["--no-index", "--find-links", os.path.abspath(wheelhouse)]
+    return []
+
+
+def layer_inputs_hash(python_version, requirements, wheelhouse=None):
     """
-    Create the required folder structure
-    and install dependencies into it.
+    Hashes everything the layer is built from.
+
+    The layer is rebuilt only when this changes; requirements are compared as
+    a set, so reordering them does not trigger a rebuild.
     """
-    if os.path.exists(layer_dir):
-        print(
-            f"Layer already exists '{layer_dir}' REUSING... (delete folder for reinstall packages)"
+    inputs = {
+        "requirements": sorted(req.strip() for req in requirements),
+        "python_version": python_version,
+        "platform": PLATFORM,
+        "wheelhouse": bool(wheelhouse),
+        "runtime_provided": sorted(RUNTIME_PROVIDED),
+        "build_version": LAYER_BUILD_VERSION,
+    }
+    payload = json.dumps(inputs, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def read_layer_stamp(layer_dir):
+    """Returns the stamp of a built layer, or None if there is no valid one."""
+    try:
+        with open(os.path.join(layer_dir, LAYER_STAMP)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def resolve_requirements(python_version, requirements, wheelhouse=None):
+    """
+    Resolves the requirements to exact wheels without downloading them.
+
+    Returns:
+        A list of {"name", "version", "url", "sha256"} dictionaries
+    """
+    with tempfile.TemporaryDirectory() as scratch:
+        report_file = os.path.join(scratch, "report.json")
+        subprocess.check_call(
+            [
+                sys.executable,
+                "-m",
+                "pip",
+                "install",
+                "--dry-run",
+                "--ignore-installed",
+                "--quiet",
+                "--report",
+                report_file,
+                # Never written to with --dry-run, but required by --platform
+                "--target",
+                os.path.join(scratch, "target"),
+                *pip_platform_args(python_version),
+                *index_args(wheelhouse),
+                *requirements,
+            ]
         )
-        return
+        with open(report_file) as f:
+            report = json.load(f)
+    return [
+        {
+            "name": item["metadata"]["name"],
+            "version": item["metadata"]["version"],
+            "url": item["download_info"]["url"],
+            "sha256": item["download_info"]["archive_info"]["hashes"]["sha256"],
+        }
+        for item in report["install"]
+    ]
+
+
+def wheel_filename(wheel):
+    path = urllib.parse.urlparse(wheel["url"]).path
+    return urllib.parse.unquote(os.path.basename(path))
+
+
+def fetch_wheel(wheel, cache_dir):
+    """Returns the cached path of a wheel, downloading it if needed."""
+    filename = wheel_filename(wheel)
+    path = os.path.join(cache_dir, filename)
+    if os.path.exists(path) and file_sha256(path) == wheel["sha256"]:
+        return path
+
+    partial = f"{path}.part"
+    with urllib.request.urlopen(wheel["url"]) as response, open(partial, "wb") as f:
+        shutil.copyfileobj(response, f)
+    if file_sha256(partial) != wheel["sha256"]:
+        os.remove(partial)
+        raise ValueError(f"Hash mismatch for {filename}")
+    os.replace(partial, path)
+    return path
+
+
+def fetch_wheels(wheels, cache_dir, workers=DOWNLOAD_WORKERS):
+    """Fetches every resolved wheel into the cache, several at a time."""
+    os.makedirs(cache_dir, exist_ok=True)
+    missing = [
+        wheel["name"]
+        for wheel in wheels
+        if not os.path.exists(os.path.join(cache_dir, wheel_filename(wheel)))
+    ]
+    if missing:
+        print(f"Downloading {len(missing)} wheel(s): {', '.join(missing)}")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda wheel: fetch_wheel(wheel, cache_dir), wheels))
+
+
+def prepare_layer_directory(
+    layer_dir, python_version, requirements, wheelhouse=None, force=False
+):
+    """
+    Builds the dependency layer, unless it was already built from the same
+    inputs.
 
-    target = os.path.join(layer_dir, "python", "lib", python_version, "site-packages")
-    print(f"Creating layer directory structure at '{target}'...")
-    os.makedirs(target, exist_ok=True)
+    The requirements are resolved once, the wheels fetched in parallel into
+    the local wheel cache (skipping those already there), and installed into
+    a scratch directory that replaces the layer only once complete, so an
+    interrupted build never leaves a half-installed layer behind. The
+    installed layer is then slimmed and precompiled (see ``optimize_layer``);
+    a layer the handlers no longer import from is never swapped in.
 
-    # Create requirements.txt file
-    requirements_file = "requirements.txt"
-    with open(requirements_file, "w") as f:
-        for req in requirements:
-            f.write(f"{req}\n")
+    Returns:
+        The hash of the layer inputs
+    """
+    inputs_hash = layer_inputs_hash(python_version, requirements, wheelhouse)
+    stamp = read_layer_stamp(layer_dir)
+    if not force and stamp and stamp.get("inputs_hash") == inputs_hash:
+        print(f"Layer '{layer_dir}' is up to date ({inputs_hash[:12]}), reusing it.")
+        return inputs_hash
+
+    print(f"Resolving layer requirements for {python_version} ({PLATFORM})...")
+    wheels = resolve_requirements(python_version, requirements, wheelhouse)
+    paths = fetch_wheels(wheels, WHEEL_CACHE)
 
-    # Install all requirements at once to handle dependencies correctly
-    print(f"Installing requirements into '{target}'...")
+    scratch = f"{layer_dir}.tmp"
+    shutil.rmtree(scratch, ignore_errors=True)
+    target = os.path.join(scratch, "python", "lib", python_version, "site-packages")
+    print(f"Installing {len(paths)} wheel(s) into '{target}'...")
     subprocess.check_call(
         [
+            sys.executable,
+            "-m",
             "pip",
             "install",
-            "-r",
-            requirements_file,
-            "-t",
+            "--quiet",
+            "--no-deps",
+            "--no-index",
+            # Bytecode is compiled for the target Python by optimize_layer
+            "--no-compile",
+            "--target",
             target,
-            "--platform",
-            "manylinux2014_x86_64",
-            "--implementation",
-            "cp",
-            "--python-version",
-            python_version.replace("python", "").replace(".", ""),
-            "--only-binary=:all:",
-            "--upgrade",
+            *pip_platform_args(python_version),
+            *paths,
         ]
     )
+    optimization = optimize_layer(target, python_version)
+    with open(os.path.join(scratch, LAYER_STAMP), "w") as f:
+        json.dump(
+            {
+                "inputs_hash": inputs_hash,
+                "requirements": list(requirements),
+                "resolved": {wheel["name"]: wheel["version"] for wheel in wheels},
+                "optimization": optimization,
+            },
+            f,
+            indent=2,
+            sort_keys=True,
+        )
 
-    # Clean up requirements file
-    os.remove(requirements_file)
+    shutil.rmtree(layer_dir, ignore_errors=True)
+    os.replace(scratch, layer_dir)
     print("Layer directory prepared.")
+    return inputs_hash
+
+
+def tree_hash(digest, root):
+    """Adds the paths and contents of the files under ``root`` to a digest."""
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories[:] = sorted(d for d in subdirectories if d != "__pycache__")
+        for name in sorted(files):
+            if name.endswith((".pyc", ".pyo")):
+                continue
+            path = os.path.join(directory, name)
+            digest.update(os.path.relpath(path, root).encode("utf-8") + b"\0")
+            digest.update(file_sha256(path).encode("utf-8"))
+
+
+def artifacts_hash(layer_dir, bucket_name, region):
+    """
+    Hashes everything ``sam package`` uploads, and where it uploads it.
+
+    The layer is represented by its stamp, which holds the resolved version
+    of every package, so a rebuild that picks up new releases of the same
+    requirements is packaged again.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{bucket_name}|{region}".encode("utf-8"))
+    stamp = read_layer_stamp(layer_dir)
+    digest.update(json.dumps(stamp, sort_keys=True).encode("utf-8"))
+    tree_hash(digest, "handlers")
+    with open("template.yaml", "rb") as f:
+        digest.update(f.read())
+    return digest.hexdigest()
 
 
 def prepare_handlers_directory():
@@ -115,20 +327,53 @@ def create_bucket(bucket_name, region):
         raise
 
 
-def package_and_deploy(bucket_name, region, stack_name):
+def package_application(bucket_name, artifacts_key):
+    """
+    Runs ``sam package``, unless the artifacts are unchanged since the last
+    successful run.
+    """
+    hash_file = os.path.join(BUILD_DIR, "packaged.hash")
+    if os.path.exists(PACKAGED_TEMPLATE) and os.path.exists(hash_file):
+        with open(hash_file) as f:
+            if f.read().strip() == artifacts_key:
+                print("Artifacts unchanged since the last package, skipping it.")
+                return
+
+    print("Packaging the SAM application...")
+    subprocess.check_call(
+        [
+            "sam",
+            "package",
+            "--output-template-file",
+            PACKAGED_TEMPLATE,
+            "--s3-bucket",
+            bucket_name,
+        ]
+    )
+    os.makedirs(BUILD_DIR, exist_ok=True)
+    with open(hash_file, "w") as f:
+        f.write(artifacts_key)
+
+
+def package_and_deploy(
+    bucket_name,
+    region,
+    stack_name,
+    layout,
+    single_flight,
+    evaluator_models,
+    artifacts_key,
+):
+    overrides = [
+        f"DeploymentLayout={layout}",
+        f"DistributedSingleFlight={single_flight}",
+    ]
+    if evaluator_models:
+        # Empty keeps each handler's default model, like the template default
+        overrides.append(f"EvaluatorModels={evaluator_models}")
     try:
         # Package the SAM template
-        print("Packaging the SAM application...")
-        subprocess.check_call(
-            [
-                "sam",
-                "package",
-                "--output-template-file",
-                "packaged.yaml",
-                "--s3-bucket",
-                bucket_name,
-            ]
-        )
+        package_application(bucket_name, artifacts_key)
         # Deploy the packaged template
         print("Deploying the SAM application...")
         subprocess.check_call(
@@ -136,7 +381,7 @@ def package_and_deploy(bucket_name, region, stack_name):
                 "sam",
                 "deploy",
                 "--template-file",
-                "packaged.yaml",
+                PACKAGED_TEMPLATE,
                 "--region",
                 region,
                 "--capabilities",
@@ -145,7 +390,11 @@ def package_and_deploy(bucket_name, region, stack_name):
                 "CAPABILITY_AUTO_EXPAND",
                 "--stack-name",
                 stack_name,
+                "--parameter-overrides",
+                *overrides,
                 "--no-confirm-changeset",  # Skip confirmation for changesets
+                # Unchanged artifacts and parameters are not an error
+                "--no-fail-on-empty-changeset",
             ]
         )
     except subprocess.CalledProcessError as e:
@@ -154,12 +403,33 @@ def package_and_deploy(bucket_name, region, stack_name):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Build and deploy the stack.")
+    parser.add_argument(
+        "--layer-only",
+        action="store_true",
+        help="build the dependency layer and stop (works offline with WHEELHOUSE)",
+    )
+    parser.add_argument(
+        "--rebuild-layer",
+        action="store_true",
+        help="rebuild the layer even if its inputs are unchanged",
+    )
+    args = parser.parse_args()
+
     try:
         # Step 1: Prepare the handlers directory
         prepare_handlers_directory()
 
         # Step 2: Prepare the layer directory with required dependencies
-        prepare_layer_directory(LAYER_DIR, PYTHON_VERSION, REQUIREMENTS)
+        prepare_layer_directory(
+            LAYER_DIR,
+            PYTHON_VERSION,
+            REQUIREMENTS,
+            wheelhouse=WHEELHOUSE,
+            force=args.rebuild_layer,
+        )
+        if args.layer_only:
+            return
 
         # Step 3: Ensure the S3 bucket exists
         if not bucket_exists(BUCKET_NAME):
@@ -170,7 +440,15 @@ def main():
             print(f"Bucket '{BUCKET_NAME}' already exists.")
 
         # Step 4: Package and deploy the SAM application
-        package_and_deploy(BUCKET_NAME, REGION, STACK_NAME)
+        package_and_deploy(
+            BUCKET_NAME,
+            REGION,
+            STACK_NAME,
+            DEPLOYMENT_LAYOUT,
+            DISTRIBUTED_SINGLE_FLIGHT,
+            EVALUATOR_MODELS,
+            artifacts_hash(LAYER_DIR, BUCKET_NAME, REGION),
+        )
         print("Deployment completed successfully.")
 
     except Exception as e:
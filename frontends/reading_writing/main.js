@@ -1,7 +1,11 @@
 const API_ENDPOINT_GENERATOR = 'https://qrzq57k6qc.execute-api.us-east-1.amazonaws.com/Prod/api/v1/reading-generator';
 const API_ENDPOINT_EVALUATOR = 'https://qrzq57k6qc.execute-api.us-east-1.amazonaws.com/Prod/api/v1/writing-evaluator';
+// Function URL of the streaming generator (ReadingGeneratorStreamEndpoint output).
+// Leave empty to load articles from API_ENDPOINT_GENERATOR in one piece.
+const API_ENDPOINT_GENERATOR_STREAM = '';
 
 let currentArticle = '';
+let currentArticleId = null;
 let totalScore = 0;
 let timerInterval;
 let timeLeft = 300; // 5 minutes in seconds
@@ -40,13 +44,16 @@ async function fetchNewArticle() {
     articleContent.innerHTML = '<p class="text-center text-gray-600">Loading article...</p>';
 
     try {
-        const response = await fetch(API_ENDPOINT_GENERATOR);
-        const data = await response.json();
-        currentArticle = data.article+"...";
-
-        // Use Marked to convert markdown to HTML.
-        // This will convert markdown markers like ###, *phrase*, and \n to styled HTML.
-        articleContent.innerHTML = marked.parse(currentArticle);
+        if (API_ENDPOINT_GENERATOR_STREAM) {
+            try {
+                await streamArticle();
+            } catch (error) {
+                console.warn('Streaming failed, loading the article in one piece:', error);
+                await loadArticle();
+            }
+        } else {
+            await loadArticle();
+        }
 
         // Now that the article has loaded, show the timer and the "I'm Ready to Write" button.
         timerElement.style.display = '';
@@ -61,6 +68,70 @@ async function fetchNewArticle() {
     }
 }
 
+async function loadArticle() {
+    const response = await fetch(API_ENDPOINT_GENERATOR);
+    const data = await response.json();
+    currentArticle = data.article+"...";
+    currentArticleId = data.article_id || null;
+
+    // Use Marked to convert markdown to HTML.
+    // This will convert markdown markers like ###, *phrase*, and \n to styled HTML.
+    articleContent.innerHTML = marked.parse(currentArticle);
+}
+
+// Reads the Server-Sent Events of the streaming generator, rendering the
+// article as its chunks arrive: topic, chunk..., then done with the article_id.
+async function streamArticle() {
+    const response = await fetch(API_ENDPOINT_GENERATOR_STREAM);
+    if (!response.ok || !response.body) {
+        throw new Error(`Streaming request failed with status ${response.status}`);
+    }
+
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = '';
+    let article = '';
+    let articleId = null;
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += value;
+
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const { event, data } = parseServerSentEvent(buffer.slice(0, boundary));
+            buffer = buffer.slice(boundary + 2);
+            if (event === 'chunk') {
+                article += data;
+                articleContent.innerHTML = marked.parse(article);
+            } else if (event === 'done') {
+                articleId = data.article_id;
+            } else if (event === 'error') {
+                throw new Error(data.error);
+            }
+        }
+    }
+    if (articleId === null) {
+        throw new Error('Article stream ended before its done event');
+    }
+
+    currentArticle = article + "...";
+    currentArticleId = articleId;
+    articleContent.innerHTML = marked.parse(currentArticle);
+}
+
+function parseServerSentEvent(raw) {
+    let event = 'message';
+    const dataLines = [];
+    for (const line of raw.split('\n')) {
+        if (line.startsWith('event:')) {
+            event = line.slice(6).trim();
+        } else if (line.startsWith('data:')) {
+            dataLines.push(line.slice(5).trim());
+        }
+    }
+    return { event, data: JSON.parse(dataLines.join('\n')) };
+}
+
 function startTimer() {
     timeLeft = 300;
     updateTimerDisplay();
@@ -108,14 +179,18 @@ async function evaluateSummary() {
     submitSummaryBtn.innerHTML = '<span class="animate-pulse">Evaluating...</span>';
 
     try {
-        const response = await fetch(API_ENDPOINT_EVALUATOR, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                article: currentArticle,
-                summary: summaryInput.value
-            })
-        });
+        // Stored articles are sent by reference instead of in full
+        let response = await postSummary(
+            currentArticleId ? { article_id: currentArticleId } : { article: currentArticle }
+        );
+        if (currentArticleId && response.status === 400) {
+            const error = await response.clone().json().catch(() => ({}));
+            if (error.error === "Unknown 'article_id'") {
+                // The stored article is gone: send its text instead
+                currentArticleId = null;
+                response = await postSummary({ article: currentArticle });
+            }
+        }
 
         const evaluation = await response.json();
         displayResults(evaluation);
@@ -129,6 +204,14 @@ async function evaluateSummary() {
     }
 }
 
+function postSummary(articleFields) {
+    return fetch(API_ENDPOINT_EVALUATOR, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ ...articleFields, summary: summaryInput.value })
+    });
+}
+
 function displayResults(evaluation) {
     writingSection.classList.add('hidden');
     resultsSection.classList.remove('hidden');
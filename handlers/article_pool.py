@@ -0,0 +1,232 @@
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Callable
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+@dataclass
+class PooledArticle:
+    """A pre-generated article waiting to be served."""
+
+    topic: str
+    article: str
+    article_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    created_at: float = field(default_factory=time.time)
+
+
+class ArticlePoolBackend(ABC):
+    """Storage for pre-generated articles."""
+
+    @abstractmethod
+    def list_articles(self) -> List[PooledArticle]:
+        """Returns every stored article."""
+        pass
+
+    @abstractmethod
+    def put(self, article: PooledArticle) -> None:
+        """Stores an article."""
+        pass
+
+    @abstractmethod
+    def delete(self, article_id: str) -> None:
+        """Removes an article."""
+        pass
+
+
+class InMemoryArticlePoolBackend(ArticlePoolBackend):
+    """Process-local stand-in for the pool table, for tests and local runs."""
+
+    def __init__(self):
+        self._articles: Dict[str, PooledArticle] = {}
+        self._lock = threading.Lock()
+
+    def list_articles(self) -> List[PooledArticle]:
+        with self._lock:
+            return list(self._articles.values())
+
+    def put(self, article: PooledArticle) -> None:
+        with self._lock:
+            self._articles[article.article_id] = article
+
+    def delete(self, article_id: str) -> None:
+        with self._lock:
+            self._articles.pop(article_id, None)
+
+
+class DynamoDBArticlePoolBackend(ArticlePoolBackend):
+    """
+    DynamoDB-backed pool keyed on ``article_id``.
+
+    The pool holds a few articles per topic, so listing it is a small scan.
+    """
+
+    def __init__(self, table_name: str, client: Optional[Any] = None):
+        self.table_name = table_name
+        self._client = client
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            import boto3
+
+            self._client = boto3.client("dynamodb")
+        return self._client
+
+    def list_articles(self) -> List[PooledArticle]:
+        articles: List[PooledArticle] = []
+        kwargs: Dict[str, Any] = {"TableName": self.table_name}
+        while True:
+            response = self.client.scan(**kwargs)
+            for item in response.get("Items", []):
+                articles.append(
+                    PooledArticle(
+                        topic=item["topic"]["S"],
+                        article=item["article"]["S"],
+                        article_id=item["article_id"]["S"],
+                        created_at=float(item["created_at"]["N"]),
+                    )
+                )
+            if "LastEvaluatedKey" not in response:
+                return articles
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def put(self, article: PooledArticle) -> None:
+        self.client.put_item(
+            TableName=self.table_name,
+            Item={
+                "article_id": {"S": article.article_id},
+                "topic": {"S": article.topic},
+                "article": {"S": article.article},
+                "created_at": {"N": str(article.created_at)},
+            },
+        )
+
+    def delete(self, article_id: str) -> None:
+        self.client.delete_item(
+            TableName=self.table_name, Key={"article_id": {"S": article_id}}
+        )
+
+
+class ArticlePool:
+    """
+    Serves pre-generated articles and plans their refill.
+
+    The listing is cached in memory for ``listing_ttl_seconds`` so warm GETs
+    are served without touching the backend at all.
+    """
+
+    def __init__(
+        self,
+        backend: ArticlePoolBackend,
+        target_per_topic: int = 5,
+        max_age_seconds: float = 7 * 24 * 60 * 60,
+        listing_ttl_seconds: float = 60,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.backend = backend
+        self.target_per_topic = target_per_topic
+        self.max_age_seconds = max_age_seconds
+        self.listing_ttl_seconds = listing_ttl_seconds
+        self._clock = clock
+        self._listing: Optional[List[PooledArticle]] = None
+        self._listed_at = 0.0
+
+    @classmethod
+    def from_environment(cls) -> "ArticlePool":
+        """
+        Builds the pool from environment variables.
+
+        ``ARTICLE_POOL_TABLE`` selects the DynamoDB backend; without it the
+        pool lives in memory and only holds what this container generated.
+        """
+        table_name = os.environ.get("ARTICLE_POOL_TABLE")
+        backend: ArticlePoolBackend = (
+            DynamoDBArticlePoolBackend(table_name)
+            if table_name
+            else InMemoryArticlePoolBackend()
+        )
+        return cls(
+            backend,
+            target_per_topic=int(os.environ.get("ARTICLE_POOL_TARGET_PER_TOPIC", "5")),
+            max_age_seconds=float(
+                os.environ.get("ARTICLE_POOL_MAX_AGE_SECONDS", str(7 * 24 * 60 * 60))
+            ),
+        )
+
+    def articles(self, refresh: bool = False) -> List[PooledArticle]:
+        """Returns the unexpired articles, using the cached listing when fresh."""
+        now = self._clock()
+        if (
+            refresh
+            or self._listing is None
+            or now - self._listed_at > self.listing_ttl_seconds
+        ):
+            self._listing = self.backend.list_articles()
+            self._listed_at = now
+        return [
+            article
+            for article in self._listing
+            if now - article.created_at < self.max_age_seconds
+        ]
+
+    def random_article(self) -> Optional[PooledArticle]:
+        """Returns a random pooled article, or None if the pool is empty."""
+        try:
+            articles = self.articles()
+        except Exception as e:
+            logger.warning(f"Article pool unavailable: {str(e)}")
+            return None
+        return random.choice(articles) if articles else None
+
+    def add(self, article: PooledArticle) -> None:
+        """Stores an article and makes it visible to this container at once."""
+        self.backend.put(article)
+        if self._listing is not None:
+            self._listing.append(article)
+
+    def expire(self) -> int:
+        """
+        Deletes articles older than ``max_age_seconds``.
+
+        Returns:
+            The number of articles removed
+        """
+        now = self._clock()
+        expired = [
+            article
+            for article in self.backend.list_articles()
+            if now - article.created_at >= self.max_age_seconds
+        ]
+        for article in expired:
+            self.backend.delete(article.article_id)
+        self._listing = None
+        return len(expired)
+
+    def shortfall(self, topics: List[str]) -> Dict[str, int]:
+        """
+        Returns how many articles each topic needs to reach its target.
+
+        Args:
+            topics: All topics the pool should cover
+
+        Returns:
+            Mapping of topic to missing article count, for topics below target
+        """
+        counts = {topic: 0 for topic in topics}
+        for article in self.articles(refresh=True):
+            if article.topic in counts:
+                counts[article.topic] += 1
+        return {
+            topic: self.target_per_topic - count
+            for topic, count in counts.items()
+            if count < self.target_per_topic
+        }
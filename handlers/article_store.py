@@ -0,0 +1,215 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, Optional, List
+
+from result_cache import LRUCache
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+@dataclass
+class ArticleDigest:
+    """Compact reference material used to grade summaries of an article."""
+
+    key_points: List[str] = field(
+        metadata={"description": "The article's main points, one short sentence each"}
+    )
+    reference_summary: str = field(
+        metadata={"description": "A model summary of the article in 2-3 sentences"}
+    )
+
+
+@dataclass
+class ArticleNotes:
+    """Condensed notes on one part of a long article."""
+
+    notes: List[str] = field(
+        metadata={"description": "The part's facts, events and ideas, in order"}
+    )
+
+
+@dataclass
+class StoredArticle:
+    """A generated article stored under its content hash."""
+
+    article_id: str
+    topic: str
+    article: str
+    digest: Optional[ArticleDigest] = None
+    created_at: float = field(default_factory=time.time)
+
+
+def article_id_for(article: str) -> str:
+    """Returns the content-addressed id of an article's text."""
+    return hashlib.sha256(article.strip().encode("utf-8")).hexdigest()[:32]
+
+
+def digest_messages(article: str) -> List[Dict[str, str]]:
+    """Builds the chat messages asking the model for an ``ArticleDigest``."""
+    return [
+        {
+            "role": "system",
+            "content": (
+                "You condense articles into reference material for grading summaries."
+            ),
+        },
+        {
+            "role": "user",
+            "content": (
+                f"Article:\n{article}\n\n"
+                "List the article's key points (3 to 6 short sentences) and write a "
+                "reference summary of 2-3 sentences."
+            ),
+        },
+    ]
+
+
+def condense_messages(part: str, max_notes: int) -> List[Dict[str, str]]:
+    """Builds the chat messages asking the model for ``ArticleNotes`` on a part."""
+    return [
+        {
+            "role": "system",
+            "content": (
+                "You condense parts of long articles into notes for grading "
+                "summaries of the whole article."
+            ),
+        },
+        {
+            "role": "user",
+            "content": (
+                f"Article part:\n{part}\n\n"
+                f"List the facts, events and ideas of this part in order, in at "
+                f"most {max_notes} short sentences."
+            ),
+        },
+    ]
+
+
+class ArticleStoreBackend(ABC):
+    """Storage for generated articles and their digests."""
+
+    @abstractmethod
+    def get(self, article_id: str) -> Optional[StoredArticle]:
+        """Returns the article, or None if it is unknown."""
+        pass
+
+    @abstractmethod
+    def put(self, article: StoredArticle) -> None:
+        """Stores (or replaces) an article."""
+        pass
+
+
+class InMemoryArticleStoreBackend(ArticleStoreBackend):
+    """Process-local stand-in for the article table, for tests and local runs."""
+
+    def __init__(self):
+        self._articles: Dict[str, StoredArticle] = {}
+        self._lock = threading.Lock()
+
+    def get(self, article_id: str) -> Optional[StoredArticle]:
+        with self._lock:
+            return self._articles.get(article_id)
+
+    def put(self, article: StoredArticle) -> None:
+        with self._lock:
+            self._articles[article.article_id] = article
+
+
+class DynamoDBArticleStoreBackend(ArticleStoreBackend):
+    """
+    DynamoDB-backed article store keyed on ``article_id``.
+
+    ``expires_at`` should be configured as the table's TTL attribute.
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        ttl_seconds: float = 30 * 24 * 60 * 60,
+        client: Optional[Any] = None,
+    ):
+        self.table_name = table_name
+        self.ttl_seconds = ttl_seconds
+        self._client = client
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            import boto3
+
+            self._client = boto3.client("dynamodb")
+        return self._client
+
+    def get(self, article_id: str) -> Optional[StoredArticle]:
+        response = self.client.get_item(
+            TableName=self.table_name, Key={"article_id": {"S": article_id}}
+        )
+        item = response.get("Item")
+        if not item:
+            return None
+        digest = None
+        if "digest" in item:
+            digest = ArticleDigest(**json.loads(item["digest"]["S"]))
+        return StoredArticle(
+            article_id=article_id,
+            topic=item["topic"]["S"],
+            article=item["article"]["S"],
+            digest=digest,
+            created_at=float(item["created_at"]["N"]),
+        )
+
+    def put(self, article: StoredArticle) -> None:
+        item = {
+            "article_id": {"S": article.article_id},
+            "topic": {"S": article.topic},
+            "article": {"S": article.article},
+            "created_at": {"N": str(article.created_at)},
+            "expires_at": {"N": str(int(article.created_at + self.ttl_seconds))},
+        }
+        if article.digest is not None:
+            item["digest"] = {"S": json.dumps(asdict(article.digest))}
+        self.client.put_item(TableName=self.table_name, Item=item)
+
+
+class ArticleStore:
+    """Article store with an in-process LRU in front of the backend."""
+
+    def __init__(self, backend: ArticleStoreBackend, max_cached: int = 256):
+        self.backend = backend
+        self._cache = LRUCache(max_cached, ttl_seconds=60 * 60)
+
+    @classmethod
+    def from_environment(cls) -> "ArticleStore":
+        """
+        Builds the store from environment variables.
+
+        ``ARTICLE_STORE_TABLE`` selects the DynamoDB backend; without it the
+        store lives in memory and only holds what this container generated.
+        """
+        table_name = os.environ.get("ARTICLE_STORE_TABLE")
+        backend: ArticleStoreBackend = (
+            DynamoDBArticleStoreBackend(table_name)
+            if table_name
+            else InMemoryArticleStoreBackend()
+        )
+        return cls(backend)
+
+    def get(self, article_id: str) -> Optional[StoredArticle]:
+        article = self._cache.get(article_id)
+        if article is None:
+            article = self.backend.get(article_id)
+            if article is not None:
+                self._cache.put(article_id, article)
+        return article
+
+    def put(self, article: StoredArticle) -> None:
+        self.backend.put(article)
+        self._cache.put(article.article_id, article)
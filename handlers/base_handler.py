@@ -1,11 +1,66 @@
+import asyncio
+import base64
+import binascii
 import json
 import logging
+import sys
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, TypeVar, Generic
-from dataclasses import dataclass
-import boto3
-from botocore.exceptions import ClientError
-from openai import OpenAI
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Dict,
+    Any,
+    Optional,
+    TypeVar,
+    Generic,
+    Type,
+    Callable,
+    List,
+    Union,
+    Awaitable,
+    Coroutine,
+    Tuple,
+    get_type_hints,
+    get_origin,
+    get_args,
+    Iterator,
+    AsyncIterator,
+    TYPE_CHECKING,
+)
+from dataclasses import dataclass, field, fields, is_dataclass
+
+from model_cascade import (
+    CONFIDENCE_INSTRUCTION,
+    CascadeStats,
+    ModelTier,
+    cascade_stats,
+    record_model_usage,
+    tiers_from_environment,
+    track_usage,
+    with_confidence,
+    without_confidence,
+)
+from metrics import (
+    InvocationMetrics,
+    MetricsSink,
+    current_metrics,
+    record_invocation,
+    sink_from_environment,
+)
+from near_duplicate import NearDuplicateIndex
+from parameter_cache import ParameterCache, ParameterError
+from response_encoding import dumps, encode_response
+from result_cache import ResultCache, make_cache_key
+from single_flight import DistributedSingleFlight, SingleFlight
+
+# boto3 and openai take most of a cold start to import, so they are imported
+# on first use; OPTIONS and invalid requests never load them.
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
 
 
 # Configure logging
@@ -15,8 +70,35 @@ logger.setLevel(logging.INFO)
 # Type variable for request/response body types
 RequestT = TypeVar("RequestT")
 ResponseT = TypeVar("ResponseT")
+T = TypeVar("T")
 
 MODEL = "gpt-4o-mini"
+OPENAI_API_KEY_PARAMETER = "/EnglishLearning/OPENAI_API_KEY"
+UNEXPECTED_ERROR_MESSAGE = "An unexpected error occurred. Please try again later."
+INVALID_MODEL_RESPONSE_MESSAGE = (
+    "The language model returned an invalid response. Please try again."
+)
+DEADLINE_EXCEEDED_MESSAGE = (
+    "The request could not be completed in time. Please try again."
+)
+
+# Matches the function Timeout in template.yaml; used when there is no context
+DEFAULT_DEADLINE_SECONDS = 29.0
+# Time kept back to serialize the response before Lambda kills the invocation
+DEADLINE_SAFETY_MARGIN_SECONDS = 0.5
+
+# Keyword arguments for the botocore Config of the SSM client
+SSM_CLIENT_CONFIG: Dict[str, Any] = {
+    "connect_timeout": 1,
+    "read_timeout": 2,
+    "retries": {"max_attempts": 2, "mode": "standard"},
+}
+
+# Threads for blocking cache and lock table calls: enough for every item of
+# a batch to wait on its lookup at once
+BLOCKING_IO_WORKERS = 32
+
+HandlerT = TypeVar("HandlerT", bound="AsyncBaseLambdaHandler")
 
 
 class ConfigError(Exception):
@@ -31,6 +113,31 @@ class ValidationError(Exception):
     pass
 
 
+class DeadlineExceeded(Exception):
+    """Raised when the invocation has no time left for the next step."""
+
+    pass
+
+
+class StructuredOutputError(Exception):
+    """Raised when model output does not match the expected response schema."""
+
+    pass
+
+
+def is_timeout_error(error: BaseException) -> bool:
+    """
+    Returns whether an error means the invocation ran out of time.
+
+    An ``openai.APITimeoutError`` can only have been raised once openai is
+    loaded, so the check never imports it.
+    """
+    if isinstance(error, DeadlineExceeded):
+        return True
+    openai = sys.modules.get("openai")
+    return openai is not None and isinstance(error, openai.APITimeoutError)
+
+
 @dataclass
 class APIGatewayEvent:
     """Structured representation of API Gateway event."""
@@ -38,18 +145,53 @@ class APIGatewayEvent:
     http_method: str
     body: Optional[str]
     headers: Dict[str, str]
+    query_parameters: Dict[str, str] = field(default_factory=dict)
 
     @classmethod
     def from_dict(cls, event: Dict[str, Any]) -> "APIGatewayEvent":
+        body = event.get("body")
+        if body and event.get("isBase64Encoded"):
+            # The API treats every media type as binary so that compressed
+            # responses pass through, which base64-encodes request bodies too
+            body = base64.b64decode(body).decode("utf-8")
         return cls(
             http_method=event.get("httpMethod", ""),
-            body=event.get("body"),
-            headers=event.get("headers", {}),
+            body=body,
+            headers=event.get("headers") or {},
+            query_parameters=event.get("queryStringParameters") or {},
         )
 
+    def header(self, name: str, default: str = "") -> str:
+        """Returns a header value, matching the name case-insensitively."""
+        name = name.lower()
+        for key, value in self.headers.items():
+            if key.lower() == name:
+                return value
+        return default
+
+
+@dataclass
+class BatchRequest(Generic[RequestT]):
+    """
+    A batch of independently validated requests.
+
+    Attributes:
+        items: The validated requests, or None where validation failed
+        errors: Validation error messages keyed by item index
+    """
+
+    items: List[Optional[RequestT]]
+    errors: Dict[int, str] = field(default_factory=dict)
+
 
 class APIGatewayResponse:
-    """Helper class to create consistent API Gateway responses."""
+    """
+    Helper class to create consistent API Gateway responses.
+
+    Bodies are serialized with orjson when it is installed, and successful
+    responses are compressed with brotli or gzip for clients that send a
+    matching ``Accept-Encoding`` (see ``encode_response``).
+    """
 
     CORS_HEADERS = {
         "Access-Control-Allow-Origin": "*",
@@ -58,21 +200,30 @@ class APIGatewayResponse:
     }
 
     @staticmethod
-    def success(body: Dict[str, Any]) -> Dict[str, Any]:
-        return {
+    def success(body: Dict[str, Any], accept_encoding: str = "") -> Dict[str, Any]:
+        response = {
             "statusCode": 200,
-            "headers": APIGatewayResponse.CORS_HEADERS,
-            "body": json.dumps(body),
+            "headers": {
+                **APIGatewayResponse.CORS_HEADERS,
+                "Content-Type": "application/json",
+            },
+            "body": dumps(body),
         }
+        return encode_response(response, accept_encoding)
 
     @staticmethod
     def error(status_code: int, message: str) -> Dict[str, Any]:
         return {
             "statusCode": status_code,
             "headers": APIGatewayResponse.CORS_HEADERS,
-            "body": json.dumps({"error": message}),
+            "body": dumps({"error": message}),
         }
 
+    @staticmethod
+    def format_event(event: str, data: Any) -> str:
+        """Formats one Server-Sent Event with a JSON-encoded data field."""
+        return f"event: {event}\ndata: {dumps(data)}\n\n"
+
     @staticmethod
     def options() -> Dict[str, Any]:
         return {
@@ -82,16 +233,567 @@ class APIGatewayResponse:
         }
 
 
-class SSMParameterStore:
-    """Manages AWS Systems Manager Parameter Store interactions."""
+class Deadline:
+    """
+    Time budget of one invocation.
+
+    Built from ``context.get_remaining_time_in_millis()`` and made visible to
+    every step of the request (parameter fetch, model calls, output repair)
+    through ``current_deadline``.
+    """
+
+    def __init__(self, seconds: float, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self.expires_at = clock() + seconds
+
+    @classmethod
+    def from_context(
+        cls, context: Any, safety_margin: float = DEADLINE_SAFETY_MARGIN_SECONDS
+    ) -> "Deadline":
+        """Builds the deadline of a Lambda invocation, minus a safety margin."""
+        get_remaining = getattr(context, "get_remaining_time_in_millis", None)
+        if callable(get_remaining):
+            seconds = get_remaining() / 1000
+        else:
+            seconds = DEFAULT_DEADLINE_SECONDS
+        return cls(seconds - safety_margin)
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline."""
+        return max(0.0, self.expires_at - self._clock())
+
+    def require(self, seconds: float, step: str) -> None:
+        """
+        Ensures at least ``seconds`` are left for ``step``.
+
+        Raises:
+            DeadlineExceeded: If less time is left
+        """
+        remaining = self.remaining()
+        if remaining < seconds:
+            raise DeadlineExceeded(
+                f"{remaining:.2f}s left, {step} needs at least {seconds:.2f}s"
+            )
 
-    def __init__(self):
-        self.client = boto3.client("ssm")
-        self._parameters: Dict[str, str] = {}
+    def attempt_budget(
+        self, min_attempt_seconds: float, max_attempts: int
+    ) -> Tuple[float, int]:
+        """
+        Splits the remaining time into retryable attempts.
+
+        Args:
+            min_attempt_seconds: Shortest useful timeout for one attempt
+            max_attempts: Upper bound on attempts
+
+        Returns:
+            Tuple of per-attempt timeout in seconds and number of attempts
+        """
+        remaining = self.remaining()
+        attempts = max(1, min(max_attempts, int(remaining // min_attempt_seconds)))
+        return remaining / attempts, attempts
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar(
+    "current_deadline", default=None
+)
+
+
+@contextmanager
+def invocation_deadline(context: Any) -> Iterator[Deadline]:
+    """Makes the deadline of a Lambda invocation current for its duration."""
+    deadline = Deadline.from_context(context)
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def current_deadline() -> Deadline:
+    """Returns the deadline of the running invocation (a default one outside)."""
+    deadline = _current_deadline.get()
+    return deadline if deadline is not None else Deadline(DEFAULT_DEADLINE_SECONDS)
+
+
+def json_schema(response_type: type) -> Dict[str, Any]:
+    """
+    Derives a strict JSON schema from a response dataclass.
+
+    Supports str, int, float, bool, List[...], Optional[...] and nested
+    dataclasses. Field metadata may add a ``description``; ``minimum`` and
+    ``maximum`` are enforced by ``parse_structured`` rather than the schema.
+
+    Args:
+        response_type: The dataclass describing the model's reply
+
+    Returns:
+        A JSON schema usable with ``response_format``
+    """
+    hints = get_type_hints(response_type)
+    properties = {
+        f.name: _field_schema(hints[f.name], f.metadata) for f in fields(response_type)
+    }
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
+def _field_schema(annotation: Any, metadata: Any = None) -> Dict[str, Any]:
+    origin = get_origin(annotation)
+    if is_dataclass(annotation):
+        schema = json_schema(annotation)
+    elif annotation is bool:
+        schema = {"type": "boolean"}
+    elif annotation is int:
+        schema = {"type": "integer"}
+    elif annotation is float:
+        schema = {"type": "number"}
+    elif annotation is str:
+        schema = {"type": "string"}
+    elif origin is list:
+        schema = {"type": "array", "items": _field_schema(get_args(annotation)[0])}
+    elif origin is Union and type(None) in get_args(annotation):
+        (inner,) = [arg for arg in get_args(annotation) if arg is not type(None)]
+        schema = {"anyOf": [_field_schema(inner), {"type": "null"}]}
+    else:
+        raise TypeError(f"Unsupported response field type: {annotation}")
+
+    if metadata and "description" in metadata:
+        schema["description"] = metadata["description"]
+    return schema
+
+
+def parse_structured(text: str, response_type: Type[T]) -> T:
+    """
+    Parses and validates model output into a response dataclass.
+
+    Args:
+        text: The raw message content returned by the model
+        response_type: The dataclass describing the expected reply
+
+    Returns:
+        An instance of ``response_type``
+
+    Raises:
+        StructuredOutputError: If the text is not valid JSON for the schema
+    """
+    try:
+        data = json.loads(text)
+    except (TypeError, json.JSONDecodeError) as e:
+        raise StructuredOutputError(f"response is not valid JSON: {str(e)}") from e
+    return _build(response_type, data, response_type.__name__)
+
+
+def _build(annotation: Any, value: Any, path: str, metadata: Any = None) -> Any:
+    origin = get_origin(annotation)
+    if is_dataclass(annotation):
+        if not isinstance(value, dict):
+            raise StructuredOutputError(f"{path} must be an object")
+        hints = get_type_hints(annotation)
+        missing = [f.name for f in fields(annotation) if f.name not in value]
+        if missing:
+            raise StructuredOutputError(f"{path} is missing {', '.join(missing)}")
+        return annotation(
+            **{
+                f.name: _build(
+                    hints[f.name], value[f.name], f"{path}.{f.name}", f.metadata
+                )
+                for f in fields(annotation)
+            }
+        )
+    if origin is Union and type(None) in get_args(annotation):
+        if value is None:
+            return None
+        (inner,) = [arg for arg in get_args(annotation) if arg is not type(None)]
+        return _build(inner, value, path, metadata)
+    if origin is list:
+        if not isinstance(value, list):
+            raise StructuredOutputError(f"{path} must be a list")
+        (inner,) = get_args(annotation)
+        return [_build(inner, item, f"{path}[{i}]") for i, item in enumerate(value)]
+    if annotation is bool:
+        if not isinstance(value, bool):
+            raise StructuredOutputError(f"{path} must be a boolean")
+        return value
+    if annotation in (int, float):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise StructuredOutputError(f"{path} must be a number")
+        if annotation is int and value != int(value):
+            raise StructuredOutputError(f"{path} must be an integer")
+        value = annotation(value)
+        metadata = metadata or {}
+        if "minimum" in metadata and value < metadata["minimum"]:
+            raise StructuredOutputError(f"{path} must be >= {metadata['minimum']}")
+        if "maximum" in metadata and value > metadata["maximum"]:
+            raise StructuredOutputError(f"{path} must be <= {metadata['maximum']}")
+        return value
+    if annotation is str:
+        if not isinstance(value, str):
+            raise StructuredOutputError(f"{path} must be a string")
+        return value.strip()
+    raise TypeError(f"Unsupported response field type: {annotation}")
+
+
+@dataclass(frozen=True)
+class HedgingPolicy:
+    """
+    Configuration for hedged model calls.
+
+    A duplicate request is sent when the first has not returned after the
+    ``percentile`` of recently observed latencies (``initial_delay_seconds``
+    until ``min_samples`` calls have completed), clamped to
+    ``[min_delay_seconds, max_delay_seconds]``. Every call earns
+    ``max_extra_ratio`` of a hedge credit, up to ``burst`` credits, and each
+    hedge spends one, so duplicates stay below that share of traffic.
+    """
+
+    percentile: float = 0.95
+    initial_delay_seconds: float = 5.0
+    min_delay_seconds: float = 0.5
+    max_delay_seconds: float = 15.0
+    min_samples: int = 20
+    window: int = 500
+    max_extra_ratio: float = 0.05
+    burst: float = 5.0
+
+
+class Hedger:
+    """Latency history and hedge budget of one handler."""
+
+    def __init__(self, policy: HedgingPolicy):
+        self.policy = policy
+        self._latencies: deque = deque(maxlen=policy.window)
+        self._credits = policy.burst
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def delay(self) -> float:
+        """Seconds to wait for the first request before hedging."""
+        policy = self.policy
+        if len(self._latencies) < policy.min_samples:
+            delay = policy.initial_delay_seconds
+        else:
+            ordered = sorted(self._latencies)
+            index = min(len(ordered) - 1, int(policy.percentile * len(ordered)))
+            delay = ordered[index]
+        return min(policy.max_delay_seconds, max(policy.min_delay_seconds, delay))
+
+    def record(self, latency: float) -> None:
+        self._latencies.append(latency)
+
+    def try_acquire(self) -> bool:
+        """Spends one hedge credit if the budget allows it."""
+        if self._credits < 1:
+            return False
+        self._credits -= 1
+        self.hedges += 1
+        return True
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Runs ``call``, racing a duplicate against it if it is slow.
+
+        The first successful result wins and the other request is cancelled;
+        if one attempt fails the other is still awaited.
+        """
+        self.calls += 1
+        self._credits = min(
+            self.policy.burst, self._credits + self.policy.max_extra_ratio
+        )
+        start = time.monotonic()
+        primary = asyncio.ensure_future(call())
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self.delay())
+            if not done and self.try_acquire():
+                pending.add(asyncio.ensure_future(call()))
+
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        self.record(time.monotonic() - start)
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "delay_seconds": round(self.delay(), 3),
+        }
+
+
+@dataclass
+class StructuredOutputStats:
+    """
+    Process-wide counters for structured model output.
+
+    Each invocation also emits its own as ``StructuredOutputParseFailures``,
+    ``StructuredOutputRepairs`` and ``StructuredOutputExhausted``.
+    """
+
+    calls: int = 0
+    parse_failures: int = 0
+    repairs: int = 0
+    exhausted: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "parse_failures": self.parse_failures,
+            "repairs": self.repairs,
+            "exhausted": self.exhausted,
+        }
+
+
+structured_output_stats: Dict[str, StructuredOutputStats] = {}
+
+
+def default_ssm_client() -> Any:
+    """Builds the SSM client used when no factory is configured."""
+    import boto3
+    from botocore.config import Config
+
+    return boto3.client("ssm", config=Config(**SSM_CLIENT_CONFIG))
+
+
+def default_async_openai_client(api_key: str) -> "AsyncOpenAI":
+    """Builds the AsyncOpenAI client used when no factory is configured."""
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI(api_key=api_key)
+
+
+class ClientRegistry:
+    """
+    Process-wide registry of handlers and clients.
+
+    Lambda keeps the module loaded between warm invocations, so anything stored
+    here (handler instances, the SSM client, the parameter cache, the OpenAI
+    clients with their HTTP connection pools and the asyncio event loop) lives
+    for the life of the container.
+    """
+
+    def __init__(
+        self,
+        ssm_client_factory: Optional[Callable[[], Any]] = None,
+        result_cache_factory: Optional[Callable[[], ResultCache]] = None,
+        async_openai_client_factory: Optional[Callable[[str], Any]] = None,
+        parameter_cache_factory: Optional[Callable[[], ParameterCache]] = None,
+        metrics_sink_factory: Optional[Callable[[], MetricsSink]] = None,
+    ):
+        self._lock = threading.RLock()
+        self._event_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._configure(
+            ssm_client_factory,
+            result_cache_factory,
+            async_openai_client_factory,
+            parameter_cache_factory,
+            metrics_sink_factory,
+        )
+
+    def _configure(
+        self,
+        ssm_client_factory: Optional[Callable[[], Any]],
+        result_cache_factory: Optional[Callable[[], ResultCache]],
+        async_openai_client_factory: Optional[Callable[[str], Any]],
+        parameter_cache_factory: Optional[Callable[[], ParameterCache]],
+        metrics_sink_factory: Optional[Callable[[], MetricsSink]],
+    ) -> None:
+        self._ssm_client_factory = ssm_client_factory or default_ssm_client
+        self._async_openai_client_factory = (
+            async_openai_client_factory or default_async_openai_client
+        )
+        self._result_cache_factory = (
+            result_cache_factory or ResultCache.from_environment
+        )
+        self._parameter_cache_factory = parameter_cache_factory or (
+            lambda: ParameterCache.from_environment(lambda: self.ssm_client)
+        )
+        self._metrics_sink_factory = metrics_sink_factory or sink_from_environment
+        self._ssm_client: Optional[Any] = None
+        self._result_cache: Optional[ResultCache] = None
+        self._parameter_cache: Optional[ParameterCache] = None
+        self._metrics_sink: Optional[MetricsSink] = None
+        self._async_openai_clients: Dict[str, "AsyncOpenAI"] = {}
+        self._handlers: Dict[type, "AsyncBaseLambdaHandler"] = {}
+        self._shared: Dict[str, Any] = {}
+
+    @property
+    def ssm_client(self) -> Any:
+        """Shared boto3 SSM client, created on first use."""
+        with self._lock:
+            if self._ssm_client is None:
+                self._ssm_client = self._ssm_client_factory()
+            return self._ssm_client
+
+    @property
+    def result_cache(self) -> ResultCache:
+        """Shared evaluation result cache, created on first use."""
+        with self._lock:
+            if self._result_cache is None:
+                self._result_cache = self._result_cache_factory()
+            return self._result_cache
+
+    @property
+    def parameter_cache(self) -> ParameterCache:
+        """Shared cache of decrypted parameters, created on first use."""
+        with self._lock:
+            if self._parameter_cache is None:
+                self._parameter_cache = self._parameter_cache_factory()
+            return self._parameter_cache
+
+    @property
+    def metrics_sink(self) -> MetricsSink:
+        """Destination of every handler's invocation metrics."""
+        with self._lock:
+            if self._metrics_sink is None:
+                self._metrics_sink = self._metrics_sink_factory()
+            return self._metrics_sink
+
+    @property
+    def event_loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Event loop reused by every asynchronous handler in the container.
+
+        Async clients bind their connection pools to the loop they first run
+        on, so keeping one loop is what lets those pools survive invocations.
+        Its default executor runs the blocking I/O of ``asyncio.to_thread``
+        (cache and lock table calls) with room for a full batch.
+        """
+        with self._lock:
+            if self._event_loop is None or self._event_loop.is_closed():
+                self._event_loop = asyncio.new_event_loop()
+                self._event_loop.set_default_executor(
+                    ThreadPoolExecutor(max_workers=BLOCKING_IO_WORKERS)
+                )
+            return self._event_loop
+
+    def run(self, coroutine: Awaitable[T]) -> T:
+        """Runs a coroutine to completion on the container's event loop."""
+        return self.event_loop.run_until_complete(coroutine)
+
+    def async_openai_client(self, api_key: str) -> "AsyncOpenAI":
+        """Returns the shared AsyncOpenAI client for an API key."""
+        with self._lock:
+            if api_key not in self._async_openai_clients:
+                self._async_openai_clients[api_key] = (
+                    self._async_openai_client_factory(api_key)
+                )
+            return self._async_openai_clients[api_key]
+
+    def shared(self, name: str, factory: Callable[[], T]) -> T:
+        """
+        Returns a container-wide object, building it with ``factory`` once.
+
+        Used for state that several handlers share, such as stores.
+        """
+        with self._lock:
+            if name not in self._shared:
+                self._shared[name] = factory()
+            return self._shared[name]
+
+    def handler(self, handler_cls: Type[HandlerT]) -> HandlerT:
+        """Returns the container-wide instance of a handler class."""
+        with self._lock:
+            if handler_cls not in self._handlers:
+                self._handlers[handler_cls] = handler_cls()
+            return self._handlers[handler_cls]
+
+    def reset(
+        self,
+        ssm_client_factory: Optional[Callable[[], Any]] = None,
+        result_cache_factory: Optional[Callable[[], ResultCache]] = None,
+        async_openai_client_factory: Optional[Callable[[str], Any]] = None,
+        parameter_cache_factory: Optional[Callable[[], ParameterCache]] = None,
+        metrics_sink_factory: Optional[Callable[[], MetricsSink]] = None,
+    ) -> None:
+        """
+        Drops every cached handler, client, parameter and result.
+
+        Intended for tests and benchmarks; optional factories replace the
+        defaults used to build the SSM client, OpenAI clients, result cache,
+        parameter cache and metrics sink.
+        """
+        with self._lock:
+            if self._event_loop is not None and not self._event_loop.is_closed():
+                for client in self._async_openai_clients.values():
+                    close = getattr(client, "close", None)
+                    if callable(close):
+                        self._event_loop.run_until_complete(close())
+                self._event_loop.run_until_complete(
+                    self._event_loop.shutdown_default_executor()
+                )
+                self._event_loop.close()
+            self._event_loop = None
+            self._configure(
+                ssm_client_factory,
+                result_cache_factory,
+                async_openai_client_factory,
+                parameter_cache_factory,
+                metrics_sink_factory,
+            )
+
+
+registry = ClientRegistry()
+
+
+def get_handler(handler_cls: Type[HandlerT]) -> HandlerT:
+    """Returns the warm, container-wide instance of ``handler_cls``."""
+    return registry.handler(handler_cls)
+
+
+def reset_registry(
+    ssm_client_factory: Optional[Callable[[], Any]] = None,
+    result_cache_factory: Optional[Callable[[], ResultCache]] = None,
+    async_openai_client_factory: Optional[Callable[[str], Any]] = None,
+    parameter_cache_factory: Optional[Callable[[], ParameterCache]] = None,
+    metrics_sink_factory: Optional[Callable[[], MetricsSink]] = None,
+) -> None:
+    """Resets the process-wide registry. See ``ClientRegistry.reset``."""
+    registry.reset(
+        ssm_client_factory,
+        result_cache_factory,
+        async_openai_client_factory,
+        parameter_cache_factory,
+        metrics_sink_factory,
+    )
+
+
+class ParameterStore:
+    """Reads configuration parameters through the container's parameter cache."""
+
+    MIN_FETCH_SECONDS: float = 1.0
+
+    def __init__(self, client_registry: Optional[ClientRegistry] = None):
+        self._registry = client_registry or registry
+
+    @property
+    def cache(self) -> ParameterCache:
+        return self._registry.parameter_cache
+
+    def declare(self, *names: str) -> None:
+        """Adds parameters to the batch fetched on every cache refresh."""
+        self.cache.declare(*names)
 
     def get_parameter(self, name: str) -> str:
         """
-        Retrieves a parameter from SSM Parameter Store with caching.
+        Retrieves a parameter, fetching from its sources only when not cached.
 
         Args:
             name: The parameter name
@@ -101,46 +803,629 @@ class SSMParameterStore:
 
         Raises:
             ConfigError: If the parameter cannot be retrieved
+            DeadlineExceeded: If there is no time left to fetch it
         """
-        if name not in self._parameters:
-            try:
-                response = self.client.get_parameter(Name=name, WithDecryption=True)
-                self._parameters[name] = response["Parameter"]["Value"]
-            except ClientError as e:
-                logger.error(f"Failed to retrieve parameter {name} from SSM: {str(e)}")
-                raise ConfigError(f"Failed to retrieve parameter: {name}") from e
+        fresh = self.cache.is_fresh(name)
+        if not fresh:
+            current_deadline().require(self.MIN_FETCH_SECONDS, f"fetching {name}")
+        try:
+            if fresh:
+                return self.cache.get(name)
+            with current_metrics().span("parameters"):
+                return self.cache.get(name)
+        except ParameterError as e:
+            logger.error(f"Failed to retrieve parameter {name}: {e.__cause__ or e}")
+            raise ConfigError(f"Failed to retrieve parameter: {name}") from e
 
-        return self._parameters[name]
+    async def get_parameter_async(self, name: str) -> str:
+        """
+        ``get_parameter`` for coroutines: a cached value is returned at once,
+        and a fetch runs in a worker thread so it does not block the loop.
+        """
+        if self.cache.is_fresh(name):
+            return self.get_parameter(name)
+        return await asyncio.to_thread(self.get_parameter, name)
 
 
-class BaseLambdaHandler(ABC, Generic[RequestT, ResponseT]):
+class BaseLambdaHandler(Generic[RequestT, ResponseT]):
     """
-    Base class for Lambda handlers with common functionality.
+    Mixin with the configuration, caching and metrics shared by Lambda
+    handlers.
+
+    It is not a handler on its own and declares nothing abstract: the request
+    pipeline (validation, processing, batches, ``handle``) is asynchronous
+    and lives in ``AsyncBaseLambdaHandler``, the abstract base every handler
+    extends.
 
     Type Parameters:
         RequestT: The type of the request body
         ResponseT: The type of the response body
+
+    Subclasses opt into result caching by returning normalized inputs from
+    ``cache_inputs``; bump ``PROMPT_VERSION`` whenever the prompt changes so
+    stale results are not served. Naming the free-text input in
+    ``NEAR_DUPLICATE_FIELD`` also reuses results for text that differs only
+    in case or punctuation, with the same other inputs (see
+    ``NearDuplicateIndex``); leave it unset where either can change the
+    verdict.
+
+    Identical requests in flight at the same time share one call to
+    ``process_request`` (single-flight), whether they come from concurrent
+    invocations or one batch; with a lock table configured (see
+    ``DistributedSingleFlight``) containers share the calls of cached
+    requests as well, through the result cache. Requests are identical when
+    their ``flight_key`` is, which defaults to the cache key.
+
+    Subclasses opt into batch requests (``{"items": [...]}``) with
+    ``BATCH_ENABLED``; each item is validated and processed on its own, with
+    at most ``BATCH_CONCURRENCY`` model calls in flight.
+
+    ``PARAMETERS`` lists the parameters the handler reads; they are fetched
+    together, in one batch, whenever the parameter cache refreshes.
+
+    ``MODEL_TIERS`` lists the models a handler may call, cheapest first, and
+    can be overridden per deployment (see ``tiers_from_environment``). Plain
+    calls use the first; ``create_cascaded`` escalates through the rest.
+
+    Every invocation emits one metrics record with the time spent in each
+    phase (parse, validate, process, serialize, plus parameters and model
+    within process) and the model's token usage and cost. Subclasses add their own
+    metrics through ``self.metrics`` while processing, or by overriding
+    ``collect_metrics``.
     """
 
-    def __init__(self):
-        self.ssm = SSMParameterStore()
-        self._openai_client: Optional[OpenAI] = None
-        self._model: str = MODEL
+    PROMPT_VERSION: str = "1"
+    MODEL_TIERS: Tuple[ModelTier, ...] = (ModelTier(MODEL),)
+    NEAR_DUPLICATE_FIELD: Optional[str] = None
+    SINGLE_FLIGHT: bool = True
+    PARAMETERS: Tuple[str, ...] = (OPENAI_API_KEY_PARAMETER,)
+    BATCH_ENABLED: bool = False
+    BATCH_MAX_ITEMS: int = 25
+    BATCH_CONCURRENCY: int = 10
 
-    @property
-    def openai_client(self) -> OpenAI:
-        """Lazy initialization of OpenAI client."""
-        if self._openai_client is None:
-            api_key = self.ssm.get_parameter("/EnglishLearning/OPENAI_API_KEY")
-            self._openai_client = OpenAI(api_key=api_key)
-        return self._openai_client
+    def __init__(self, client_registry: Optional[ClientRegistry] = None):
+        self._registry = client_registry or registry
+        self.parameters = ParameterStore(self._registry)
+        self.parameters.declare(*self.PARAMETERS)
+        self.model_tiers: Tuple[ModelTier, ...] = tiers_from_environment(
+            type(self).__name__, self.MODEL_TIERS
+        )
+        self._model: str = self.model_tiers[0].model
 
     @property
-    def model(self) -> OpenAI:
+    def model(self) -> str:
+        """The cheapest configured model, used by calls outside a cascade."""
         return self._model
 
+    @property
+    def model_signature(self) -> str:
+        """Identifies the configured models in cache keys."""
+        return ",".join(str(tier) for tier in self.model_tiers)
+
+    @property
+    def result_cache(self) -> ResultCache:
+        return self._registry.result_cache
+
+    @property
+    def near_duplicates(self) -> NearDuplicateIndex:
+        """Container-wide index of earlier results, by similar input text."""
+        return self._registry.shared(
+            "near_duplicate_index", NearDuplicateIndex.from_environment
+        )
+
+    @property
+    def single_flight(self) -> SingleFlight:
+        """Container-wide registry of in-flight calls."""
+        return self._registry.shared("single_flight", SingleFlight)
+
+    @property
+    def distributed_single_flight(self) -> Optional[DistributedSingleFlight]:
+        """Cross-container single-flight, or None when no lock table is set."""
+        return self._registry.shared(
+            "distributed_single_flight", DistributedSingleFlight.from_environment
+        )
+
+    @property
+    def metrics(self) -> InvocationMetrics:
+        """Metrics of the invocation being handled."""
+        return current_metrics()
+
+    @contextmanager
+    def instrument(
+        self, context: Any, name: Optional[str] = None
+    ) -> Iterator[InvocationMetrics]:
+        """
+        Collects and emits the metrics of one invocation.
+
+        Args:
+            context: The Lambda context object
+            name: The ``Handler`` dimension, when not the class name (e.g. for
+                a scheduled entry point whose latency must not mix with the
+                API's)
+        """
+        with record_invocation(
+            self._registry.metrics_sink,
+            {"Handler": name or type(self).__name__},
+            context,
+        ) as metrics:
+            yield metrics
+
+    def collect_metrics(
+        self, metrics: InvocationMetrics, response: Dict[str, Any]
+    ) -> None:
+        """
+        Hook for custom metrics, called once the response is ready.
+
+        Args:
+            metrics: The invocation's metrics
+            response: The API Gateway response about to be returned
+        """
+        pass
+
+    def finish_metrics(
+        self, metrics: InvocationMetrics, response: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Records the response status and runs ``collect_metrics``."""
+        status_code = response.get("statusCode", 0)
+        metrics.set_property("StatusCode", status_code)
+        metrics.put_metric("ServerErrors", int(status_code >= 500))
+        try:
+            self.collect_metrics(metrics, response)
+        except Exception as e:
+            logger.warning(f"Failed to collect custom metrics: {str(e)}")
+        return response
+
+    def local_response(self, request: RequestT) -> Optional[ResponseT]:
+        """
+        Answers a request without the model, when that is trivially possible.
+
+        Called before the result cache and single-flight, so local answers
+        never pay for a cache lookup or a lock; they are not cached either.
+
+        Args:
+            request: The validated request object
+
+        Returns:
+            The response, or None to go through the cache and the model
+        """
+        return None
+
+    def cache_inputs(self, request: RequestT) -> Optional[Dict[str, Any]]:
+        """
+        Returns the normalized inputs identifying a cacheable request.
+
+        Args:
+            request: The validated request object
+
+        Returns:
+            A JSON-serializable dictionary, or None if the request must not be cached
+        """
+        return None
+
+    def is_cacheable(self, response: ResponseT) -> bool:
+        """Returns False for responses that must not be cached (e.g. fallbacks)."""
+        return True
+
+    def cache_key(self, request: RequestT) -> Optional[str]:
+        """Returns the result cache key for a request, or None if not cacheable."""
+        inputs = self.cache_inputs(request)
+        if inputs is None:
+            return None
+        return make_cache_key(
+            type(self).__name__, self.model_signature, self.PROMPT_VERSION, inputs
+        )
+
+    def near_duplicate_inputs(self, request: RequestT) -> Optional[Tuple[str, str]]:
+        """
+        Returns the scope and free text used for near-duplicate lookups.
+
+        The scope is the cache key of every input except
+        ``NEAR_DUPLICATE_FIELD``, so results are only reused for the same word
+        or tense; returns None if the handler does not use the index.
+        """
+        field_name = self.NEAR_DUPLICATE_FIELD
+        inputs = self.cache_inputs(request) if field_name else None
+        if not inputs or not isinstance(inputs.get(field_name), str):
+            return None
+        others = {name: value for name, value in inputs.items() if name != field_name}
+        scope = make_cache_key(
+            type(self).__name__, self.model_signature, self.PROMPT_VERSION, others
+        )
+        return scope, inputs[field_name]
+
+    async def cached_response(
+        self, key: str, near: Optional[Tuple[str, str]]
+    ) -> Optional[ResponseT]:
+        """
+        Looks a request up by exact cache key, then by near-duplicate text.
+
+        Near-duplicate hits are stored under the exact key too, so a repeat of
+        the same text is an exact hit next time. Cache lookups run in a worker
+        thread, so the items of a batch wait on the cache tier concurrently.
+        """
+        cached = await asyncio.to_thread(self.result_cache.get, key, self.metrics)
+        if cached is not None or near is None:
+            return cached
+
+        similar = self.near_duplicates.lookup(*near)
+        if similar is not None:
+            self.metrics.increment("NearDuplicateHits")
+            await asyncio.to_thread(self.result_cache.put, key, similar, self.metrics)
+        return similar
+
+    async def store_response(
+        self, key: str, near: Optional[Tuple[str, str]], response: ResponseT
+    ) -> None:
+        """Caches a freshly computed response, unless ``is_cacheable`` says no."""
+        if not self.is_cacheable(response):
+            return
+        await asyncio.to_thread(self.result_cache.put, key, response, self.metrics)
+        if near is not None:
+            self.near_duplicates.add(*near, response)
+
+    def flight_key(self, request: RequestT) -> Optional[str]:
+        """
+        Returns the key identical concurrent requests share a call under.
+
+        Defaults to the cache key; override it for handlers that do not cache
+        but still see identical requests. None disables single-flight.
+        """
+        return self.cache_key(request) if self.SINGLE_FLIGHT else None
+
+    def flight_wait_seconds(self) -> float:
+        """Longest time to wait on another container before calling the model."""
+        return max(0.0, current_deadline().remaining() / 2)
+
+    def record_flight(self, shared: bool, remote: bool) -> None:
+        if shared:
+            self.metrics.increment("SingleFlightShared")
+        if remote:
+            self.metrics.increment("SingleFlightRemoteShared")
+
+    def is_batch(self, body: Any) -> bool:
+        """Returns True if the body is a batch request this handler accepts."""
+        return self.BATCH_ENABLED and isinstance(body, dict) and "items" in body
+
+    def batch_items(self, body: Dict[str, Any]) -> List[Any]:
+        """
+        Returns the raw items of a batch request.
+
+        Raises:
+            ValidationError: If ``items`` is not a non-empty list within limits
+        """
+        items = body["items"]
+        if not isinstance(items, list):
+            raise ValidationError("'items' must be a list")
+        if not items:
+            raise ValidationError("'items' cannot be empty")
+        if len(items) > self.BATCH_MAX_ITEMS:
+            raise ValidationError(
+                f"'items' cannot contain more than {self.BATCH_MAX_ITEMS} entries"
+            )
+        return items
+
+    @staticmethod
+    def batch_error(index: int, error: BaseException) -> Dict[str, Any]:
+        """Converts the failure of one batch item into its ``error`` entry."""
+        if isinstance(error, ConfigError):
+            return {"error": str(error)}
+        if isinstance(error, StructuredOutputError):
+            return {"error": INVALID_MODEL_RESPONSE_MESSAGE}
+        if is_timeout_error(error):
+            return {"error": DEADLINE_EXCEEDED_MESSAGE}
+        logger.error(f"Batch item {index} failed: {str(error)}", exc_info=error)
+        return {"error": UNEXPECTED_ERROR_MESSAGE}
+
+    @staticmethod
+    def error_response(error: Exception) -> Dict[str, Any]:
+        """Converts an exception raised while processing into an error response."""
+        if isinstance(error, ConfigError):
+            return APIGatewayResponse.error(500, str(error))
+        if isinstance(error, StructuredOutputError):
+            return APIGatewayResponse.error(502, INVALID_MODEL_RESPONSE_MESSAGE)
+        if is_timeout_error(error):
+            logger.warning(f"Deadline exceeded: {str(error)}")
+            return APIGatewayResponse.error(503, DEADLINE_EXCEEDED_MESSAGE)
+        logger.error(f"Unexpected error: {str(error)}", exc_info=error)
+        return APIGatewayResponse.error(500, UNEXPECTED_ERROR_MESSAGE)
+
+
+class AsyncBaseLambdaHandler(BaseLambdaHandler[RequestT, ResponseT], ABC):
+    """
+    Base class for handlers built on AsyncOpenAI.
+
+    ``validate_request`` and ``process_request`` are coroutines, so a handler
+    can overlap its model calls (batch items, chunks of a long article, ...).
+    ``handle`` stays synchronous: it is a thin adapter that runs
+    ``handle_async`` on the container's event loop, which is reused across
+    warm invocations, so existing ``lambda_handler`` entry points keep working.
+    """
+
+    STRUCTURED_OUTPUT_REPAIR_ATTEMPTS: int = 1
+    HEDGING: Optional[HedgingPolicy] = None
+    # Model calls are refused below MIN_MODEL_CALL_SECONDS of remaining time;
+    # above it, the time left is split into at most MAX_MODEL_ATTEMPTS attempts
+    # of at least MIN_MODEL_ATTEMPT_SECONDS each.
+    MIN_MODEL_CALL_SECONDS: float = 1.0
+    MIN_MODEL_ATTEMPT_SECONDS: float = 6.0
+    MAX_MODEL_ATTEMPTS: int = 3
+
+    def __init__(self, client_registry: Optional[ClientRegistry] = None):
+        super().__init__(client_registry)
+        self.hedger: Optional[Hedger] = Hedger(self.HEDGING) if self.HEDGING else None
+
+    async def async_openai_client(self) -> "AsyncOpenAI":
+        """
+        Shared AsyncOpenAI client, reused across warm invocations.
+
+        Fetching the API key is a blocking SSM call when the parameter cache
+        is stale, so it then runs in a worker thread instead of the event loop.
+        """
+        api_key = await self.parameters.get_parameter_async(OPENAI_API_KEY_PARAMETER)
+        return self._registry.async_openai_client(api_key)
+
+    @property
+    def structured_output_stats(self) -> StructuredOutputStats:
+        """Structured output counters for this handler class."""
+        return structured_output_stats.setdefault(
+            type(self).__name__, StructuredOutputStats()
+        )
+
+    async def create_completion(self, **kwargs: Any) -> Any:
+        """
+        Calls ``chat.completions.create`` with this handler's model.
+
+        Every model call goes through here. The per-attempt timeout and retry
+        count are derived from the invocation deadline, and the call is cut
+        off when the deadline passes; when the handler sets ``HEDGING`` slow
+        calls are hedged with a duplicate request.
+
+        With ``stream=True`` the call returns once the stream is open, and
+        the chunks are passed through as they arrive; pass
+        ``stream_options={"include_usage": True}`` to record token usage.
+
+        Args:
+            **kwargs: Arguments for ``chat.completions.create``
+
+        Returns:
+            The ChatCompletion, or an async iterator of its chunks when
+            streaming
+
+        Raises:
+            DeadlineExceeded: If the deadline leaves no time for the call
+        """
+        deadline = current_deadline()
+        deadline.require(self.MIN_MODEL_CALL_SECONDS, "model call")
+        timeout, attempts = deadline.attempt_budget(
+            self.MIN_MODEL_ATTEMPT_SECONDS, self.MAX_MODEL_ATTEMPTS
+        )
+        kwargs.setdefault("model", self.model)
+        client = (await self.async_openai_client()).with_options(
+            timeout=timeout, max_retries=attempts - 1
+        )
+
+        def call() -> Awaitable[Any]:
+            return client.chat.completions.create(**kwargs)
+
+        if self.hedger is None or kwargs.get("stream"):
+            pending = call()
+        else:
+            pending = self.hedger.run(call)
+        metrics = self.metrics
+        metrics.increment("ModelCalls")
+        try:
+            with metrics.span("model"):
+                response = await asyncio.wait_for(pending, deadline.remaining())
+        except asyncio.TimeoutError as e:
+            raise DeadlineExceeded("model call ran past the deadline") from e
+        if kwargs.get("stream"):
+            return self._metered_stream(response, metrics, kwargs["model"])
+        self._record_usage(metrics, kwargs["model"], getattr(response, "usage", None))
+        return response
+
+    @staticmethod
+    def _record_usage(metrics: InvocationMetrics, model: str, usage: Any) -> None:
+        if usage is None:
+            return
+        metrics.record_usage(usage)
+        metrics.increment("ModelCost", record_model_usage(model, usage), "None")
+
+    @classmethod
+    async def _metered_stream(
+        cls, stream: AsyncIterator[Any], metrics: InvocationMetrics, model: str
+    ) -> AsyncIterator[Any]:
+        """Passes stream chunks through, recording streaming time and usage."""
+        started = time.perf_counter()
+        async for chunk in stream:
+            cls._record_usage(metrics, model, getattr(chunk, "usage", None))
+            yield chunk
+        metrics.add_timing("modelStream", (time.perf_counter() - started) * 1000)
+
+    async def create_structured(
+        self,
+        messages: List[Dict[str, str]],
+        response_type: Type[T],
+        **kwargs: Any,
+    ) -> T:
+        """
+        Calls the model with a JSON-schema ``response_format`` derived from
+        ``response_type`` and parses the reply into it.
+
+        Output that fails validation is sent back to the model with the error,
+        up to ``STRUCTURED_OUTPUT_REPAIR_ATTEMPTS`` times. Failures, repairs
+        and exhausted budgets are counted in the invocation's metrics.
+
+        Args:
+            messages: The chat messages
+            response_type: The dataclass describing the expected reply
+            **kwargs: Extra arguments for ``chat.completions.create``
+
+        Returns:
+            An instance of ``response_type``
+
+        Raises:
+            StructuredOutputError: If no valid reply was produced within budget
+            DeadlineExceeded: If the first attempt has no time left
+        """
+        stats = self.structured_output_stats
+        stats.calls += 1
+        response_format = {
+            "type": "json_schema",
+            "json_schema": {
+                "name": response_type.__name__,
+                "strict": True,
+                "schema": json_schema(response_type),
+            },
+        }
+
+        messages = list(messages)
+        for attempt in range(self.STRUCTURED_OUTPUT_REPAIR_ATTEMPTS + 1):
+            if attempt and current_deadline().remaining() < self.MIN_MODEL_CALL_SECONDS:
+                break
+            response = await self.create_completion(
+                messages=messages, response_format=response_format, **kwargs
+            )
+            content = response.choices[0].message.content
+            try:
+                result = parse_structured(content, response_type)
+                if attempt:
+                    stats.repairs += 1
+                    self.metrics.increment("StructuredOutputRepairs")
+                return result
+            except StructuredOutputError as e:
+                stats.parse_failures += 1
+                self.metrics.increment("StructuredOutputParseFailures")
+                logger.warning(
+                    f"{type(self).__name__} structured output failed "
+                    f"(attempt {attempt + 1}): {str(e)}; stats={stats.as_dict()}"
+                )
+                messages += [
+                    {"role": "assistant", "content": content or ""},
+                    {
+                        "role": "user",
+                        "content": (
+                            f"That reply was invalid: {str(e)}. "
+                            "Reply again with only JSON matching the schema."
+                        ),
+                    },
+                ]
+
+        stats.exhausted += 1
+        self.metrics.increment("StructuredOutputExhausted")
+        raise StructuredOutputError(
+            f"{response_type.__name__}: no valid response within the repair budget"
+        )
+
+    @property
+    def cascade_stats(self) -> CascadeStats:
+        """Model cascade counters for this handler class."""
+        return cascade_stats.setdefault(type(self).__name__, CascadeStats())
+
+    async def create_cascaded(
+        self,
+        messages: List[Dict[str, str]],
+        response_type: Type[T],
+        accept: Optional[Callable[[T], bool]] = None,
+        **kwargs: Any,
+    ) -> T:
+        """
+        Calls ``create_structured`` on the cheapest model tier, escalating to
+        the next tier while the answer is unreliable.
+
+        With several ``model_tiers`` the model also reports its confidence,
+        and a tier's answer is used when the confidence reaches the tier's
+        ``min_confidence``, the output is valid and ``accept`` (if given)
+        approves it; otherwise the next tier is asked. When the deadline
+        leaves no time to escalate, the last valid answer is returned. With a
+        single tier this is ``create_structured`` on that model.
+
+        Every tier records ``CascadeTier<n>Calls`` and its latency, and
+        ``CascadeEscalations`` counts requests that needed more than the
+        first tier.
+
+        Args:
+            messages: The chat messages
+            response_type: The dataclass describing the expected reply
+            accept: Extra check of an answer; False escalates
+            **kwargs: Extra arguments for ``chat.completions.create``
+
+        Returns:
+            An instance of ``response_type``
+
+        Raises:
+            StructuredOutputError: If no tier produced a valid reply
+            DeadlineExceeded: If the deadline leaves no time for the first call
+        """
+        tiers = self.model_tiers
+        if len(tiers) == 1:
+            return await self.create_structured(
+                messages, response_type, model=tiers[0].model, **kwargs
+            )
+
+        stats = self.cascade_stats
+        stats.requests += 1
+        metrics = self.metrics
+        metrics.increment("CascadeRequests")
+        graded_type = with_confidence(response_type)
+        messages = [*messages, {"role": "system", "content": CONFIDENCE_INSTRUCTION}]
+        fallback: Optional[T] = None
+        for index, tier in enumerate(tiers):
+            last = index == len(tiers) - 1
+            if index:
+                remaining = current_deadline().remaining()
+                if fallback is not None and remaining < self.MIN_MODEL_CALL_SECONDS:
+                    break
+                if index == 1:
+                    stats.escalations += 1
+                    metrics.increment("CascadeEscalations")
+            tier_stats = stats.tier(index, tier.model)
+            tier_stats.calls += 1
+            metrics.increment(f"CascadeTier{index + 1}Calls")
+            started = time.perf_counter()
+            with track_usage() as usage:
+                try:
+                    graded = await self.create_structured(
+                        messages, graded_type, model=tier.model, **kwargs
+                    )
+                except StructuredOutputError:
+                    tier_stats.invalid += 1
+                    if last and fallback is None:
+                        raise
+                    continue
+                except DeadlineExceeded:
+                    if fallback is None:
+                        raise
+                    break
+                finally:
+                    elapsed = (time.perf_counter() - started) * 1000
+                    metrics.add_timing(f"cascadeTier{index + 1}", elapsed)
+                    tier_stats.latency_ms += elapsed
+                    tier_stats.prompt_tokens += usage.prompt_tokens
+                    tier_stats.completion_tokens += usage.completion_tokens
+                    tier_stats.cost += usage.cost
+
+            result = without_confidence(graded, response_type)
+            if accept is not None and not accept(result):
+                tier_stats.invalid += 1
+                if last and fallback is None:
+                    raise StructuredOutputError(
+                        f"{response_type.__name__}: answer rejected by every tier"
+                    )
+                continue
+            if last or graded.confidence >= tier.min_confidence:
+                tier_stats.accepted += 1
+                return result
+            tier_stats.low_confidence += 1
+            fallback = result
+
+        logger.warning(
+            f"{type(self).__name__} cascade found no confident answer in time; "
+            "using a low-confidence one"
+        )
+        return fallback
+
     @abstractmethod
-    def validate_request(self, body: Dict[str, Any]) -> RequestT:
+    async def validate_request(self, body: Dict[str, Any]) -> RequestT:
         """
         Validates and converts the request body to the request type.
 
@@ -156,7 +1441,7 @@ class BaseLambdaHandler(ABC, Generic[RequestT, ResponseT]):
         pass
 
     @abstractmethod
-    def process_request(self, request: RequestT) -> ResponseT:
+    async def process_request(self, request: RequestT) -> ResponseT:
         """
         Processes the validated request.
 
@@ -168,9 +1453,156 @@ class BaseLambdaHandler(ABC, Generic[RequestT, ResponseT]):
         """
         pass
 
-    def handle(self, event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    async def gather_bounded(
+        self, coroutines: List[Coroutine[Any, Any, T]], limit: int
+    ) -> List[Union[T, BaseException]]:
+        """
+        Runs coroutines concurrently with at most ``limit`` in flight.
+
+        Args:
+            coroutines: The coroutines to run
+            limit: Maximum number of coroutines running at once
+
+        Returns:
+            Results in input order; failed coroutines yield their exception
+        """
+        semaphore = asyncio.Semaphore(max(1, limit))
+
+        async def bounded(coroutine: Coroutine[Any, Any, T]) -> T:
+            async with semaphore:
+                return await coroutine
+
+        return await asyncio.gather(
+            *(bounded(coroutine) for coroutine in coroutines), return_exceptions=True
+        )
+
+    async def coalesce(
+        self,
+        request: RequestT,
+        call: Callable[[], Awaitable[ResponseT]],
+        recheck: Optional[Callable[[], Awaitable[Optional[ResponseT]]]] = None,
+    ) -> ResponseT:
+        """
+        Runs ``call`` once for every identical request in flight.
+
+        Containers coalesce through the lock table only when ``recheck`` can
+        read the result another container stored; otherwise waiting for
+        their lock would only delay the call.
+
+        Args:
+            request: The validated request object
+            call: Computes the response
+            recheck: Reads the response stored by ``call``, None if missing
+
+        Returns:
+            The response, possibly computed for another identical request
+        """
+        key = self.flight_key(request)
+        if key is None:
+            return await call()
+        distributed = self.distributed_single_flight
+        remote = False
+
+        async def lead() -> ResponseT:
+            nonlocal remote
+            if distributed is None or recheck is None:
+                return await call()
+            value, remote = await distributed.run_async(
+                key, call, recheck, self.flight_wait_seconds()
+            )
+            return value
+
+        response, shared = await self.single_flight.run_async(key, lead)
+        self.record_flight(shared, remote)
+        return response
+
+    async def process_with_cache(self, request: RequestT) -> ResponseT:
+        """
+        Answers the request locally when ``local_response`` can, else serves
+        it from the result cache, calling ``process_request`` (and so the
+        model) only on a miss, once for all identical requests in flight.
+
+        Args:
+            request: The validated request object
+
+        Returns:
+            The response object
+        """
+        local = self.local_response(request)
+        if local is not None:
+            return local
+        key = self.cache_key(request)
+        if key is None:
+            return await self.coalesce(request, lambda: self.process_request(request))
+
+        near = self.near_duplicate_inputs(request)
+        cached = await self.cached_response(key, near)
+        if cached is not None:
+            return cached
+
+        async def compute() -> ResponseT:
+            # A flight for this key may have finished since the lookup
+            recent = self.result_cache.memory.get(key)
+            if recent is not None:
+                return recent
+            response = await self.process_request(request)
+            await self.store_response(key, near, response)
+            return response
+
+        def recheck() -> Awaitable[Optional[ResponseT]]:
+            # Not a new lookup: the miss was counted by cached_response
+            return asyncio.to_thread(self.result_cache.get, key, count=False)
+
+        return await self.coalesce(request, compute, recheck)
+
+    async def validate_batch(self, body: Dict[str, Any]) -> BatchRequest[RequestT]:
+        """
+        Validates a batch request item by item.
+
+        Args:
+            body: The raw request body dictionary containing ``items``
+
+        Returns:
+            BatchRequest with the validated items and per-item errors
+
+        Raises:
+            ValidationError: If ``items`` is not a non-empty list within limits
+        """
+        batch: BatchRequest[RequestT] = BatchRequest(items=[])
+        for index, item in enumerate(self.batch_items(body)):
+            try:
+                if not isinstance(item, dict):
+                    raise ValidationError("each item must be an object")
+                batch.items.append(await self.validate_request(item))
+            except ValidationError as e:
+                batch.items.append(None)
+                batch.errors[index] = str(e)
+        return batch
+
+    async def process_batch(self, batch: BatchRequest[RequestT]) -> Dict[str, Any]:
+        """Processes the valid items of a batch as concurrent tasks."""
+        pending = [index for index, item in enumerate(batch.items) if item is not None]
+        outcomes = await self.gather_bounded(
+            [self.process_with_cache(batch.items[index]) for index in pending],
+            self.BATCH_CONCURRENCY,
+        )
+
+        results: List[Dict[str, Any]] = [
+            {"error": batch.errors[index]} if item is None else {}
+            for index, item in enumerate(batch.items)
+        ]
+        for index, outcome in zip(pending, outcomes):
+            if isinstance(outcome, Exception):
+                results[index] = self.batch_error(index, outcome)
+            elif isinstance(outcome, BaseException):
+                raise outcome
+            else:
+                results[index] = {"result": outcome}
+        return {"results": results}
+
+    async def handle_async(self, event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         """
-        Main handler method for Lambda function.
+        Main handler method, run on the container's event loop by ``handle``.
 
         Args:
             event: The Lambda event object
@@ -179,29 +1611,54 @@ class BaseLambdaHandler(ABC, Generic[RequestT, ResponseT]):
         Returns:
             API Gateway response dictionary
         """
-        api_event = APIGatewayEvent.from_dict(event)
+        metrics = self.metrics
+        try:
+            try:
+                api_event = APIGatewayEvent.from_dict(event)
+            except (binascii.Error, UnicodeDecodeError) as e:
+                return APIGatewayResponse.error(
+                    400, f"Request body is not valid base64-encoded UTF-8: {str(e)}"
+                )
 
-        # Handle OPTIONS request
-        if api_event.http_method == "OPTIONS":
-            return APIGatewayResponse.options()
+            # Handle OPTIONS request
+            if api_event.http_method == "OPTIONS":
+                return APIGatewayResponse.options()
 
-        try:
             # Parse and validate input
+            request: Union[RequestT, BatchRequest[RequestT]]
             try:
-                body = json.loads(api_event.body or "{}")
-                request = self.validate_request(body)
+                with metrics.span("parse"):
+                    body = json.loads(api_event.body or "{}")
+                with metrics.span("validate"):
+                    if self.is_batch(body):
+                        request = await self.validate_batch(body)
+                    else:
+                        request = await self.validate_request(body)
             except (json.JSONDecodeError, ValidationError) as e:
                 return APIGatewayResponse.error(400, str(e))
 
             # Process the request
-            response = self.process_request(request)
+            with metrics.span("process"):
+                if isinstance(request, BatchRequest):
+                    response = await self.process_batch(request)
+                else:
+                    response = await self.process_with_cache(request)
 
-            return APIGatewayResponse.success(response)
+            with metrics.span("serialize"):
+                return APIGatewayResponse.success(
+                    response, api_event.header("Accept-Encoding")
+                )
 
-        except ConfigError as e:
-            return APIGatewayResponse.error(500, str(e))
         except Exception as e:
-            logger.error(f"Unexpected error: {str(e)}", exc_info=True)
-            return APIGatewayResponse.error(
-                500, "An unexpected error occurred. Please try again later."
-            )
+            return self.error_response(e)
+
+    def handle(self, event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+        """
+        Synchronous adapter running ``handle_async`` on the shared event loop.
+
+        The invocation deadline and metrics are set up here so they also cover
+        handlers that override ``handle_async``.
+        """
+        with invocation_deadline(context), self.instrument(context) as metrics:
+            response = self._registry.run(self.handle_async(event, context))
+            return self.finish_metrics(metrics, response)
@@ -0,0 +1,67 @@
+from typing import Callable, List, Optional, Tuple
+
+CONTRACTED_SUFFIXES = {"'re": "are", "'m": "am", "'ve": "have", "'ll": "will"}
+IRREGULAR_NEGATIONS = {"won't": "will", "can't": "can", "shan't": "shall"}
+# Verbs spelled out before a regular n't: "doesn't" -> "does", "not"
+NEGATED_VERBS = frozenset(
+    "do does did is are was were has have had could would should must need "
+    "might ought dare".split()
+)
+IRREGULAR_CONTRACTIONS = {"let's": ["let", "us"]}
+# Pronouns whose 's is "is" or "has" rather than a possessive
+CONTRACTING_PRONOUNS = {"he", "she", "it", "that", "there", "here", "what", "who"}
+
+
+def expand_contractions(
+    tokens: List[str], is_participle: Optional[Callable[[str], bool]] = None
+) -> List[str]:
+    """
+    Spells out contracted auxiliaries and negations.
+
+    An ambiguous 's or 'd is read as has/had before a past participle and as
+    is/would otherwise. Without ``is_participle`` both readings are kept
+    ("she's" -> "she", "has", "is"), which suits matching words but not
+    parsing. Tokens that are not known contractions, such as "ain't" or
+    "y'all", are returned unchanged, apostrophe included.
+
+    Args:
+        tokens: Lowercased words, as returned by ``word_precheck.tokenize``
+        is_participle: Tells whether a word is a past participle
+
+    Returns:
+        The words with every known contraction spelled out
+    """
+    expanded: List[str] = []
+    for index, token in enumerate(tokens):
+        following = tokens[index + 1] if index + 1 < len(tokens) else ""
+        if token in IRREGULAR_CONTRACTIONS:
+            expanded.extend(IRREGULAR_CONTRACTIONS[token])
+        elif token in IRREGULAR_NEGATIONS:
+            expanded.extend([IRREGULAR_NEGATIONS[token], "not"])
+        elif token.endswith("n't") and token[:-3] in NEGATED_VERBS:
+            expanded.extend([token[:-3], "not"])
+        elif "'" in token and token[token.index("'") :] in CONTRACTED_SUFFIXES:
+            head, suffix = token.split("'", 1)
+            expanded.extend([head, CONTRACTED_SUFFIXES["'" + suffix]])
+        elif token.endswith("'s") and token[:-2] in CONTRACTING_PRONOUNS:
+            expanded.append(token[:-2])
+            expanded.extend(_readings(("has", "is"), following, is_participle))
+        elif token.endswith("'s"):
+            expanded.append(token[:-2])
+        elif token.endswith("'d"):
+            expanded.append(token[:-2])
+            expanded.extend(_readings(("had", "would"), following, is_participle))
+        else:
+            expanded.append(token)
+    return expanded
+
+
+def _readings(
+    readings: Tuple[str, str],
+    following: str,
+    is_participle: Optional[Callable[[str], bool]],
+) -> List[str]:
+    """Picks the perfect or the other reading of 's or 'd, or keeps both."""
+    if is_participle is None:
+        return list(readings)
+    return [readings[0] if is_participle(following) else readings[1]]
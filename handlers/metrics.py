@@ -0,0 +1,205 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Optional, List, Iterator, Tuple
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+DEFAULT_NAMESPACE = "EnglishLearning"
+
+
+class MetricsSink(ABC):
+    """Destination for per-invocation metric records."""
+
+    @abstractmethod
+    def emit(self, record: "InvocationMetrics") -> None:
+        """Publishes the metrics of one invocation."""
+        pass
+
+
+class EMFLogSink(MetricsSink):
+    """
+    Writes CloudWatch Embedded Metric Format records to stdout.
+
+    Lambda forwards stdout to CloudWatch Logs, which extracts the metrics from
+    each JSON line; the record is written directly rather than through the
+    logger so no prefix breaks the JSON.
+    """
+
+    def __init__(self, namespace: str = DEFAULT_NAMESPACE, stream: Any = None):
+        self.namespace = namespace
+        self._stream = stream
+
+    def format(self, record: "InvocationMetrics") -> Dict[str, Any]:
+        """Builds the EMF document for a record."""
+        metrics = record.metrics
+        return {
+            "_aws": {
+                "Timestamp": int(record.timestamp * 1000),
+                "CloudWatchMetrics": [
+                    {
+                        "Namespace": self.namespace,
+                        "Dimensions": [list(record.dimensions)],
+                        "Metrics": [
+                            {"Name": name, "Unit": unit}
+                            for name, (_, unit) in metrics.items()
+                        ],
+                    }
+                ],
+            },
+            **record.dimensions,
+            **{name: value for name, (value, _) in metrics.items()},
+            **record.properties,
+        }
+
+    def emit(self, record: "InvocationMetrics") -> None:
+        stream = self._stream or sys.stdout
+        stream.write(json.dumps(self.format(record)) + "\n")
+        stream.flush()
+
+
+class InMemoryMetricsSink(MetricsSink):
+    """Keeps every record in memory, for tests and benchmarks."""
+
+    def __init__(self):
+        self.records: List["InvocationMetrics"] = []
+        self._lock = threading.Lock()
+
+    def emit(self, record: "InvocationMetrics") -> None:
+        with self._lock:
+            self.records.append(record)
+
+    def values(self, name: str) -> List[float]:
+        """Returns the value of a metric in every record that has it."""
+        with self._lock:
+            return [r.metrics[name][0] for r in self.records if name in r.metrics]
+
+
+class NullMetricsSink(MetricsSink):
+    """Discards records; used when metrics are disabled."""
+
+    def emit(self, record: "InvocationMetrics") -> None:
+        pass
+
+
+def sink_from_environment() -> MetricsSink:
+    """
+    Builds the metrics sink from environment variables.
+
+    ``METRICS_DISABLED`` turns metrics off; otherwise EMF records are written
+    under ``METRICS_NAMESPACE`` (default ``EnglishLearning``).
+    """
+    if os.environ.get("METRICS_DISABLED"):
+        return NullMetricsSink()
+    return EMFLogSink(os.environ.get("METRICS_NAMESPACE", DEFAULT_NAMESPACE))
+
+
+class InvocationMetrics:
+    """
+    Metrics collected during one invocation.
+
+    Phase timings accumulate, so a phase entered several times (like the
+    model call of a batch or a repaired structured output) reports its total.
+    """
+
+    def __init__(self, dimensions: Optional[Dict[str, str]] = None):
+        self.dimensions: Dict[str, str] = dict(dimensions or {})
+        self.metrics: Dict[str, Tuple[float, str]] = {}
+        self.properties: Dict[str, Any] = {}
+        self.timestamp = time.time()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, phase: str) -> Iterator[None]:
+        """Times a block and adds it to ``<Phase>Latency``."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_timing(phase, (time.perf_counter() - started) * 1000)
+
+    def add_timing(self, phase: str, milliseconds: float) -> None:
+        """Adds milliseconds to the ``<Phase>Latency`` metric."""
+        name = f"{phase[:1].upper()}{phase[1:]}Latency"
+        self.increment(name, milliseconds, "Milliseconds")
+
+    def increment(self, name: str, value: float = 1, unit: str = "Count") -> None:
+        """Adds to a metric, starting it at zero."""
+        with self._lock:
+            current, _ = self.metrics.get(name, (0, unit))
+            self.metrics[name] = (current + value, unit)
+
+    def put_metric(self, name: str, value: float, unit: str = "Count") -> None:
+        """Sets a metric, replacing any earlier value."""
+        with self._lock:
+            self.metrics[name] = (value, unit)
+
+    def set_property(self, name: str, value: Any) -> None:
+        """Attaches a searchable, non-metric value to the record."""
+        self.properties[name] = value
+
+    def record_usage(self, usage: Any) -> None:
+        """Adds the token counts of a ``chat.completions`` usage object."""
+        if usage is None:
+            return
+        self.increment("PromptTokens", getattr(usage, "prompt_tokens", 0) or 0)
+        self.increment(
+            "CompletionTokens", getattr(usage, "completion_tokens", 0) or 0
+        )
+
+
+_current_metrics: ContextVar[Optional[InvocationMetrics]] = ContextVar(
+    "current_metrics", default=None
+)
+
+
+def current_metrics() -> InvocationMetrics:
+    """
+    Returns the metrics of the running invocation.
+
+    Outside an invocation a detached collector is returned, so callers never
+    need to check.
+    """
+    return _current_metrics.get() or InvocationMetrics()
+
+
+@contextmanager
+def record_invocation(
+    sink: MetricsSink, dimensions: Dict[str, str], context: Any = None
+) -> Iterator[InvocationMetrics]:
+    """
+    Collects the metrics of one invocation and emits them when it ends.
+
+    Args:
+        sink: Where to publish the record
+        dimensions: The record's CloudWatch dimensions
+        context: The Lambda context, for the request id
+
+    Yields:
+        The invocation's metrics
+    """
+    metrics = InvocationMetrics(dimensions)
+    request_id = getattr(context, "aws_request_id", None)
+    if request_id:
+        metrics.set_property("RequestId", request_id)
+    token = _current_metrics.set(metrics)
+    started = time.perf_counter()
+    try:
+        yield metrics
+    finally:
+        _current_metrics.reset(token)
+        metrics.put_metric(
+            "Latency", (time.perf_counter() - started) * 1000, "Milliseconds"
+        )
+        try:
+            sink.emit(metrics)
+        except Exception as e:
+            logger.warning(f"Failed to emit metrics: {str(e)}")
@@ -0,0 +1,257 @@
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, fields, make_dataclass
+from typing import Dict, Any, Optional, List, Tuple, Iterator
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# USD per million (prompt, completion) tokens; unknown models cost 0
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+CONFIDENCE_FIELD = "confidence"
+CONFIDENCE_INSTRUCTION = (
+    "Also set 'confidence' to the probability, from 0 to 1, that your answer "
+    "is correct. Use a low value when the case is ambiguous or unusual."
+)
+
+
+@dataclass(frozen=True)
+class ModelTier:
+    """
+    One model of a cascade.
+
+    A reply is accepted when its confidence reaches ``min_confidence``;
+    otherwise the request escalates to the next tier. The last tier's reply
+    is always accepted.
+    """
+
+    model: str
+    min_confidence: float = 0.0
+
+    def __str__(self) -> str:
+        if not self.min_confidence:
+            return self.model
+        return f"{self.model}:{self.min_confidence:g}"
+
+
+def parse_tiers(spec: str) -> Tuple[ModelTier, ...]:
+    """
+    Parses a cascade spec, cheapest model first.
+
+    Args:
+        spec: Comma-separated ``model[:min_confidence]``, e.g.
+            ``gpt-4o-mini:0.8,gpt-4o``
+
+    Returns:
+        The tiers, or an empty tuple for an empty spec
+
+    Raises:
+        ValueError: If a confidence is not a number between 0 and 1
+    """
+    tiers = []
+    for part in spec.split(","):
+        model, _, threshold = part.strip().partition(":")
+        if not model:
+            continue
+        min_confidence = float(threshold) if threshold else 0.0
+        if not 0.0 <= min_confidence <= 1.0:
+            raise ValueError(f"Confidence threshold out of range: {part}")
+        tiers.append(ModelTier(model, min_confidence))
+    return tuple(tiers)
+
+
+def tiers_from_environment(
+    handler_name: str, default: Tuple[ModelTier, ...]
+) -> Tuple[ModelTier, ...]:
+    """
+    Returns the model tiers of a handler.
+
+    ``MODELS_<handler class name>`` configures one handler, which is how the
+    router layout (every handler in one function) configures a subset, and
+    ``MODELS`` every handler of the function; both take a ``parse_tiers``
+    spec. Without either, or with an invalid spec, the
+    handler's own default applies.
+    """
+    for name in (f"MODELS_{handler_name}", "MODELS"):
+        spec = os.environ.get(name, "").strip()
+        if not spec:
+            continue
+        try:
+            tiers = parse_tiers(spec)
+        except ValueError as e:
+            logger.warning(f"Ignoring {name}={spec!r}: {str(e)}")
+            continue
+        if tiers:
+            return tiers
+    return default
+
+
+def model_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Returns the price of a model call in USD (0 for unknown models)."""
+    prompt_price, completion_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1e6
+
+
+@dataclass
+class ModelUsage:
+    """Tokens and cost of the model calls made within ``track_usage``."""
+
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+
+    def add(self, model: str, usage: Any) -> float:
+        """Adds a ``chat.completions`` usage object and returns its cost."""
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        cost = model_cost(model, prompt_tokens, completion_tokens)
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.cost += cost
+        return cost
+
+
+_current_usage: ContextVar[Optional[ModelUsage]] = ContextVar(
+    "current_usage", default=None
+)
+
+
+@contextmanager
+def track_usage() -> Iterator[ModelUsage]:
+    """
+    Collects the usage of the model calls made in the block.
+
+    The tracker is context-local, so concurrent batch items each see only
+    their own calls.
+    """
+    usage = ModelUsage()
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+
+
+def record_model_usage(model: str, usage: Any) -> float:
+    """
+    Adds a call's usage to the active tracker, if any.
+
+    Returns:
+        The cost of the call in USD
+    """
+    if usage is None:
+        return 0.0
+    tracker = _current_usage.get()
+    if tracker is None:
+        return model_cost(
+            model,
+            getattr(usage, "prompt_tokens", 0) or 0,
+            getattr(usage, "completion_tokens", 0) or 0,
+        )
+    return tracker.add(model, usage)
+
+
+_confidence_types: Dict[type, type] = {}
+_confidence_types_lock = threading.Lock()
+
+
+def with_confidence(response_type: type) -> type:
+    """
+    Returns a subclass of a response dataclass with a ``confidence`` field.
+
+    The subclass keeps the original name, so the JSON schema sent to the
+    model is named like the plain one.
+    """
+    with _confidence_types_lock:
+        graded = _confidence_types.get(response_type)
+        if graded is None:
+            graded = make_dataclass(
+                response_type.__name__,
+                [
+                    (
+                        CONFIDENCE_FIELD,
+                        float,
+                        field(metadata={"minimum": 0.0, "maximum": 1.0}),
+                    )
+                ],
+                bases=(response_type,),
+            )
+            graded.__module__ = response_type.__module__
+            _confidence_types[response_type] = graded
+        return graded
+
+
+def without_confidence(value: Any, response_type: type) -> Any:
+    """Converts a ``with_confidence`` instance back to ``response_type``."""
+    return response_type(
+        **{f.name: getattr(value, f.name) for f in fields(response_type)}
+    )
+
+
+@dataclass
+class TierStats:
+    """Process-wide counters of one cascade tier."""
+
+    model: str
+    calls: int = 0
+    accepted: int = 0
+    low_confidence: int = 0
+    invalid: int = 0
+    latency_ms: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        calls = self.calls
+        return {
+            "model": self.model,
+            "calls": calls,
+            "accepted": self.accepted,
+            "low_confidence": self.low_confidence,
+            "invalid": self.invalid,
+            "mean_latency_ms": round(self.latency_ms / calls, 1) if calls else 0.0,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cost_usd": round(self.cost, 6),
+        }
+
+
+@dataclass
+class CascadeStats:
+    """Process-wide counters of a handler's model cascade."""
+
+    requests: int = 0
+    escalations: int = 0
+    tiers: List[TierStats] = field(default_factory=list)
+
+    def tier(self, index: int, model: str) -> TierStats:
+        while len(self.tiers) <= index:
+            self.tiers.append(TierStats(model))
+        return self.tiers[index]
+
+    def as_dict(self) -> Dict[str, Any]:
+        requests = self.requests
+        return {
+            "requests": requests,
+            "escalations": self.escalations,
+            "escalation_rate": (
+                round(self.escalations / requests, 4) if requests else 0.0
+            ),
+            "tiers": [tier.as_dict() for tier in self.tiers],
+        }
+
+
+cascade_stats: Dict[str, CascadeStats] = {}
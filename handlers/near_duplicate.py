@@ -0,0 +1,109 @@
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Optional, Tuple
+
+from result_cache import normalize_text
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+PUNCTUATION_PATTERN = re.compile(r"[^\w\s']")
+
+
+def normalize_for_similarity(text: str) -> str:
+    """Lowercases the text and drops punctuation and repeated whitespace."""
+    return normalize_text(PUNCTUATION_PATTERN.sub(" ", text), lowercase=True)
+
+
+@dataclass
+class NearDuplicateStats:
+    """Counters describing how often near-duplicate lookups pay off."""
+
+    lookups: int = 0
+    hits: int = 0
+    evictions: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        stats = asdict(self)
+        lookups = self.lookups
+        stats["hit_rate"] = round(self.hits / lookups, 4) if lookups else 0.0
+        return stats
+
+
+class NearDuplicateIndex:
+    """
+    Earlier evaluations by scope and normalized text, for reusing the result
+    of input that differs only in case, punctuation or spacing.
+
+    A single word can decide whether a usage or tense is correct ("She go" /
+    "She goes", "a apple" / "an apple", a dropped "the"), so only texts with
+    the same words in the same order share an entry, as compared by
+    ``normalize_for_similarity``. Entries only match within the same scope
+    (handler, model, prompt version and the other request inputs).
+
+    At most ``max_entries`` entries are kept, least recently used first out;
+    ``max_entries=0`` disables the index.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self.stats = NearDuplicateStats()
+        self._entries: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environment(cls) -> "NearDuplicateIndex":
+        """
+        Builds the index from environment variables.
+
+        ``NEAR_DUPLICATE_MAX_ENTRIES`` bounds it (0 disables it).
+        """
+        max_entries = int(os.environ.get("NEAR_DUPLICATE_MAX_ENTRIES", "10000"))
+        return cls(max_entries=max_entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, scope: str, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the value stored for the same normalized text in the scope.
+
+        Args:
+            scope: Key of everything besides the text that the value depends on
+            text: The free text to match
+
+        Returns:
+            The stored value, or None if there is none
+        """
+        if self.max_entries <= 0:
+            return None
+        key = (scope, normalize_for_similarity(text))
+        with self._lock:
+            self.stats.lookups += 1
+            value = self._entries.get(key)
+            if value is None:
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def add(self, scope: str, text: str, value: Dict[str, Any]) -> None:
+        """Stores the value of an evaluation of ``text`` within ``scope``."""
+        if self.max_entries <= 0:
+            return
+        key = (scope, normalize_for_similarity(text))
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
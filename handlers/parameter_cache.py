@@ -0,0 +1,286 @@
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Optional, Callable, List, Iterable
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# GetParameters accepts at most this many names per call
+SSM_MAX_NAMES_PER_CALL = 10
+
+
+class ParameterError(Exception):
+    """Raised when a parameter cannot be retrieved from any source."""
+
+    pass
+
+
+def environment_variable_for(name: str) -> str:
+    """
+    Returns the environment variable that overrides a parameter.
+
+    The variable is the last path segment of the parameter name, so
+    ``/EnglishLearning/OPENAI_API_KEY`` is read from ``OPENAI_API_KEY``.
+    """
+    return name.rstrip("/").rsplit("/", 1)[-1]
+
+
+class ParameterSource(ABC):
+    """Somewhere parameter values can be read from."""
+
+    @abstractmethod
+    def fetch(self, names: List[str]) -> Dict[str, str]:
+        """
+        Reads several parameters at once.
+
+        Args:
+            names: The parameter names
+
+        Returns:
+            The values found; names the source does not know are left out
+        """
+        pass
+
+
+class EnvironmentParameterSource(ParameterSource):
+    """Reads parameters from environment variables, for local and offline runs."""
+
+    def fetch(self, names: List[str]) -> Dict[str, str]:
+        values = {}
+        for name in names:
+            value = os.environ.get(environment_variable_for(name))
+            if value:
+                values[name] = value
+        return values
+
+
+class FileParameterSource(ParameterSource):
+    """Reads parameters from a JSON file mapping names to values."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def fetch(self, names: List[str]) -> Dict[str, str]:
+        with open(self.path, encoding="utf-8") as f:
+            stored = json.load(f)
+        return {name: str(stored[name]) for name in names if name in stored}
+
+
+class InMemoryParameterSource(ParameterSource):
+    """Dictionary-backed stand-in for SSM that counts its batch calls."""
+
+    def __init__(self, values: Optional[Dict[str, str]] = None):
+        self.values: Dict[str, str] = dict(values or {})
+        self.calls = 0
+
+    def fetch(self, names: List[str]) -> Dict[str, str]:
+        self.calls += 1
+        return {name: self.values[name] for name in names if name in self.values}
+
+
+class SSMParameterSource(ParameterSource):
+    """Reads decrypted parameters from SSM Parameter Store with GetParameters."""
+
+    def __init__(self, client_factory: Callable[[], Any]):
+        self._client_factory = client_factory
+
+    def fetch(self, names: List[str]) -> Dict[str, str]:
+        client = self._client_factory()
+        values = {}
+        for start in range(0, len(names), SSM_MAX_NAMES_PER_CALL):
+            response = client.get_parameters(
+                Names=names[start : start + SSM_MAX_NAMES_PER_CALL],
+                WithDecryption=True,
+            )
+            for parameter in response.get("Parameters", []):
+                values[parameter["Name"]] = parameter["Value"]
+            for name in response.get("InvalidParameters", []):
+                logger.warning(f"SSM parameter not found: {name}")
+        return values
+
+
+@dataclass
+class ParameterCacheStats:
+    """Counters describing parameter cache effectiveness."""
+
+    hits: int = 0
+    fetches: int = 0
+    background_refreshes: int = 0
+    stale_served: int = 0
+    errors: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class ParameterCache:
+    """
+    Container-wide parameter cache with a TTL and refresh-ahead.
+
+    Every fetch reads all declared parameters in one batch, so a container
+    makes roughly one call to its sources per TTL. Values younger than
+    ``ttl_seconds - refresh_ahead_seconds`` are served as is; older values are
+    still served while a background thread refreshes them. Expired values are
+    fetched synchronously, and if the sources fail, values up to
+    ``max_stale_seconds`` old are served rather than failing the request.
+
+    Sources are consulted in order and the first one that knows a name wins.
+    """
+
+    def __init__(
+        self,
+        sources: List[ParameterSource],
+        names: Iterable[str] = (),
+        ttl_seconds: float = 300,
+        refresh_ahead_seconds: float = 60,
+        max_stale_seconds: float = 60 * 60,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.sources = sources
+        self.ttl_seconds = ttl_seconds
+        self.refresh_ahead_seconds = refresh_ahead_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self.stats = ParameterCacheStats()
+        self._clock = clock
+        self._names: List[str] = []
+        self._values: Dict[str, str] = {}
+        self._fetched_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._refreshing = False
+        self.declare(*names)
+
+    @classmethod
+    def from_environment(
+        cls, ssm_client_factory: Callable[[], Any], names: Iterable[str] = ()
+    ) -> "ParameterCache":
+        """
+        Builds the cache from environment variables.
+
+        Environment variables named after each parameter take precedence, then
+        the JSON file at ``PARAMETERS_FILE`` if set, then SSM. Setting
+        ``PARAMETERS_OFFLINE`` drops SSM entirely. ``PARAMETER_CACHE_TTL_SECONDS``
+        sets the TTL.
+        """
+        sources: List[ParameterSource] = [EnvironmentParameterSource()]
+        if os.environ.get("PARAMETERS_FILE"):
+            sources.append(FileParameterSource(os.environ["PARAMETERS_FILE"]))
+        if not os.environ.get("PARAMETERS_OFFLINE"):
+            sources.append(SSMParameterSource(ssm_client_factory))
+        return cls(
+            sources,
+            names,
+            ttl_seconds=float(os.environ.get("PARAMETER_CACHE_TTL_SECONDS", "300")),
+        )
+
+    def declare(self, *names: str) -> None:
+        """Adds parameters to the set fetched on every refresh."""
+        with self._lock:
+            for name in names:
+                if name not in self._names:
+                    self._names.append(name)
+
+    def age(self, name: str) -> Optional[float]:
+        """Returns seconds since the parameter was fetched, or None if never."""
+        with self._lock:
+            fetched_at = self._fetched_at.get(name)
+        return None if fetched_at is None else self._clock() - fetched_at
+
+    def is_fresh(self, name: str) -> bool:
+        """Returns whether ``get`` can answer without waiting on a source."""
+        age = self.age(name)
+        return age is not None and age < self.ttl_seconds
+
+    def get(self, name: str) -> str:
+        """
+        Returns a parameter value.
+
+        Args:
+            name: The parameter name
+
+        Returns:
+            The parameter value
+
+        Raises:
+            ParameterError: If no source has the parameter and no usable cached
+                value exists
+        """
+        self.declare(name)
+        age = self.age(name)
+        if age is not None and age < self.ttl_seconds:
+            self.stats.hits += 1
+            if age >= self.ttl_seconds - self.refresh_ahead_seconds:
+                self._refresh_in_background()
+            return self._values[name]
+
+        with self._fetch_lock:
+            # Another thread may have fetched while this one waited
+            if self.is_fresh(name):
+                self.stats.hits += 1
+                return self._values[name]
+            try:
+                self._fetch()
+            except Exception as e:
+                self.stats.errors += 1
+                age = self.age(name)
+                if age is not None and age < self.max_stale_seconds:
+                    logger.warning(f"Serving stale parameter {name}: {str(e)}")
+                    self.stats.stale_served += 1
+                    return self._values[name]
+                raise ParameterError(f"Failed to retrieve parameter: {name}") from e
+
+        if name not in self._values:
+            raise ParameterError(f"Parameter not found: {name}")
+        return self._values[name]
+
+    def prefetch(self) -> None:
+        """Fetches every declared parameter now, in one batch."""
+        with self._fetch_lock:
+            self._fetch()
+
+    def clear(self) -> None:
+        """Drops every cached value."""
+        with self._lock:
+            self._values.clear()
+            self._fetched_at.clear()
+
+    def _fetch(self) -> None:
+        with self._lock:
+            remaining = list(self._names)
+        self.stats.fetches += 1
+        values: Dict[str, str] = {}
+        for source in self.sources:
+            if not remaining:
+                break
+            found = source.fetch(remaining)
+            values.update(found)
+            remaining = [name for name in remaining if name not in found]
+
+        now = self._clock()
+        with self._lock:
+            self._values.update(values)
+            for name in values:
+                self._fetched_at[name] = now
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        self.stats.background_refreshes += 1
+        threading.Thread(target=self._background_refresh, daemon=True).start()
+
+    def _background_refresh(self) -> None:
+        try:
+            self.prefetch()
+        except Exception as e:
+            logger.warning(f"Background parameter refresh failed: {str(e)}")
+        finally:
+            with self._lock:
+                self._refreshing = False
@@ -1,8 +1,29 @@
 from dataclasses import dataclass
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, AsyncIterator, Tuple, TYPE_CHECKING
+import asyncio
+import logging
 import random
-from openai.types.chat import ChatCompletion
-from base_handler import BaseLambdaHandler, ValidationError
+from article_pool import ArticlePool, PooledArticle
+from article_store import (
+    ArticleDigest,
+    ArticleStore,
+    StoredArticle,
+    article_id_for,
+    digest_messages,
+)
+from base_handler import (
+    AsyncBaseLambdaHandler,
+    ValidationError,
+    get_handler,
+    invocation_deadline,
+)
+
+if TYPE_CHECKING:
+    from openai.types.chat import ChatCompletion
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
 
 
 @dataclass
@@ -14,9 +35,26 @@ class ArticleGeneratorRequest:
 
 
 class ArticleGeneratorHandler(
-    BaseLambdaHandler[ArticleGeneratorRequest, Dict[str, Any]]
+    AsyncBaseLambdaHandler[ArticleGeneratorRequest, Dict[str, Any]]
 ):
-    """Handler for generating random topic articles."""
+    """
+    Handler for generating random topic articles.
+
+    GETs are served from a pool of pre-generated articles; the model is only
+    called live when the pool is empty. ``refill_pool`` tops the pool up and
+    runs on a schedule.
+
+    Every article is stored under its content hash and returned with its
+    ``article_id`` so the writing evaluator can grade summaries by reference.
+    Pre-generated articles get their digest at generation time.
+
+    ``stream_events`` serves the same article as Server-Sent Events for the
+    streaming endpoint (see ``reading_stream``), sending the topic at once
+    and live articles chunk by chunk as the model writes them.
+    """
+
+    REFILL_MAX_ARTICLES: int = 40
+    REFILL_CONCURRENCY: int = 5
 
     # List of available topics
     TOPICS: List[str] = [
@@ -42,53 +80,224 @@ class ArticleGeneratorHandler(
         "The significance of renewable energy sources",
     ]
 
-    def validate_request(self, body: Dict[str, Any]) -> ArticleGeneratorRequest:
+    async def validate_request(self, body: Dict[str, Any]) -> ArticleGeneratorRequest:
         """
         Validates the request. For this handler, we don't need any input parameters
         as we generate random topics.
         """
         return ArticleGeneratorRequest()
 
-    def process_request(self, request: ArticleGeneratorRequest) -> Dict[str, Any]:
-        """Generates an article about a random topic using OpenAI API."""
-        selected_topic = random.choice(self.TOPICS)
+    SYSTEM_PROMPT: str = (
+        "You are a creative and engaging English article generator, specializing in making learning fun and memorable. "
+        "Craft compelling, well-structured content that captivates the reader, using vivid examples, analogies, and storytelling techniques. "
+        "Your writing should feel dynamic and immersive, sparking curiosity and making complex topics easy to grasp."
+    )
 
-        try:
-            response: ChatCompletion = self.openai_client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are a creative and engaging English article generator, specializing in making learning fun and memorable. "
-                            "Craft compelling, well-structured content that captivates the reader, using vivid examples, analogies, and storytelling techniques. "
-                            "Your writing should feel dynamic and immersive, sparking curiosity and making complex topics easy to grasp."
-                        ),
-                    },
-                    {
-                        "role": "user",
-                        "content": (
-                            f"Write a short-length article (two paragraphs) about the topic: **{selected_topic}**. "
-                            "The article should be informative and engaging, suitable for English learning purposes. "
-                            "Format the response using structured text with clear sections, headings, and bold or italicized keywords. "
-                            "Use Markdown or another structured text format to enhance readability."
-                        ),
-                    },
-                ],
-                temperature=0.9,
-                max_tokens=300,
+    def article_messages(self, topic: str) -> List[Dict[str, str]]:
+        """Builds the chat messages asking for an article about ``topic``."""
+        return [
+            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": (
+                    f"Write a short-length article (two paragraphs) about the topic: **{topic}**. "
+                    "The article should be informative and engaging, suitable for English learning purposes. "
+                    "Format the response using structured text with clear sections, headings, and bold or italicized keywords. "
+                    "Use Markdown or another structured text format to enhance readability."
+                ),
+            },
+        ]
+
+    @property
+    def article_pool(self) -> ArticlePool:
+        """Container-wide pool of pre-generated articles."""
+        return self._registry.shared("article_pool", ArticlePool.from_environment)
+
+    async def generate_article(self, topic: str) -> str:
+        """Generates an article about ``topic`` using OpenAI API."""
+        response: "ChatCompletion" = await self.create_completion(
+            messages=self.article_messages(topic),
+            temperature=0.9,
+            max_tokens=300,
+        )
+        return response.choices[0].message.content.strip()
+
+    @property
+    def article_store(self) -> ArticleStore:
+        """Container-wide store of articles by content hash."""
+        return self._registry.shared("article_store", ArticleStore.from_environment)
+
+    async def publish_article(
+        self, topic: str, article: str, with_digest: bool = False
+    ) -> str:
+        """
+        Stores a generated article and adds it to the pool.
+
+        Args:
+            topic: The article topic
+            article: The article text
+            with_digest: Whether to compute the article digest now
+
+        Returns:
+            The article's content-addressed id
+        """
+        article_id = article_id_for(article)
+        digest: Optional[ArticleDigest] = None
+        if with_digest:
+            try:
+                digest = await self.create_structured(
+                    digest_messages(article), ArticleDigest, temperature=0
+                )
+            except Exception as e:
+                logger.warning(f"Failed to digest article {article_id}: {str(e)}")
+
+        def save() -> None:
+            self.article_store.put(
+                StoredArticle(
+                    article_id=article_id, topic=topic, article=article, digest=digest
+                )
+            )
+            self.article_pool.add(
+                PooledArticle(topic=topic, article=article, article_id=article_id)
             )
 
-            article = response.choices[0].message.content.strip()
+        try:
+            await asyncio.to_thread(save)
+        except Exception as e:
+            logger.warning(f"Failed to store article {article_id}: {str(e)}")
+        return article_id
+
+    async def process_request(self, request: ArticleGeneratorRequest) -> Dict[str, Any]:
+        """Serves a pooled article, generating one live only if the pool is empty."""
+        pooled = await asyncio.to_thread(self.article_pool.random_article)
+        self.metrics.put_metric("PooledArticleServed", int(pooled is not None))
+        if pooled is not None:
+            return {
+                "topic": pooled.topic,
+                "article": pooled.article,
+                "article_id": pooled.article_id,
+            }
 
-            return {"topic": selected_topic, "article": article}
+        selected_topic = random.choice(self.TOPICS)
+
+        try:
+            article = await self.generate_article(selected_topic)
+            article_id = await self.publish_article(selected_topic, article)
+
+            return {
+                "topic": selected_topic,
+                "article": article,
+                "article_id": article_id,
+            }
 
         except Exception as e:
             logger.error(f"Failed to generate article: {str(e)}")
             raise
 
+    async def stream_events(self) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Generates an article as a sequence of ``(event, data)`` pairs.
+
+        The ``topic`` event is yielded before the model is called, followed by
+        one ``chunk`` event per Markdown delta and a final ``done`` event
+        carrying the ``topic`` and ``article_id``. A pooled article is sent as
+        a single ``chunk``.
+        """
+        pooled = await asyncio.to_thread(self.article_pool.random_article)
+        self.metrics.put_metric("PooledArticleServed", int(pooled is not None))
+        if pooled is not None:
+            yield "topic", pooled.topic
+            yield "chunk", pooled.article
+            yield "done", {"topic": pooled.topic, "article_id": pooled.article_id}
+            return
+
+        selected_topic = random.choice(self.TOPICS)
+        yield "topic", selected_topic
+
+        chunks: List[str] = []
+        stream = await self.create_completion(
+            messages=self.article_messages(selected_topic),
+            temperature=0.9,
+            max_tokens=300,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                chunks.append(chunk.choices[0].delta.content)
+                yield "chunk", chunk.choices[0].delta.content
+
+        article_id = await self.publish_article(selected_topic, "".join(chunks).strip())
+        yield "done", {"topic": selected_topic, "article_id": article_id}
+
+    async def refill_pool(self) -> Dict[str, Any]:
+        """
+        Expires old articles and tops up topics below their target.
+
+        At most ``REFILL_MAX_ARTICLES`` articles are generated per run, with
+        ``REFILL_CONCURRENCY`` model calls in flight.
+
+        Returns:
+            Dictionary with the number of articles expired, generated and failed
+        """
+        expired = await asyncio.to_thread(self.article_pool.expire)
+        shortfall = await asyncio.to_thread(self.article_pool.shortfall, self.TOPICS)
+
+        # Interleave topics so a capped run still spreads across all of them
+        topics: List[str] = []
+        while shortfall and len(topics) < self.REFILL_MAX_ARTICLES:
+            for topic in list(shortfall):
+                topics.append(topic)
+                shortfall[topic] -= 1
+                if not shortfall[topic]:
+                    del shortfall[topic]
+
+        async def pre_generate(topic: str) -> str:
+            article = await self.generate_article(topic)
+            return await self.publish_article(topic, article, with_digest=True)
+
+        topics = topics[: self.REFILL_MAX_ARTICLES]
+        outcomes = await self.gather_bounded(
+            [pre_generate(topic) for topic in topics], self.REFILL_CONCURRENCY
+        )
+        generated = 0
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                logger.error(f"Failed to pre-generate article: {str(outcome)}")
+                continue
+            generated += 1
+
+        return {
+            "expired": expired,
+            "generated": generated,
+            "failed": len(topics) - generated,
+        }
+
+    def refill(self, context: Any) -> Dict[str, Any]:
+        """
+        Runs ``refill_pool`` on the shared event loop, like ``handle`` runs a
+        request: under the deadline of the Lambda context and with the run's
+        metrics emitted (as ``ArticlePoolRefill``).
+        """
+        with invocation_deadline(context), self.instrument(
+            context, "ArticlePoolRefill"
+        ) as metrics:
+            result = self._registry.run(self.refill_pool())
+            metrics.put_metric("ArticlesExpired", result["expired"])
+            metrics.put_metric("ArticlesGenerated", result["generated"])
+            metrics.put_metric("ArticlesFailed", result["failed"])
+            return result
+
 
 # Lambda handler function
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
-    handler = ArticleGeneratorHandler()
+    handler = get_handler(ArticleGeneratorHandler)
     return handler.handle(event, context)
+
+
+def refill_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """Scheduled entry point that refills the article pool."""
+    handler = get_handler(ArticleGeneratorHandler)
+    result = handler.refill(context)
+    logger.info(f"Article pool refill: {result}")
+    return result
@@ -0,0 +1,229 @@
+"""
+Streaming endpoint of the reading generator.
+
+API Gateway REST integrations buffer the whole Lambda response, so the
+article is streamed through a Lambda function URL with
+``InvokeMode: RESPONSE_STREAM`` instead. The Lambda Web Adapter layer starts
+this module as a small HTTP/1.1 server (see ``run.sh``) and forwards each
+invocation to it as a request; whatever the server writes is streamed to the
+caller as it is written.
+
+``GET /`` answers with ``text/event-stream``: a ``topic`` event, one
+``chunk`` event per Markdown delta and a ``done`` event with the
+``article_id`` the writing evaluator grades summaries against. Failures after
+the headers are sent become an ``error`` event with the status and message
+the JSON endpoint would have returned.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from base_handler import APIGatewayResponse, get_handler, invocation_deadline, registry
+from reading_generator import ArticleGeneratorHandler
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+READINESS_PATH = os.environ.get("AWS_LWA_READINESS_CHECK_PATH", "/healthz")
+# Header in which the Lambda Web Adapter forwards the invocation's context
+LAMBDA_CONTEXT_HEADER = "x-amzn-lambda-context"
+MAX_HEADER_BYTES = 64 * 1024
+
+STATUS_REASONS = {
+    200: "OK",
+    204: "No Content",
+    400: "Bad Request",
+    405: "Method Not Allowed",
+}
+
+
+@dataclass
+class StreamContext:
+    """
+    The parts of the Lambda context the handlers use, rebuilt from the header
+    the Lambda Web Adapter sends with each request.
+
+    Attributes:
+        aws_request_id: The invocation's request id
+        deadline_ms: Epoch milliseconds at which the invocation times out, or
+            None when unknown (local runs)
+    """
+
+    aws_request_id: Optional[str] = None
+    deadline_ms: Optional[float] = None
+
+    @classmethod
+    def from_header(cls, value: Optional[str]) -> "StreamContext":
+        """Parses the JSON Lambda context forwarded by the adapter."""
+        if not value:
+            return cls()
+        try:
+            context = json.loads(value)
+        except json.JSONDecodeError:
+            logger.warning(f"Ignoring malformed {LAMBDA_CONTEXT_HEADER} header")
+            return cls()
+        deadline = context.get("deadline")
+        return cls(
+            aws_request_id=context.get("request_id"),
+            deadline_ms=float(deadline) if deadline is not None else None,
+        )
+
+    def get_remaining_time_in_millis(self) -> Optional[int]:
+        if self.deadline_ms is None:
+            return None
+        return max(0, int(self.deadline_ms - time.time() * 1000))
+
+
+def deadline_context(context: StreamContext) -> Any:
+    """Returns the context ``invocation_deadline`` should read, if any."""
+    return context if context.deadline_ms is not None else None
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    """
+    Reads the request line and headers of one HTTP/1.1 request.
+
+    Request bodies are not used by this endpoint and are not read.
+
+    Returns:
+        ``method``, ``path`` and lowercased ``headers``, or None if the client
+        sent nothing usable
+    """
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+        return None
+    lines = head.decode("latin-1").split("\r\n")
+    parts = lines[0].split(" ")
+    if len(parts) != 3:
+        return None
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        if name:
+            headers[name.strip().lower()] = value.strip()
+    return {"method": parts[0], "path": parts[1].split("?", 1)[0], "headers": headers}
+
+
+def response_head(status: int, headers: Dict[str, str]) -> bytes:
+    """Formats the status line and headers of a response."""
+    lines = [f"HTTP/1.1 {status} {STATUS_REASONS.get(status, '')}"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    lines.append("Connection: close")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode()
+
+
+async def write_plain(writer: asyncio.StreamWriter, status: int, body: str) -> None:
+    """Writes a complete plain-text response."""
+    payload = body.encode()
+    headers = {
+        **APIGatewayResponse.CORS_HEADERS,
+        "Content-Type": "text/plain",
+        "Content-Length": str(len(payload)),
+    }
+    writer.write(response_head(status, headers) + payload)
+    await writer.drain()
+
+
+async def write_chunk(writer: asyncio.StreamWriter, data: str) -> None:
+    """Writes one chunk of a chunked response and flushes it."""
+    payload = data.encode()
+    writer.write(f"{len(payload):X}\r\n".encode() + payload + b"\r\n")
+    await writer.drain()
+
+
+async def stream_article(writer: asyncio.StreamWriter, context: StreamContext) -> None:
+    """
+    Streams one article as Server-Sent Events.
+
+    Runs under the invocation's deadline and metrics like ``handle`` does;
+    ``FirstEventLatency`` records how long the caller waited for the first
+    event.
+    """
+    handler = get_handler(ArticleGeneratorHandler)
+    headers = {
+        **APIGatewayResponse.CORS_HEADERS,
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "Transfer-Encoding": "chunked",
+    }
+    with invocation_deadline(deadline_context(context)), handler.instrument(
+        context, "ReadingGeneratorStream"
+    ) as metrics:
+        started = time.perf_counter()
+        writer.write(response_head(200, headers))
+        status_code = 200
+        try:
+            first = True
+            async for event, data in handler.stream_events():
+                await write_chunk(writer, APIGatewayResponse.format_event(event, data))
+                if first:
+                    metrics.add_timing(
+                        "firstEvent", (time.perf_counter() - started) * 1000
+                    )
+                    first = False
+        except (ConnectionError, asyncio.CancelledError):
+            logger.warning("Client disconnected while streaming an article")
+            raise
+        except Exception as e:
+            response = handler.error_response(e)
+            status_code = response["statusCode"]
+            error = {"status": status_code, **json.loads(response["body"])}
+            await write_chunk(writer, APIGatewayResponse.format_event("error", error))
+        finally:
+            handler.finish_metrics(metrics, {"statusCode": status_code})
+        await write_chunk(writer, "")
+
+
+async def handle_connection(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    """Serves one request, then closes the connection."""
+    try:
+        request = await read_request(reader)
+        if request is None:
+            await write_plain(writer, 400, "Bad Request")
+        elif request["method"] == "OPTIONS":
+            writer.write(response_head(204, APIGatewayResponse.CORS_HEADERS))
+            await writer.drain()
+        elif request["method"] != "GET":
+            await write_plain(writer, 405, "Method Not Allowed")
+        elif request["path"] == READINESS_PATH:
+            await write_plain(writer, 200, "ok")
+        else:
+            context = StreamContext.from_header(
+                request["headers"].get(LAMBDA_CONTEXT_HEADER)
+            )
+            await stream_article(writer, context)
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host: str, port: int) -> None:
+    """Serves the streaming endpoint until cancelled."""
+    server = await asyncio.start_server(
+        handle_connection, host, port, limit=MAX_HEADER_BYTES
+    )
+    logger.info(f"Reading stream listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    """Entry point started by ``run.sh`` under the Lambda Web Adapter."""
+    # Runs on the registry's loop so the shared AsyncOpenAI client, executor
+    # and stores are the same ones the JSON handlers use.
+    registry.run(
+        serve(os.environ.get("HOST", "127.0.0.1"), int(os.environ.get("PORT", "8080")))
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import base64
+import gzip
+import importlib.util
+import json
+import logging
+import os
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Smaller bodies fit in one packet either way, and compressing them costs more
+# (base64, headers, CPU) than it saves
+MIN_COMPRESSION_BYTES = 1024
+GZIP_LEVEL = 6
+# Quality 11 is for static assets; 5 compresses dynamic text about as well as
+# gzip -9 in a fraction of the time
+BROTLI_QUALITY = 5
+
+
+@lru_cache(maxsize=None)
+def json_backend() -> Optional[Any]:
+    """
+    Returns the orjson module when it is installed, None otherwise.
+
+    ``JSON_BACKEND=stdlib`` forces the standard library encoder.
+    """
+    if os.environ.get("JSON_BACKEND", "").lower() == "stdlib":
+        return None
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+
+def dumps(value: Any) -> str:
+    """
+    Serializes a response body to JSON, with orjson when available.
+
+    orjson writes compact UTF-8 rather than escaped ASCII; values it rejects
+    (integers beyond 64 bits, non-string keys) fall back to ``json.dumps``.
+    """
+    backend = json_backend()
+    if backend is not None:
+        try:
+            return backend.dumps(value).decode("utf-8")
+        except TypeError:
+            pass
+    return json.dumps(value)
+
+
+@lru_cache(maxsize=None)
+def available_encodings() -> Tuple[str, ...]:
+    """Content codings this container can produce, most preferred first."""
+    if importlib.util.find_spec("brotli") is not None:
+        return ("br", "gzip")
+    return ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Picks the content coding for a response from an ``Accept-Encoding`` header.
+
+    The coding with the highest quality value wins, brotli on ties; codings
+    with ``q=0`` are refused and ``*`` stands for any coding not listed.
+
+    Args:
+        accept_encoding: The request's Accept-Encoding header, possibly empty
+
+    Returns:
+        "br" or "gzip", or None to send the body uncompressed
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, *params = [token.strip() for token in part.split(";")]
+        if not name:
+            continue
+        weight = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name.lower()] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in available_encodings():
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compresses data with the given content coding ("br" or "gzip")."""
+    if encoding == "br":
+        import brotli
+
+        return brotli.compress(data, quality=BROTLI_QUALITY, mode=brotli.MODE_TEXT)
+    # mtime=0 keeps the output identical for identical bodies
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def encode_response(
+    response: Dict[str, Any],
+    accept_encoding: str,
+    min_bytes: int = MIN_COMPRESSION_BYTES,
+) -> Dict[str, Any]:
+    """
+    Compresses the body of an API Gateway response if the client accepts it.
+
+    Compressed bodies are returned base64-encoded with ``isBase64Encoded``,
+    which API Gateway decodes back to binary for the client (the API must
+    list ``*/*`` as a binary media type). Bodies under ``min_bytes``, or that
+    do not get smaller, are returned unchanged.
+
+    Args:
+        response: An API Gateway proxy response with a string body
+        accept_encoding: The request's Accept-Encoding header
+        min_bytes: The smallest body worth compressing
+
+    Returns:
+        The response, compressed where worthwhile
+    """
+    body = response.get("body") or ""
+    data = body.encode("utf-8")
+    if len(data) < min_bytes:
+        return response
+    headers = {**response.get("headers", {}), "Vary": "Accept-Encoding"}
+    encoding = negotiate_encoding(accept_encoding)
+    if encoding is not None:
+        try:
+            compressed = compress(data, encoding)
+        except Exception as e:
+            logger.warning(f"Failed to compress response with {encoding}: {str(e)}")
+            compressed = data
+        if len(compressed) < len(data):
+            return {
+                **response,
+                "headers": {**headers, "Content-Encoding": encoding},
+                "body": base64.b64encode(compressed).decode("ascii"),
+                "isBase64Encoded": True,
+            }
+    return {**response, "headers": headers}
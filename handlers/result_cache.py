@@ -0,0 +1,320 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Optional, Callable, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from metrics import InvocationMetrics
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+def normalize_text(text: str, lowercase: bool = False) -> str:
+    """Collapses runs of whitespace and optionally lowercases the text."""
+    normalized = " ".join(text.split())
+    return normalized.lower() if lowercase else normalized
+
+
+def make_cache_key(
+    handler: str, model: str, prompt_version: str, inputs: Dict[str, Any]
+) -> str:
+    """
+    Builds a content-addressed key for an evaluation result.
+
+    Args:
+        handler: Name of the handler producing the result
+        model: Model used for the evaluation
+        prompt_version: Version of the prompt template
+        inputs: Normalized request inputs
+
+    Returns:
+        A hex SHA-256 digest identifying the evaluation
+    """
+    payload = json.dumps(
+        {"h": handler, "m": model, "p": prompt_version, "i": inputs},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """
+    Counters used to size the cache, over the container's lifetime.
+
+    Per-invocation counts go to the ``ResultCacheHits``, ``ResultCacheMisses``
+    and ``ResultCacheEvictions`` metrics of the ``metrics`` passed to
+    ``ResultCache.get`` and ``ResultCache.put``.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    persistent_hits: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    backend_errors: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        stats = asdict(self)
+        lookups = self.hits + self.misses
+        stats["hit_rate"] = round(self.hits / lookups, 4) if lookups else 0.0
+        return stats
+
+
+class LRUCache:
+    """Bounded, thread-safe in-memory LRU cache with per-entry TTL."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        stats: Optional[CacheStats] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stats = stats or CacheStats()
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.stats.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Any) -> int:
+        """Stores a value, returning how many entries it evicted."""
+        evicted = 0
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+            self.stats.evictions += evicted
+        return evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class CacheBackend(ABC):
+    """Persistent tier shared between containers."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Returns the stored value, or None when missing or expired."""
+        pass
+
+    @abstractmethod
+    def put(self, key: str, value: Dict[str, Any], ttl_seconds: float) -> None:
+        """Stores a value that expires after ``ttl_seconds``."""
+        pass
+
+
+class DynamoDBCacheBackend(CacheBackend):
+    """
+    DynamoDB-backed persistent tier.
+
+    Items are ``{cache_key, value, expires_at}``; ``expires_at`` should be
+    configured as the table's TTL attribute. Expiry is also checked on read
+    because DynamoDB deletes expired items lazily.
+    """
+
+    def __init__(self, table_name: str, client: Optional[Any] = None):
+        self.table_name = table_name
+        self._client = client
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            import boto3
+
+            self._client = boto3.client("dynamodb")
+        return self._client
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        response = self.client.get_item(
+            TableName=self.table_name,
+            Key={"cache_key": {"S": key}},
+            ConsistentRead=False,
+        )
+        item = response.get("Item")
+        if not item or int(item["expires_at"]["N"]) <= int(time.time()):
+            return None
+        return json.loads(item["value"]["S"])
+
+    def put(self, key: str, value: Dict[str, Any], ttl_seconds: float) -> None:
+        self.client.put_item(
+            TableName=self.table_name,
+            Item={
+                "cache_key": {"S": key},
+                "value": {"S": json.dumps(value)},
+                "expires_at": {"N": str(int(time.time() + ttl_seconds))},
+            },
+        )
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """SQLite stand-in for the persistent tier, for tests and local runs."""
+
+    def __init__(self, path: str = ":memory:"):
+        import sqlite3
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(cache_key TEXT PRIMARY KEY, value TEXT, expires_at REAL)"
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM results WHERE cache_key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Dict[str, Any], ttl_seconds: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + ttl_seconds),
+            )
+            self._conn.commit()
+
+
+class ResultCache:
+    """
+    Two-tier evaluation result cache.
+
+    Lookups hit the in-memory LRU first, then the optional persistent backend;
+    persistent hits are promoted into memory. Backend failures are logged and
+    treated as misses so the cache never fails a request.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 24 * 60 * 60,
+        backend: Optional[CacheBackend] = None,
+    ):
+        self.stats = CacheStats()
+        self.memory = LRUCache(max_entries, ttl_seconds, self.stats)
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+
+    @classmethod
+    def from_environment(cls) -> "ResultCache":
+        """
+        Builds the cache from environment variables.
+
+        ``RESULT_CACHE_TABLE`` selects the DynamoDB tier and
+        ``RESULT_CACHE_SQLITE_PATH`` the local SQLite stand-in; with neither set
+        the cache is memory-only.
+        """
+        backend: Optional[CacheBackend] = None
+        if os.environ.get("RESULT_CACHE_TABLE"):
+            backend = DynamoDBCacheBackend(os.environ["RESULT_CACHE_TABLE"])
+        elif os.environ.get("RESULT_CACHE_SQLITE_PATH"):
+            backend = SQLiteCacheBackend(os.environ["RESULT_CACHE_SQLITE_PATH"])
+        return cls(
+            max_entries=int(os.environ.get("RESULT_CACHE_MAX_ENTRIES", "1024")),
+            ttl_seconds=float(os.environ.get("RESULT_CACHE_TTL_SECONDS", "86400")),
+            backend=backend,
+        )
+
+    def get(
+        self,
+        key: str,
+        metrics: Optional["InvocationMetrics"] = None,
+        count: bool = True,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Looks a key up in memory, then in the persistent tier.
+
+        Args:
+            key: The cache key
+            metrics: The invocation's metrics, to count the lookup in
+            count: False for a recheck of a key the caller just missed, which
+                must not count as a second lookup
+
+        Returns:
+            The cached value, or None
+        """
+        value = self.memory.get(key)
+        if value is None and self.backend is not None:
+            try:
+                value = self.backend.get(key)
+            except Exception as e:
+                self.stats.backend_errors += 1
+                logger.warning(f"Result cache backend read failed: {str(e)}")
+                value = None
+            if value is not None:
+                if count:
+                    self.stats.persistent_hits += 1
+                self._count_evictions(self.memory.put(key, value), metrics)
+
+        if count:
+            hit = value is not None
+            if hit:
+                self.stats.hits += 1
+            else:
+                self.stats.misses += 1
+            if metrics is not None:
+                metrics.increment("ResultCacheHits", int(hit))
+                metrics.increment("ResultCacheMisses", int(not hit))
+        return value
+
+    def put(
+        self,
+        key: str,
+        value: Dict[str, Any],
+        metrics: Optional["InvocationMetrics"] = None,
+    ) -> None:
+        """Stores a value in both tiers, counting evictions in ``metrics``."""
+        self._count_evictions(self.memory.put(key, value), metrics)
+        if self.backend is not None:
+            try:
+                self.backend.put(key, value, self.ttl_seconds)
+            except Exception as e:
+                self.stats.backend_errors += 1
+                logger.warning(f"Result cache backend write failed: {str(e)}")
+
+    def clear(self) -> None:
+        """Clears the in-memory tier; the persistent tier expires by TTL."""
+        self.memory.clear()
+
+    @staticmethod
+    def _count_evictions(
+        evicted: int, metrics: Optional["InvocationMetrics"]
+    ) -> None:
+        if metrics is not None:
+            metrics.increment("ResultCacheEvictions", evicted)
@@ -0,0 +1,89 @@
+import importlib
+import logging
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Tuple
+
+from base_handler import APIGatewayResponse, AsyncBaseLambdaHandler, get_handler
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+@dataclass(frozen=True)
+class Route:
+    """
+    An endpoint served by the router.
+
+    Attributes:
+        module (str): Module defining the handler, imported on first use.
+        handler (str): Name of the AsyncBaseLambdaHandler subclass in that module.
+        methods (Tuple[str, ...]): HTTP methods the endpoint accepts besides
+            OPTIONS.
+    """
+
+    module: str
+    handler: str
+    methods: Tuple[str, ...]
+
+
+API_PREFIX = "/api/v1"
+
+ROUTES: Dict[str, Route] = {
+    f"{API_PREFIX}/word-evaluator": Route(
+        "word_evaluator", "WordUsageHandler", ("POST",)
+    ),
+    f"{API_PREFIX}/reading-generator": Route(
+        "reading_generator", "ArticleGeneratorHandler", ("GET",)
+    ),
+    f"{API_PREFIX}/writing-evaluator": Route(
+        "writing_evaluator", "SummaryEvaluationHandler", ("POST",)
+    ),
+    f"{API_PREFIX}/verb-tense-evaluator": Route(
+        "verb_tense_evaluator", "TenseAnalysisHandler", ("POST",)
+    ),
+}
+
+
+def find_route(event: Dict[str, Any]) -> Optional[Route]:
+    """
+    Returns the route for an API Gateway event, or None if nothing matches.
+
+    The resource template is preferred; the raw path is matched by suffix so
+    stage names and custom-domain base paths in front of it do not matter.
+    """
+    resource = (event.get("resource") or "").rstrip("/")
+    if resource in ROUTES:
+        return ROUTES[resource]
+    path = (event.get("path") or "").rstrip("/")
+    for route_path, route in ROUTES.items():
+        if path == route_path or path.endswith(route_path):
+            return route
+    return None
+
+
+def route_handler(route: Route) -> AsyncBaseLambdaHandler:
+    """Returns the container-wide handler instance serving a route."""
+    module = importlib.import_module(route.module)
+    return get_handler(getattr(module, route.handler))
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    AWS Lambda entry point serving every endpoint from one function.
+
+    All endpoints share one pool of warm containers, so a request to a rarely
+    used endpoint lands on a container the busy endpoints keep warm. Handler
+    modules are imported, and handlers built, the first time a container
+    serves their route.
+    """
+    route = find_route(event)
+    if route is None:
+        logger.warning(f"No route for path: {event.get('path')}")
+        return APIGatewayResponse.error(404, "Not found")
+
+    method = event.get("httpMethod", "")
+    if method != "OPTIONS" and method not in route.methods:
+        return APIGatewayResponse.error(405, f"Method {method} not allowed")
+
+    return route_handler(route).handle(event, context)
@@ -0,0 +1,5 @@
+#!/bin/bash
+# Started by the Lambda Web Adapter layer (AWS_LAMBDA_EXEC_WRAPPER=/opt/bootstrap)
+# in place of the Python runtime; layers are not on the path of a plain python3.
+export PYTHONPATH="/opt/python/lib/python3.12/site-packages:/opt/python:$LAMBDA_TASK_ROOT"
+exec python3 "$LAMBDA_TASK_ROOT/reading_stream.py"
@@ -0,0 +1,338 @@
+import asyncio
+import copy
+import logging
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Optional, Callable, Awaitable, Tuple, TypeVar
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+T = TypeVar("T")
+
+
+@dataclass
+class SingleFlightStats:
+    """Counters describing how many calls single-flight saved."""
+
+    leaders: int = 0
+    shared: int = 0
+    remote_shared: int = 0
+    remote_timeouts: int = 0
+    lock_errors: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key within a process.
+
+    The first caller of a key (the leader) runs the call; callers arriving
+    while it is in flight wait for it and get a copy of its result, or its
+    exception. Tasks on any event loop share the same flights. Nothing is
+    kept once a call finishes; caching is left to the result cache.
+    """
+
+    def __init__(self):
+        self.stats = SingleFlightStats()
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    async def run_async(
+        self, key: str, call: Callable[[], Awaitable[T]]
+    ) -> Tuple[T, bool]:
+        """
+        Runs ``call`` unless an identical call is already in flight.
+
+        Returns:
+            Tuple of the result and whether it was shared from another caller
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return copy.deepcopy(await asyncio.wrap_future(future)), True
+        try:
+            value = await call()
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        self._settle(key, future, value=value)
+        return value, False
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.stats.shared += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self.stats.leaders += 1
+            return future, True
+
+    def _settle(
+        self,
+        key: str,
+        future: Future,
+        value: Any = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+
+class FlightLockBackend(ABC):
+    """Conditional-write lock table shared by every container."""
+
+    @abstractmethod
+    def acquire(self, key: str, owner: str, lease_seconds: float) -> bool:
+        """Takes the lock if nobody holds it or its lease expired."""
+        pass
+
+    @abstractmethod
+    def release(self, key: str, owner: str) -> None:
+        """Drops the owner's lock."""
+        pass
+
+
+class DynamoDBFlightLockBackend(FlightLockBackend):
+    """
+    DynamoDB lock table using conditional writes.
+
+    Items are ``{flight_key, owner, expires_at}``; ``expires_at`` should be
+    configured as the table's TTL attribute so locks left behind by crashed
+    containers are cleaned up.
+    """
+
+    def __init__(self, table_name: str, client: Optional[Any] = None):
+        self.table_name = table_name
+        self._client = client
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            import boto3
+
+            self._client = boto3.client("dynamodb")
+        return self._client
+
+    def acquire(self, key: str, owner: str, lease_seconds: float) -> bool:
+        now = time.time()
+        try:
+            self.client.put_item(
+                TableName=self.table_name,
+                Item={
+                    "flight_key": {"S": key},
+                    "owner": {"S": owner},
+                    "expires_at": {"N": str(now + lease_seconds)},
+                },
+                ConditionExpression=(
+                    "attribute_not_exists(flight_key) OR expires_at < :now"
+                ),
+                ExpressionAttributeValues={":now": {"N": str(now)}},
+            )
+            return True
+        except Exception as e:
+            if _is_condition_failure(e):
+                return False
+            raise
+
+    def release(self, key: str, owner: str) -> None:
+        try:
+            self.client.delete_item(
+                TableName=self.table_name,
+                Key={"flight_key": {"S": key}},
+                ConditionExpression="#owner = :owner",
+                ExpressionAttributeNames={"#owner": "owner"},
+                ExpressionAttributeValues={":owner": {"S": owner}},
+            )
+        except Exception as e:
+            if not _is_condition_failure(e):
+                raise
+
+
+def _is_condition_failure(error: Exception) -> bool:
+    response = getattr(error, "response", None) or {}
+    code = response.get("Error", {}).get("Code")
+    return code == "ConditionalCheckFailedException"
+
+
+class SQLiteFlightLockBackend(FlightLockBackend):
+    """
+    SQLite stand-in for the lock table, for tests and local runs.
+
+    A file path is shared by every process opening it, so several local
+    processes coordinate like containers do through DynamoDB.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        import sqlite3
+
+        self._conn = sqlite3.connect(
+            path, timeout=5, isolation_level=None, check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS flights "
+                "(flight_key TEXT PRIMARY KEY, owner TEXT, expires_at REAL)"
+            )
+
+    def acquire(self, key: str, owner: str, lease_seconds: float) -> bool:
+        now = time.time()
+        with self._lock:
+            # BEGIN IMMEDIATE makes the check and the write one atomic step
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT expires_at FROM flights WHERE flight_key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[0] >= now:
+                    return False
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO flights (flight_key, owner, expires_at) "
+                    "VALUES (?, ?, ?)",
+                    (key, owner, now + lease_seconds),
+                )
+                return True
+            finally:
+                self._conn.execute("COMMIT")
+
+    def release(self, key: str, owner: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM flights WHERE flight_key = ? AND owner = ?", (key, owner)
+            )
+
+
+class DistributedSingleFlight:
+    """
+    Coalesces identical calls across containers through a lock table.
+
+    The lock is the only thing shared: the container that takes a key's lock
+    computes the result, stores it in the result cache and releases the lock.
+    The others wait for the lock, and whoever takes it next re-reads the
+    result cache before computing, so results keep the cache's keying and
+    expiry. A waiter computes the result itself when the cache still misses
+    (the leader failed, or its lease expired) or waiting would leave it too
+    little time, and any lock table error falls back to computing directly,
+    so the lock never fails a request. Lock table calls run in worker
+    threads, off the event loop.
+    """
+
+    def __init__(
+        self,
+        backend: FlightLockBackend,
+        lease_seconds: float = 30,
+        poll_seconds: float = 0.25,
+    ):
+        self.backend = backend
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.owner = uuid.uuid4().hex
+        self.stats = SingleFlightStats()
+
+    @classmethod
+    def from_environment(cls) -> Optional["DistributedSingleFlight"]:
+        """
+        Builds the cross-container layer from environment variables.
+
+        ``SINGLE_FLIGHT_TABLE`` selects the DynamoDB lock table and
+        ``SINGLE_FLIGHT_SQLITE_PATH`` the local SQLite stand-in; with neither
+        set, single-flight stays within the container and None is returned.
+        """
+        if os.environ.get("SINGLE_FLIGHT_TABLE"):
+            backend: FlightLockBackend = DynamoDBFlightLockBackend(
+                os.environ["SINGLE_FLIGHT_TABLE"]
+            )
+        elif os.environ.get("SINGLE_FLIGHT_SQLITE_PATH"):
+            backend = SQLiteFlightLockBackend(os.environ["SINGLE_FLIGHT_SQLITE_PATH"])
+        else:
+            return None
+        return cls(
+            backend,
+            lease_seconds=float(os.environ.get("SINGLE_FLIGHT_LEASE_SECONDS", "30")),
+        )
+
+    async def run_async(
+        self,
+        key: str,
+        call: Callable[[], Awaitable[T]],
+        recheck: Callable[[], Awaitable[Optional[T]]],
+        wait_seconds: float,
+    ) -> Tuple[T, bool]:
+        """
+        Runs ``call`` unless another container is already computing ``key``.
+
+        Args:
+            key: Identifies the computation
+            call: Computes the result and stores it where ``recheck`` reads
+            recheck: Reads the stored result, None if there is none
+            wait_seconds: Longest time to wait for another container
+
+        Returns:
+            Tuple of the result and whether another container computed it
+        """
+        give_up_at = time.monotonic() + wait_seconds
+        waited = False
+        while True:
+            state = await asyncio.to_thread(self._poll, key)
+            if state == "lead" and waited:
+                # The previous holder released the lock: use its result
+                value = await recheck()
+                if value is not None:
+                    await asyncio.to_thread(self._release, key)
+                    self.stats.remote_shared += 1
+                    return value, True
+            if state != "wait":
+                return await self._lead(key, call, state == "lead"), False
+            if time.monotonic() + self.poll_seconds > give_up_at:
+                self.stats.remote_timeouts += 1
+                return await call(), False
+            waited = True
+            await asyncio.sleep(self.poll_seconds)
+
+    def _poll(self, key: str) -> str:
+        """
+        Tries to take the lock.
+
+        Returns:
+            ``"lead"`` when this container holds the lock, ``"wait"`` while
+            another container holds it, and ``"bypass"`` when the lock table
+            is unavailable
+        """
+        try:
+            if self.backend.acquire(key, self.owner, self.lease_seconds):
+                self.stats.leaders += 1
+                return "lead"
+        except Exception as e:
+            self.stats.lock_errors += 1
+            logger.warning(f"Single-flight lock table unavailable: {str(e)}")
+            return "bypass"
+        return "wait"
+
+    async def _lead(
+        self, key: str, call: Callable[[], Awaitable[T]], locked: bool
+    ) -> T:
+        try:
+            return await call()
+        finally:
+            if locked:
+                await asyncio.to_thread(self._release, key)
+
+    def _release(self, key: str) -> None:
+        try:
+            self.backend.release(key, self.owner)
+        except Exception as e:
+            logger.warning(f"Failed to release single-flight lock: {str(e)}")
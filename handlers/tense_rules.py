@@ -0,0 +1,485 @@
+import json
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple, FrozenSet
+
+from contractions import expand_contractions
+from word_precheck import INFLECTIONS_PATH, tokenize
+
+# Canonical tense names, in the form the explanations use
+TENSE_FORMS = {
+    "present simple": "the base form of the verb, with -s after he, she or it",
+    "present continuous": "am, is or are plus the -ing form",
+    "present perfect": "has or have plus the past participle",
+    "present perfect continuous": "has or have been plus the -ing form",
+    "past simple": "the past form of the verb",
+    "past continuous": "was or were plus the -ing form",
+    "past perfect": "had plus the past participle",
+    "past perfect continuous": "had been plus the -ing form",
+    "future simple": "will plus the base form",
+    "future continuous": "will be plus the -ing form",
+    "future perfect": "will have plus the past participle",
+    "future perfect continuous": "will have been plus the -ing form",
+}
+
+# Words allowed in a tense name besides the time and aspect
+TENSE_NAME_FILLER = {"simple", "tense", "the", "aspect", "verb", "indefinite"}
+TENSE_NAME_SYNONYMS = {
+    "progressive": "continuous",
+    "preterite": "past",
+    "preterit": "past",
+    "pluperfect": "past perfect",
+}
+
+SUBJECT_PRONOUNS = {
+    "i": "first",
+    "you": "other",
+    "we": "other",
+    "they": "other",
+    "he": "third",
+    "she": "third",
+    "it": "third",
+}
+DETERMINERS = frozenset(
+    "the a an my your his her its our their this that these those every each "
+    "some no".split()
+)
+ADVERBS = frozenset(
+    "not never always already just still often usually sometimes ever recently "
+    "really also probably certainly rarely seldom even finally currently "
+    "definitely".split()
+)
+LEADING_ADVERBIALS = frozenset("yesterday today tomorrow now tonight recently".split())
+# Time words that rule out tenses of another time: "Yesterday she walks"
+PAST_TIME_WORDS = frozenset({"yesterday", "ago"})
+FUTURE_TIME_WORDS = frozenset({"tomorrow"})
+SINGULAR_DETERMINERS = frozenset("a an this that every each".split())
+PLURAL_DETERMINERS = frozenset("these those".split())
+# Nouns whose number the rules can't tell: "The sheep was" and "were"
+UNMARKED_NOUNS = frozenset(
+    "sheep fish deer police cattle staff team family crew series species "
+    "aircraft news".split()
+)
+# Words that start another clause, so the sentence may mix tenses
+CLAUSE_WORDS = frozenset(
+    "and but or because if although though unless whereas while when which who "
+    "whom whose until".split()
+)
+# -ing words that are adjectives or nouns after "be"
+NON_VERB_ING = frozenset(
+    "amazing annoying boring charming confusing disappointing embarrassing "
+    "exciting fascinating frightening interesting missing relaxing shocking "
+    "surprising terrifying tiring something nothing anything everything morning "
+    "evening ceiling during thing king wedding building outstanding".split()
+)
+
+BE_PRESENT = {"am": "first", "is": "third", "are": "other"}
+BE_PAST = {"was": "singular", "were": "other"}
+HAVE_PRESENT = {"has": "third", "have": "other"}
+DO_PRESENT = {"does": "third", "do": "other"}
+FUTURE_AUXILIARIES = {"will", "shall"}
+OTHER_MODALS = {"can", "could", "would", "should", "may", "might", "must", "ought"}
+AUXILIARIES = (
+    set(BE_PRESENT)
+    | set(BE_PAST)
+    | set(HAVE_PRESENT)
+    | {"had", "did"}
+    | set(DO_PRESENT)
+    | FUTURE_AUXILIARIES
+    | OTHER_MODALS
+)
+# Auxiliaries that can also be the main verb of a simple tense
+MAIN_VERB_AUXILIARIES = set(BE_PRESENT) | set(BE_PAST) | set(HAVE_PRESENT) | {"had"}
+
+# Verdicts below this confidence go to the model
+LOCAL_CONFIDENCE = 0.9
+
+
+@dataclass(frozen=True)
+class IrregularVerbs:
+    """Forms from the bundled irregular verb table."""
+
+    lemmas: FrozenSet[str]
+    past: FrozenSet[str]
+    participles: FrozenSet[str]
+    forms: FrozenSet[str]
+
+
+@dataclass
+class TenseDetection:
+    """
+    Tense of a sentence's verb phrase, as found by the rules.
+
+    Attributes:
+        tense (str): Canonical tense name, a key of TENSE_FORMS.
+        verb_phrase (str): The words the tense was read from.
+        confidence (float): How sure the rules are, from 0 to 1.
+    """
+
+    tense: str
+    verb_phrase: str
+    confidence: float
+
+
+@lru_cache(maxsize=1)
+def irregular_verbs() -> IrregularVerbs:
+    """
+    Loads the verb section of the bundled inflection table.
+
+    Each entry lists the past form and past participle first.
+    """
+    with open(INFLECTIONS_PATH, encoding="utf-8") as f:
+        verbs: Dict[str, List[str]] = json.load(f)["verbs"]
+    return IrregularVerbs(
+        lemmas=frozenset(verbs),
+        past=frozenset(forms[0] for forms in verbs.values()) | {"were"},
+        participles=frozenset(forms[1] for forms in verbs.values()),
+        forms=frozenset(form for forms in verbs.values() for form in forms),
+    )
+
+
+@lru_cache(maxsize=1)
+def irregular_noun_persons() -> Dict[str, str]:
+    """Maps the nouns of the bundled inflection table to "third" or "other"."""
+    with open(INFLECTIONS_PATH, encoding="utf-8") as f:
+        nouns: Dict[str, List[str]] = json.load(f)["nouns"]
+    persons: Dict[str, str] = {}
+    for singular, plurals in nouns.items():
+        persons[singular] = "third"
+        persons.update((plural, "other") for plural in plurals)
+    return persons
+
+
+def normalize_tense(name: str) -> Optional[str]:
+    """
+    Maps a tense name to its canonical form.
+
+    Accepts word order and naming variants such as "simple past", "past
+    simple tense", "present progressive" or "pluperfect".
+
+    Args:
+        name: The tense name the user asked about
+
+    Returns:
+        The canonical tense name, or None if it is not one of the twelve
+        tenses the rules know
+    """
+    words: List[str] = []
+    for word in re.findall(r"[a-z]+", name.lower()):
+        words.extend(TENSE_NAME_SYNONYMS.get(word, word).split())
+    times = [word for word in words if word in ("present", "past", "future")]
+    known = {"present", "past", "future", "perfect", "continuous"}
+    if len(times) != 1 or any(
+        word not in known and word not in TENSE_NAME_FILLER for word in words
+    ):
+        return None
+    aspect = " ".join(word for word in ("perfect", "continuous") if word in words)
+    return f"{times[0]} {aspect or 'simple'}"
+
+
+def is_participle(word: str) -> bool:
+    """Returns whether a word looks like a past participle."""
+    verbs = irregular_verbs()
+    if word in verbs.participles:
+        return True
+    return len(word) > 3 and word.endswith("ed") and not word.endswith("eed")
+
+
+def is_present_participle(word: str) -> bool:
+    """Returns whether a word looks like the -ing form of a verb."""
+    return (
+        len(word) > 4
+        and word.endswith("ing")
+        and word not in NON_VERB_ING
+        and word not in irregular_verbs().lemmas
+    )
+
+
+def is_past_form(word: str) -> bool:
+    """Returns whether a word can only be a past form, not a base form."""
+    verbs = irregular_verbs()
+    if word in verbs.lemmas:
+        return False
+    return word in verbs.past or (
+        len(word) > 3 and word.endswith("ed") and not word.endswith("eed")
+    )
+
+
+def is_regularized(word: str) -> bool:
+    """
+    Returns whether a word is an irregular verb with a regular -ed ending, a
+    learner error such as "goed", "eated" or "readed".
+    """
+    verbs = irregular_verbs()
+    if len(word) <= 3 or not word.endswith("ed") or word in verbs.forms:
+        return False
+    stem = word[:-2]
+    candidates = {stem, stem + "e"}
+    if len(stem) >= 3 and stem[-1] == stem[-2]:
+        candidates.add(stem[:-1])  # runned -> run
+    return bool(candidates & verbs.lemmas)
+
+
+def is_verb_form(word: str) -> bool:
+    """Returns whether a word is a known verb form or looks like one."""
+    verbs = irregular_verbs()
+    return (
+        word in verbs.lemmas
+        or word in verbs.forms
+        or is_past_form(word)
+        or is_present_participle(word)
+    )
+
+
+def is_finite_marker(word: str) -> bool:
+    """Returns whether a word shows there is a finite verb in the clause."""
+    return word in AUXILIARIES or is_past_form(word)
+
+
+def _subject_person(prefix: List[str]) -> Optional[str]:
+    """
+    Returns the grammatical person of a simple subject.
+
+    Only a pronoun, or a determiner and at most two more words, count as a
+    simple subject; anything else may hide another clause. Nouns whose
+    number is unclear ("sheep", "bus") or disagrees with the determiner
+    ("these child") return None.
+    """
+    if prefix and prefix[0] in LEADING_ADVERBIALS:
+        prefix = prefix[1:]
+    prefix = [word for word in prefix if word not in ADVERBS]
+    if len(prefix) == 1 and prefix[0] in SUBJECT_PRONOUNS:
+        return SUBJECT_PRONOUNS[prefix[0]]
+    if not (2 <= len(prefix) <= 3 and prefix[0] in DETERMINERS):
+        return None
+    noun = prefix[-1]
+    person = irregular_noun_persons().get(noun)
+    if person is None:
+        if noun in UNMARKED_NOUNS or noun.endswith(("ss", "us", "is")):
+            return None
+        person = "other" if noun.endswith("s") else "third"
+    if prefix[0] in SINGULAR_DETERMINERS and person != "third":
+        return None
+    if prefix[0] in PLURAL_DETERMINERS and person != "other":
+        return None
+    return person
+
+
+def _read_group(tokens: List[str], start: int) -> Tuple[List[str], int]:
+    """
+    Reads the auxiliaries and main verb starting at ``start``.
+
+    Returns:
+        The verb words, without adverbs and negation, and the index after them
+    """
+    words = [tokens[start]]
+    index = start + 1
+    while index < len(tokens) and len(words) < 4:
+        word = tokens[index]
+        if word in ADVERBS:
+            index += 1
+            continue
+        last = words[-1]
+        expects_verb = last in AUXILIARIES or last in ("be", "been", "have", "being")
+        if not expects_verb:
+            break
+        words.append(word)
+        index += 1
+        if word not in ("be", "been", "have", "being"):
+            break
+    return words, index
+
+
+def _agrees(auxiliary: str, person: str) -> bool:
+    """Checks subject-verb agreement of a present or past auxiliary."""
+    if auxiliary in BE_PRESENT:
+        return BE_PRESENT[auxiliary] == person
+    if auxiliary in BE_PAST:
+        return (BE_PAST[auxiliary] == "singular") == (person != "other")
+    for forms in (HAVE_PRESENT, DO_PRESENT):
+        if auxiliary in forms:
+            return forms[auxiliary] == ("third" if person == "third" else "other")
+    return True
+
+
+def _is_base(word: str) -> bool:
+    """Returns whether a word can be the base form of a verb, not "goes"."""
+    verbs = irregular_verbs()
+    if word in verbs.forms and word not in verbs.lemmas:
+        return False
+    if word.endswith("s") and not word.endswith("ss"):
+        return False
+    return (
+        word.isalpha()
+        and word not in AUXILIARIES
+        and word not in DETERMINERS
+        and word not in SUBJECT_PRONOUNS
+        and not word.endswith("ing")
+        and not is_past_form(word)
+    )
+
+
+def _classify_group(words: List[str], person: str) -> Optional[Tuple[str, float]]:
+    """Maps a verb group to a tense and confidence, or None if unsure."""
+    head, rest = words[0], words[1:]
+
+    if head in FUTURE_AUXILIARIES:
+        if len(rest) == 1 and _is_base(rest[0]):
+            return "future simple", 0.95
+        if rest[:1] == ["be"] and len(rest) == 2 and is_present_participle(rest[1]):
+            return "future continuous", 0.95
+        if rest[:1] == ["have"] and len(rest) == 2 and is_participle(rest[1]):
+            return "future perfect", 0.95
+        if rest[:2] == ["have", "been"] and len(rest) == 3:
+            if is_present_participle(rest[2]):
+                return "future perfect continuous", 0.95
+        return None
+
+    if head in OTHER_MODALS or not _agrees(head, person):
+        return None
+
+    time = "past" if head in BE_PAST or head in ("had", "did") else "present"
+    if head in BE_PRESENT or head in BE_PAST:
+        if rest and is_present_participle(rest[0]):
+            return f"{time} continuous", 0.95
+        if rest and (is_participle(rest[0]) or rest[0] == "being"):
+            return None  # passive voice
+        if rest and is_verb_form(rest[0]):
+            return None  # a misformed tense: "She is eat"
+        # "be" as the main verb: "She is a teacher", "It was cold"
+        return f"{time} simple", 0.9
+
+    if head in HAVE_PRESENT or head == "had":
+        if rest[:1] == ["been"] and len(rest) == 2 and is_present_participle(rest[1]):
+            return f"{time} perfect continuous", 0.95
+        if rest and (is_participle(rest[0]) or rest[0] == "been"):
+            return f"{time} perfect", 0.95
+        if rest and (rest[0] in ("to", "got") or is_verb_form(rest[0])):
+            return None  # "have to", or a misformed tense: "I have went"
+        # "have" as the main verb: "They have a dog"
+        return f"{time} simple", 0.9
+
+    if head in DO_PRESENT or head == "did":
+        if not rest or _is_base(rest[0]):
+            return f"{time} simple", 0.95
+        return None
+
+    if is_past_form(head):
+        return "past simple", 0.95 if head in irregular_verbs().past else 0.9
+    if head.endswith("ing") or head in irregular_verbs().participles:
+        return None
+    if person == "third":
+        if head.endswith("s") and not head.endswith("ss"):
+            return "present simple", 0.9
+        return None
+    if head.endswith("s"):
+        return None
+    # Any word can follow "I" or "they"; only trust known verbs
+    return "present simple", 0.9 if head in irregular_verbs().lemmas else 0.75
+
+
+def detect_tense(sentence: str) -> Optional[TenseDetection]:
+    """
+    Finds the tense of a single-clause sentence from its verb forms.
+
+    The rules only commit to declarative sentences with a simple subject and
+    one verb phrase; questions, multiple clauses, modals other than
+    will/shall, the passive voice and "going to" are left to the model, as
+    are misformed verbs ("goed", "will goes") and time words that contradict
+    the tense ("Yesterday she walks").
+
+    Args:
+        sentence: The sentence to analyze
+
+    Returns:
+        The detected tense, or None if the sentence is outside the rules
+    """
+    if sentence.strip().endswith("?") or any(c in sentence for c in ";:"):
+        return None
+    tokens = expand_contractions(tokenize(sentence), is_participle)
+    if len(tokens) < 2 or any(token in CLAUSE_WORDS for token in tokens):
+        return None
+    if any(is_regularized(token) for token in tokens):
+        return None
+
+    start = next(
+        (index for index, token in enumerate(tokens) if is_finite_marker(token)),
+        None,
+    )
+    if start is None:
+        # No auxiliary or past form: the verb directly follows the subject
+        start = next(
+            (
+                index + 1
+                for index, token in enumerate(tokens[:-1])
+                if token in SUBJECT_PRONOUNS
+            ),
+            None,
+        )
+        while start is not None and start < len(tokens) and tokens[start] in ADVERBS:
+            start += 1
+        if start is None or start >= len(tokens):
+            return None
+
+    person = _subject_person(tokens[:start])
+    if person is None:
+        return None
+    words, end = _read_group(tokens, start)
+    if any(is_finite_marker(token) for token in tokens[end:]):
+        return None
+    if end < len(tokens) and tokens[end] == "to" and words[-1] in ("going", "used"):
+        return None
+
+    classified = _classify_group(words, person)
+    if classified is None:
+        return None
+    tense, confidence = classified
+    contradicting = FUTURE_TIME_WORDS if tense.startswith("past") else PAST_TIME_WORDS
+    if contradicting.intersection(tokens):
+        return None
+    if tense.endswith("simple") and words[0] in MAIN_VERB_AUXILIARIES:
+        # Leave out the complement of "be" or "have" used as the main verb
+        end = start + 1
+        while end < len(tokens) and tokens[end] == "not":
+            end += 1
+    return TenseDetection(tense, " ".join(tokens[start:end]), confidence)
+
+
+def judge_tense(
+    verb_tense: str, sentence: str, min_confidence: float = LOCAL_CONFIDENCE
+) -> Optional[Dict[str, Any]]:
+    """
+    Answers a tense question locally when the rules are confident.
+
+    Args:
+        verb_tense: The tense the sentence should use
+        sentence: The user's sentence
+        min_confidence: Least confidence to answer without the model
+
+    Returns:
+        ``{"correct": bool, "explanation": str}``, or None to ask the model
+    """
+    expected = normalize_tense(verb_tense)
+    if expected is None:
+        return None
+    detection = detect_tense(sentence)
+    if detection is None or detection.confidence < min_confidence:
+        return None
+
+    phrase = detection.verb_phrase
+    if detection.tense == expected:
+        return {
+            "correct": True,
+            "explanation": (
+                f"'{phrase}' is in the {expected} tense, which is formed with "
+                f"{TENSE_FORMS[expected]}."
+            ),
+        }
+    return {
+        "correct": False,
+        "explanation": (
+            f"'{phrase}' is in the {detection.tense} tense, not the {expected} "
+            f"tense. The {expected} is formed with {TENSE_FORMS[expected]}."
+        ),
+    }
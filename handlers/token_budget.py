@@ -0,0 +1,201 @@
+import math
+import os
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# Patterns counted to estimate tokens; each match is about one token
+WORD = re.compile(r"[^\W\d_]+(?:['’][^\W\d_]+)*")
+# Every 4 letters of a Latin word past its first 5: long or rare words split
+LONG_WORD_PART = re.compile(r"(?<=[A-Za-z\u00c0-\u024f]{5})[A-Za-z\u00c0-\u024f]{4}")
+# Numbers are split in groups of up to 3 digits, punctuation in pairs
+DIGIT_GROUP = re.compile(r"\d{1,3}")
+PUNCTUATION_PAIR = re.compile(r"[^\w\s]{1,2}")
+# Characters from the CJK blocks on are about a token each
+WIDE_CHARACTER = re.compile(r"[\u2e80-\U0010ffff]")
+NON_ASCII_CHARACTER = re.compile(r"[^\x00-\x7f]")
+# No text averages more characters per token, so a prefix this many times
+# longer than a limit is enough to tell that the text is over it
+MAX_CHARS_PER_TOKEN = 8
+
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+SENTENCE_BREAK = re.compile(r"(?<=[.!?…])[\"'”’)\]]*\s+")
+
+
+def estimate_tokens(text: str, stop_above: Optional[int] = None) -> int:
+    """
+    Estimates the number of model tokens in a text, without a tokenizer.
+
+    Counts words (plus a token per 4 letters of long words), digit groups,
+    punctuation pairs and line breaks, and accented or CJK characters.
+    Calibrated against the o200k tokenizer of the GPT-4o models: within a
+    few percent on English prose, within about 15% on code, numbers and
+    other languages (see ``benchmarks/bench_long_articles.py``).
+
+    Args:
+        text: The text to count
+        stop_above: Only count as much of the text as it takes to exceed
+            this, so oversize inputs are rejected in time proportional to
+            the limit
+
+    Returns:
+        The estimated token count (more than ``stop_above`` if it stopped)
+    """
+    if stop_above is not None and len(text) > (stop_above + 1) * MAX_CHARS_PER_TOKEN:
+        prefix = estimate_tokens(text[: (stop_above + 1) * MAX_CHARS_PER_TOKEN])
+        if prefix > stop_above:
+            return prefix
+    count = (
+        len(WORD.findall(text))
+        + len(LONG_WORD_PART.findall(text))
+        + len(DIGIT_GROUP.findall(text))
+        + len(PUNCTUATION_PAIR.findall(text))
+        + text.count("\n")
+    )
+    if not text.isascii():
+        count += len(NON_ASCII_CHARACTER.findall(text))
+    return count
+
+
+@dataclass(frozen=True)
+class ArticleLimits:
+    """
+    Token limits for the articles and summaries a handler accepts.
+
+    Attributes:
+        max_article_tokens (int): Longer articles are rejected, or truncated
+            when ``truncate`` is set.
+        max_summary_tokens (int): Longer summaries are rejected.
+        chunk_above_tokens (int): Longer articles are condensed in chunks, in
+            parallel, before the evaluation call.
+        chunk_tokens (int): Target size of a chunk.
+        max_chunks (int): Chunks per article; longer articles get larger
+            chunks rather than more calls.
+        truncate (bool): Truncate oversize articles instead of rejecting them.
+    """
+
+    max_article_tokens: int = 32000
+    max_summary_tokens: int = 1500
+    chunk_above_tokens: int = 12000
+    chunk_tokens: int = 2000
+    max_chunks: int = 16
+    truncate: bool = False
+
+    @classmethod
+    def from_environment(cls, defaults: "ArticleLimits") -> "ArticleLimits":
+        """
+        Overrides ``defaults`` from environment variables.
+
+        ``ARTICLE_MAX_TOKENS``, ``SUMMARY_MAX_TOKENS``,
+        ``ARTICLE_CHUNK_ABOVE_TOKENS``, ``ARTICLE_CHUNK_TOKENS`` and
+        ``ARTICLE_MAX_CHUNKS`` set the limits; ``ARTICLE_OVERSIZE=truncate``
+        truncates oversize articles instead of rejecting them.
+        """
+
+        def limit(name: str, default: int) -> int:
+            return int(os.environ.get(name, str(default)))
+
+        oversize = os.environ.get("ARTICLE_OVERSIZE", "")
+        return cls(
+            max_article_tokens=limit("ARTICLE_MAX_TOKENS", defaults.max_article_tokens),
+            max_summary_tokens=limit("SUMMARY_MAX_TOKENS", defaults.max_summary_tokens),
+            chunk_above_tokens=limit(
+                "ARTICLE_CHUNK_ABOVE_TOKENS", defaults.chunk_above_tokens
+            ),
+            chunk_tokens=limit("ARTICLE_CHUNK_TOKENS", defaults.chunk_tokens),
+            max_chunks=limit("ARTICLE_MAX_CHUNKS", defaults.max_chunks),
+            truncate=(
+                oversize.lower() == "truncate" if oversize else defaults.truncate
+            ),
+        )
+
+
+def split_units(text: str, max_tokens: int) -> List[Tuple[str, str, int]]:
+    """
+    Splits text into paragraphs, paragraphs too long into sentences, and
+    sentences too long into runs of words, each of at most ``max_tokens``.
+
+    Returns:
+        (separator, unit, tokens) triples, where the separator is the
+        whitespace that joins the unit to the one before it
+    """
+    units: List[Tuple[str, str, int]] = []
+    for paragraph in PARAGRAPH_BREAK.split(text.strip()):
+        separator = "\n\n"
+        tokens = estimate_tokens(paragraph)
+        if tokens <= max_tokens:
+            units.append((separator, paragraph, tokens))
+            continue
+        for sentence in SENTENCE_BREAK.split(paragraph):
+            tokens = estimate_tokens(sentence)
+            if tokens <= max_tokens:
+                units.append((separator, sentence, tokens))
+                separator = " "
+                continue
+            words: List[str] = []
+            count = 0
+            for word in sentence.split():
+                tokens = estimate_tokens(word)
+                if words and count + tokens > max_tokens:
+                    units.append((separator, " ".join(words), count))
+                    separator, words, count = " ", [], 0
+                words.append(word)
+                count += tokens
+            if words:
+                units.append((separator, " ".join(words), count))
+                separator = " "
+    return [unit for unit in units if unit[1].strip()]
+
+
+def join_units(units: List[Tuple[str, str, int]]) -> str:
+    return "".join(separator + unit for separator, unit, _ in units).strip()
+
+
+def split_into_chunks(text: str, chunk_tokens: int, max_chunks: int) -> List[str]:
+    """
+    Splits a text into at most ``max_chunks`` chunks of similar size.
+
+    Chunks hold about ``chunk_tokens`` tokens, or more when the text would
+    need over ``max_chunks`` of them, and break at paragraph ends, else at
+    sentence ends. Sizes are balanced, so the last chunk is not a stub.
+
+    Args:
+        text: The text to split
+        chunk_tokens: Target tokens per chunk
+        max_chunks: Upper bound on the number of chunks
+
+    Returns:
+        The chunks, in text order
+    """
+    total = estimate_tokens(text)
+    count = min(max_chunks, max(1, math.ceil(total / chunk_tokens)))
+    target = math.ceil(total / count)
+    chunks: List[str] = []
+    current: List[Tuple[str, str, int]] = []
+    size = 0
+    for unit in split_units(text, target):
+        tokens = unit[2]
+        # Close the chunk at the boundary nearest the target
+        if current and size + tokens / 2 > target and len(chunks) < count - 1:
+            chunks.append(join_units(current))
+            current, size = [], 0
+        current.append(unit)
+        size += tokens
+    if current:
+        chunks.append(join_units(current))
+    return chunks
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cuts a text to at most ``max_tokens``, at the last paragraph or sentence
+    end that fits (or between words when a single sentence is longer).
+    """
+    kept: List[Tuple[str, str, int]] = []
+    size = 0
+    for unit in split_units(text, max_tokens):
+        if size + unit[2] > max_tokens:
+            break
+        kept.append(unit)
+        size += unit[2]
+    return join_units(kept)
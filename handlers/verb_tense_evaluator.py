@@ -1,9 +1,14 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from typing import Dict, Any, Optional
 import logging
-import json
-from openai.types.chat import ChatCompletion
-from base_handler import BaseLambdaHandler, ValidationError
+from base_handler import (
+    AsyncBaseLambdaHandler,
+    HedgingPolicy,
+    ValidationError,
+    get_handler,
+)
+from result_cache import normalize_text
+from tense_rules import judge_tense
 
 # Configure logging
 logger = logging.getLogger()
@@ -18,10 +23,40 @@ class TenseAnalysisRequest:
     sentence: str
 
 
-class TenseAnalysisHandler(BaseLambdaHandler[TenseAnalysisRequest, Dict[str, Any]]):
-    """Handler for verb tense analysis requests."""
+@dataclass
+class TenseAnalysisResult:
+    """Model verdict on a tense usage."""
+
+    correct: bool
+    explanation: str
+
+
+def has_explanation(result: TenseAnalysisResult) -> bool:
+    """Rejects verdicts without an explanation, escalating them in a cascade."""
+    return bool(result.explanation.strip())
+
+
+class TenseAnalysisHandler(
+    AsyncBaseLambdaHandler[TenseAnalysisRequest, Dict[str, Any]]
+):
+    """
+    Handler for verb tense analysis requests.
 
-    def validate_request(self, body: Dict[str, Any]) -> TenseAnalysisRequest:
+    Textbook sentences are answered by the rules in ``tense_rules`` with a
+    template explanation, before the cache and single-flight; the model is
+    only asked when the rules are unsure. ``TenseRuleHits / TenseRuleChecks``
+    is the share of requests answered locally. Set ``LOCAL_RULES`` to False
+    to always ask the model.
+    """
+
+    PROMPT_VERSION = "2"
+    NEAR_DUPLICATE_FIELD = "sentence"
+    LOCAL_RULES = True
+    BATCH_ENABLED = True
+    BATCH_CONCURRENCY = 20
+    HEDGING = HedgingPolicy()
+
+    async def validate_request(self, body: Dict[str, Any]) -> TenseAnalysisRequest:
         """Validates tense analysis request."""
         if not isinstance(body.get("verb_tense"), str):
             raise ValidationError("'verb_tense' must be a string")
@@ -34,40 +69,48 @@ class TenseAnalysisHandler(BaseLambdaHandler[TenseAnalysisRequest, Dict[str, Any
             verb_tense=body["verb_tense"].strip(), sentence=body["sentence"].strip()
         )
 
-    def process_request(self, request: TenseAnalysisRequest) -> Dict[str, Any]:
+    def cache_inputs(self, request: TenseAnalysisRequest) -> Optional[Dict[str, Any]]:
+        """Caches on the lowercased tense name and whitespace-normalized sentence."""
+        return {
+            "verb_tense": normalize_text(request.verb_tense, lowercase=True),
+            "sentence": normalize_text(request.sentence),
+        }
+
+    def local_response(self, request: TenseAnalysisRequest) -> Optional[Dict[str, Any]]:
+        """Answers textbook sentences with the rules in ``tense_rules``."""
+        if not self.LOCAL_RULES:
+            return None
+        self.metrics.increment("TenseRuleChecks")
+        verdict = judge_tense(request.verb_tense, request.sentence)
+        if verdict is not None:
+            self.metrics.increment("TenseRuleHits")
+        return verdict
+
+    async def process_request(self, request: TenseAnalysisRequest) -> Dict[str, Any]:
         """Processes tense analysis request using OpenAI API."""
-        try:
-            response: ChatCompletion = self.openai_client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a tense evaluator. Respond only with valid JSON.",
-                    },
-                    {
-                        "role": "user",
-                        "content": (
-                            f"Evaluate whether the following sentence correctly uses the '{request.verb_tense}' tense: "
-                            f"\"{request.sentence}\". Return a JSON with two fields: 'correct' (a boolean) and "
-                            "'explanation' (a string explaining your decision)."
-                        ),
-                    },
-                ],
-                temperature=0.7,
-            )
-
-            answer_text = response.choices[0].message.content.strip()
-            return json.loads(answer_text)
-
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse OpenAI response: {answer_text}")
-            return {
-                "correct": False,
-                "explanation": f"Invalid response format from language model: {str(e)}",
-            }
+        result = await self.create_cascaded(
+            [
+                {
+                    "role": "system",
+                    "content": "You are a tense evaluator.",
+                },
+                {
+                    "role": "user",
+                    "content": (
+                        f"Evaluate whether the following sentence correctly uses the '{request.verb_tense}' tense: "
+                        f"\"{request.sentence}\". Set 'correct' to whether the tense is used correctly and "
+                        "'explanation' to a short explanation of your decision."
+                    ),
+                },
+            ],
+            TenseAnalysisResult,
+            accept=has_explanation,
+            temperature=0.7,
+        )
+        return asdict(result)
 
 
 # Lambda handler function
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
-    handler = TenseAnalysisHandler()
+    handler = get_handler(TenseAnalysisHandler)
     return handler.handle(event, context)
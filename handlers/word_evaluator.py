@@ -1,9 +1,14 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from typing import Dict, Any, Optional
-import json
 import logging
-from openai.types.chat import ChatCompletion
-from base_handler import BaseLambdaHandler, ValidationError
+from base_handler import (
+    AsyncBaseLambdaHandler,
+    HedgingPolicy,
+    ValidationError,
+    get_handler,
+)
+from result_cache import normalize_text
+from word_precheck import precheck_word_usage
 
 # Configure logging
 logger = logging.getLogger()
@@ -18,10 +23,43 @@ class WordUsageRequest:
     sentence: str
 
 
-class WordUsageHandler(BaseLambdaHandler[WordUsageRequest, Dict[str, Any]]):
-    """Handler for evaluating word usage in sentences."""
+@dataclass
+class WordUsageResult:
+    """Model verdict on a word usage."""
+
+    correct: bool
+    explanation: str
+
+
+def has_explanation(result: WordUsageResult) -> bool:
+    """Rejects verdicts without an explanation, escalating them in a cascade."""
+    return bool(result.explanation.strip())
+
 
-    def validate_request(self, body: Dict[str, Any]) -> WordUsageRequest:
+class WordUsageHandler(
+    AsyncBaseLambdaHandler[WordUsageRequest, Dict[str, Any]]
+):
+    """
+    Handler for evaluating word usage in sentences.
+
+    Submissions that are wrong whatever the model would say (a lone word, or
+    a sentence without the target word in any form) are answered locally by
+    ``precheck_word_usage``, before the cache and single-flight; only the
+    rest reach the model. The hit rate is ``PrecheckHits / PrecheckChecks``,
+    summed over batch items too.
+
+    Results are cached on the exact word and sentence, up to spacing: case
+    and punctuation can change a verdict ("Polish" / "polish", "however"
+    after a comma or a semicolon), so the near-duplicate index is not used.
+    """
+
+    # Bumped when the cache stopped folding the word's case
+    PROMPT_VERSION = "3"
+    BATCH_ENABLED = True
+    BATCH_CONCURRENCY = 20
+    HEDGING = HedgingPolicy()
+
+    async def validate_request(self, body: Dict[str, Any]) -> WordUsageRequest:
         """
         Validates word usage evaluation request.
 
@@ -49,7 +87,23 @@ class WordUsageHandler(BaseLambdaHandler[WordUsageRequest, Dict[str, Any]]):
 
         return WordUsageRequest(word=word, sentence=sentence)
 
-    def process_request(self, request: WordUsageRequest) -> Dict[str, Any]:
+    def cache_inputs(self, request: WordUsageRequest) -> Optional[Dict[str, Any]]:
+        """Caches on the whitespace-normalized word and sentence."""
+        return {
+            "word": normalize_text(request.word),
+            "sentence": normalize_text(request.sentence),
+        }
+
+    def local_response(self, request: WordUsageRequest) -> Optional[Dict[str, Any]]:
+        """Answers trivially wrong submissions with ``precheck_word_usage``."""
+        explanation = precheck_word_usage(request.word, request.sentence)
+        self.metrics.increment("PrecheckChecks")
+        if explanation is None:
+            return None
+        self.metrics.increment("PrecheckHits")
+        return asdict(WordUsageResult(correct=False, explanation=explanation))
+
+    async def process_request(self, request: WordUsageRequest) -> Dict[str, Any]:
         """
         Processes word usage evaluation request using OpenAI API.
 
@@ -60,34 +114,27 @@ class WordUsageHandler(BaseLambdaHandler[WordUsageRequest, Dict[str, Any]]):
             Dictionary containing evaluation results
         """
         try:
-            response: ChatCompletion = self.openai_client.chat.completions.create(
-                model=self.model,
-                messages=[
+            result = await self.create_cascaded(
+                [
                     {
                         "role": "system",
-                        "content": "You are a grammar and usage evaluator. Respond only with valid JSON.",
+                        "content": "You are a grammar and usage evaluator.",
                     },
                     {
                         "role": "user",
                         "content": (
                             f"Evaluate the usage of the word '{request.word}' in the following sentence: "
-                            f"\"{request.sentence}\". Return a JSON with two fields: 'correct' (a boolean) "
-                            "and 'explanation' (a string explaining your decision)."
+                            f"\"{request.sentence}\". Set 'correct' to whether the word is used correctly "
+                            "and 'explanation' to a short explanation of your decision."
                         ),
                     },
                 ],
+                WordUsageResult,
+                accept=has_explanation,
                 temperature=0.7,
             )
+            return asdict(result)
 
-            answer_text = response.choices[0].message.content.strip()
-            return json.loads(answer_text)
-
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse OpenAI response: {answer_text}")
-            return {
-                "correct": False,
-                "explanation": f"Invalid response format from language model: {str(e)}",
-            }
         except Exception as e:
             logger.error(f"Error processing request: {str(e)}")
             raise
@@ -95,5 +142,5 @@ class WordUsageHandler(BaseLambdaHandler[WordUsageRequest, Dict[str, Any]]):
 
 # Lambda handler function
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
-    handler = WordUsageHandler()
+    handler = get_handler(WordUsageHandler)
     return handler.handle(event, context)
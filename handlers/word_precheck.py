@@ -0,0 +1,180 @@
+import json
+import os
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass, asdict
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Set, FrozenSet
+
+from contractions import expand_contractions
+
+INFLECTIONS_PATH = os.path.join(os.path.dirname(__file__), "data", "inflections.json")
+
+# Words: runs of letters, optionally joined by apostrophes (don't, teacher's)
+TOKEN_PATTERN = re.compile(r"[^\W\d_]+(?:['’][^\W\d_]+)*")
+
+VOWELS = set("aeiou")
+INFLECTION_SUFFIXES = frozenset(
+    "s es ed d ing er ers est ly ies ied ier iest ily".split()
+)
+
+
+@dataclass
+class PrecheckStats:
+    """Counters describing how many model calls the pre-check saves."""
+
+    checked: int = 0
+    answered: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        checked = self.checked
+        data["hit_rate"] = round(self.answered / checked, 4) if checked else 0.0
+        return data
+
+
+precheck_stats = PrecheckStats()
+_stats_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def irregular_families() -> Dict[str, FrozenSet[str]]:
+    """
+    Maps every form in the bundled inflection table to its whole family.
+
+    Loaded on first use so importing the handler stays cheap.
+    """
+    with open(INFLECTIONS_PATH, encoding="utf-8") as f:
+        table = json.load(f)
+    families: Dict[str, FrozenSet[str]] = {}
+    for entries in table.values():
+        for lemma, forms in entries.items():
+            family = frozenset([lemma, *forms])
+            for form in family:
+                families[form] = families.get(form, frozenset()) | family
+    return families
+
+
+def fold_accents(text: str) -> str:
+    """Drops diacritics, so "café" and "cafe" are the same word."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> List[str]:
+    """Returns the lowercased, accent-folded words of a text."""
+    words = TOKEN_PATTERN.findall(fold_accents(text).lower())
+    return [token.replace("’", "'") for token in words]
+
+
+def candidate_lemmas(word: str) -> Set[str]:
+    """
+    Returns the word and every lemma it could be a regular inflection of.
+
+    Suffix stripping is deliberately generous: an extra candidate can only
+    make a word match, which sends the sentence to the model as before.
+    """
+    candidates = {word}
+    for suffix in ("s", "es", "ed", "d", "ing", "er", "est", "ly", "r", "st"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 2:
+            stem = word[: -len(suffix)]
+            candidates.update({stem, stem + "e"})
+            # Doubled final consonant: stopped -> stop, biggest -> big
+            if len(stem) >= 3 and stem[-1] == stem[-2] and stem[-1] not in VOWELS:
+                candidates.add(stem[:-1])
+            # Consonant + y: studies -> study, happily -> happy
+            if stem.endswith("i"):
+                candidates.add(stem[:-1] + "y")
+    for suffix, replacement in (("ying", "ie"), ("ically", "ic"), ("ly", "le")):
+        if word.endswith(suffix) and len(word) >= len(suffix) + 1:
+            candidates.add(word[: -len(suffix)] + replacement)
+    return candidates
+
+
+def word_family(word: str) -> Set[str]:
+    """Returns the candidate lemmas of a word plus their irregular forms."""
+    families = irregular_families()
+    family = candidate_lemmas(word)
+    for form in list(family):
+        family |= families.get(form, frozenset())
+    return family
+
+
+def inflects(target: str, token: str) -> bool:
+    """
+    Returns whether ``token`` is ``target`` plus an inflectional suffix,
+    allowing a doubled consonant or an inserted k (panic -> panicked).
+    """
+    for stem in {target, target[:-1] if target[-1:] in "ey" else target}:
+        if not stem or not token.startswith(stem) or token == stem:
+            continue
+        rest = token[len(stem) :]
+        if rest in INFLECTION_SUFFIXES:
+            return True
+        if rest[0] in (stem[-1], "k") and rest[1:] in INFLECTION_SUFFIXES:
+            return True
+    return False
+
+
+def matches(target: str, token: str) -> bool:
+    """Returns whether ``token`` is ``target`` or one of its inflections."""
+    if inflects(target, token):
+        return True
+    return bool(word_family(target) & word_family(token))
+
+
+def precheck_word_usage(word: str, sentence: str) -> Optional[str]:
+    """
+    Answers word-usage questions that are wrong whatever the model says.
+
+    Catches sentences of a single word, target words missing from the
+    sentence in every inflection, and target words that only appear inside
+    other words. Contractions are spelled out first ("I've" -> "i", "have");
+    a sentence with a contraction the rules don't know, and anything else
+    they are unsure of, returns None and goes to the model.
+
+    Args:
+        word: The target word or phrase
+        sentence: The user's sentence
+
+    Returns:
+        The explanation of an incorrect usage, or None when unsure
+    """
+    with _stats_lock:
+        precheck_stats.checked += 1
+    explanation = _explain_incorrect(word, sentence)
+    if explanation is not None:
+        with _stats_lock:
+            precheck_stats.answered += 1
+    return explanation
+
+
+def _explain_incorrect(word: str, sentence: str) -> Optional[str]:
+    targets = expand_contractions(tokenize(word))
+    words = tokenize(sentence)
+    tokens = expand_contractions(words)
+    # One-letter parts ("e-book", "Y-axis") are too short to match reliably
+    if not targets or any(len(target) < 2 for target in targets):
+        return None
+    # Unknown contractions ("ain't", "y'all") may hide the target word
+    if any("'" in token for token in targets + tokens):
+        return None
+    if len(words) <= 1:
+        return (
+            f"'{sentence.strip()}' is a single word, not a sentence. Write a full "
+            f"sentence that uses '{word}'."
+        )
+
+    missing = [t for t in targets if not any(matches(t, token) for token in tokens)]
+    if not missing:
+        return None
+
+    target = missing[0]
+    containing = [token for token in tokens if len(target) >= 3 and target in token]
+    if containing:
+        return (
+            f"'{target}' only appears as part of the word '{containing[0]}', so "
+            f"the sentence does not use '{word}'."
+        )
+    return f"The sentence does not use the word '{word}' or any of its forms."
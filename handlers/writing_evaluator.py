@@ -1,10 +1,39 @@
-import re
-import json
+import asyncio
 import logging
-from dataclasses import dataclass
-from typing import Dict, Any, Optional
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, Optional, List, Tuple
 
-from base_handler import BaseLambdaHandler, ValidationError
+from article_store import (
+    ArticleDigest,
+    ArticleNotes,
+    ArticleStore,
+    StoredArticle,
+    article_id_for,
+    condense_messages,
+    digest_messages,
+)
+from base_handler import (
+    AsyncBaseLambdaHandler,
+    ClientRegistry,
+    HedgingPolicy,
+    ValidationError,
+    get_handler,
+)
+from response_encoding import dumps
+from result_cache import make_cache_key, normalize_text
+from token_budget import (
+    ArticleLimits,
+    estimate_tokens,
+    split_into_chunks,
+    truncate_to_tokens,
+)
+from writing_precheck import (
+    WritingIssue,
+    check_writing,
+    describe_issues,
+    issue_hints,
+    vocabulary,
+)
 
 # Configure logging
 logger = logging.getLogger()
@@ -19,20 +48,117 @@ class SummaryEvaluationRequest:
     Attributes:
         article (str): The original article text.
         summary (str): The user-provided summary.
+        stored (Optional[StoredArticle]): The stored article, when known.
+        issues (List[WritingIssue]): Problems the local pre-pass found.
+        article_tokens (int): The estimated token count of the article.
+        truncated (bool): Whether the article was cut to the token limit.
+        notes (Optional[str]): Condensed notes standing in for a long article.
     """
 
     article: str
     summary: str
+    stored: Optional[StoredArticle] = None
+    issues: List[WritingIssue] = field(default_factory=list)
+    article_tokens: int = 0
+    truncated: bool = False
+    notes: Optional[str] = None
+
+
+@dataclass
+class CategoryEvaluation:
+    """Score and feedback for one evaluation category."""
+
+    score: int = field(
+        metadata={"minimum": 0, "maximum": 100, "description": "Score from 0 to 100"}
+    )
+    feedback: str
+
+
+@dataclass
+class SummaryEvaluationResult:
+    """Model evaluation of a summary."""
+
+    grammar_spelling: CategoryEvaluation
+    coherence: CategoryEvaluation
+
+
+def has_feedback(result: SummaryEvaluationResult) -> bool:
+    """Rejects evaluations with empty feedback, escalating them in a cascade."""
+    return all(
+        category.feedback.strip()
+        for category in (result.grammar_spelling, result.coherence)
+    )
 
 
 class SummaryEvaluationHandler(
-    BaseLambdaHandler[SummaryEvaluationRequest, Dict[str, Any]]
+    AsyncBaseLambdaHandler[SummaryEvaluationRequest, Dict[str, Any]]
 ):
     """
     Handler for evaluating a user's summary against an original article using OpenAI.
+
+    Articles can be sent by ``article_id`` instead of text. Stored articles are
+    graded against their digest (key points and a reference summary), which is
+    much shorter than the article itself; a missing digest is computed once,
+    alongside the first evaluation, and stored for later ones.
+
+    Results are not cached, but identical summaries of the same article that
+    arrive together (a class submitting the same exercise) share one
+    evaluation, and concurrent first evaluations of an article share one
+    digest.
+
+    Spelling, repeated words, capitalization and final punctuation are
+    checked locally first (``writing_precheck``). The findings go to the model
+    as hints, so it scores them without having to list them, and are added to
+    its grammar feedback as written; spelling suggestions the checker is
+    unsure of (slang, names, new words) are left for the model to confirm
+    instead. Set ``SPELLING_PRECHECK`` to False to leave them to the model.
+
+    Inputs are measured in tokens before any call (``token_budget``):
+    summaries and articles over the limits of ``ARTICLE_LIMITS`` (overridable
+    per deployment, see ``ArticleLimits.from_environment``) are rejected, or
+    articles truncated. Long articles without a digest are split into chunks
+    condensed into notes in parallel, and graded against the notes, so the
+    latency of an evaluation stays about that of two calls on short prompts
+    however long the article.
     """
 
-    def validate_request(self, body: Dict[str, Any]) -> SummaryEvaluationRequest:
+    # Prompts carry the whole article, so duplicates are kept to a smaller share
+    HEDGING = HedgingPolicy(max_extra_ratio=0.02)
+
+    # Static instructions come first so every prompt shares the same prefix
+    SYSTEM_PROMPT = (
+        "You are an AI writing evaluator. You will be given reference material "
+        "about an article, then a user's summary of that article. Score the "
+        "summary's 'grammar_spelling' and 'coherence' from 0 to 100 and give "
+        "feedback for each. Judge coherence against the reference material."
+    )
+    PRECHECK_PROMPT = (
+        " A spell checker lists the spelling, repetition, capitalization and "
+        "punctuation issues it found in the summary. Issues not marked 'unsure' "
+        "are shown to the user already: count them in the grammar_spelling "
+        "score, but do not repeat them. Issues marked 'unsure' may be names, "
+        "slang or new words: count and mention one only if it really is an "
+        "error. Give grammar_spelling feedback on the other problems, in one or "
+        "two sentences, or say briefly that there are none."
+    )
+    SPELLING_PRECHECK = True
+    ARTICLE_LIMITS = ArticleLimits()
+    # Notes kept across all chunks of an article, so the final prompt does
+    # not grow with the article; every chunk gets at least MIN_CHUNK_NOTES
+    MAX_ARTICLE_NOTES = 32
+    MIN_CHUNK_NOTES = 3
+    NOTES_MAX_TOKENS = 600
+
+    def __init__(self, client_registry: Optional[ClientRegistry] = None):
+        super().__init__(client_registry)
+        self.article_limits = ArticleLimits.from_environment(self.ARTICLE_LIMITS)
+
+    @property
+    def article_store(self) -> ArticleStore:
+        """Container-wide store of articles by content hash."""
+        return self._registry.shared("article_store", ArticleStore.from_environment)
+
+    async def validate_request(self, body: Dict[str, Any]) -> SummaryEvaluationRequest:
         """
         Validates the incoming request body.
 
@@ -45,82 +171,254 @@ class SummaryEvaluationHandler(
         Raises:
             ValidationError: If any of the required fields are missing or empty.
         """
-        if not isinstance(body.get("article"), str):
-            raise ValidationError("'article' must be a string")
         if not isinstance(body.get("summary"), str):
             raise ValidationError("'summary' must be a string")
-
-        article = body.get("article", "").strip()
-        summary = body.get("summary", "").strip()
-
-        if not article:
-            raise ValidationError("'article' cannot be empty")
+        summary = body["summary"].strip()
         if not summary:
             raise ValidationError("'summary' cannot be empty")
+        limit = self.article_limits.max_summary_tokens
+        if estimate_tokens(summary, stop_above=limit) > limit:
+            raise ValidationError(f"'summary' is longer than {limit} tokens")
 
-        return SummaryEvaluationRequest(article=article, summary=summary)
+        article_id = body.get("article_id")
+        if article_id is not None and not isinstance(article_id, str):
+            raise ValidationError("'article_id' must be a string")
+        article = body.get("article")
+        if article is not None and not isinstance(article, str):
+            raise ValidationError("'article' must be a string")
+        article = (article or "").strip()
 
-    def process_request(self, request: SummaryEvaluationRequest) -> Dict[str, Any]:
-        """
-        Processes the summary evaluation request by constructing the prompt, calling the OpenAI API,
-        and parsing the response.
+        if not article_id and not article:
+            if "article" in body:
+                raise ValidationError("'article' cannot be empty")
+            raise ValidationError("'article' or 'article_id' is required")
 
-        Args:
-            request: The validated SummaryEvaluationRequest object.
+        stored = await self.find_article(article_id or article_id_for(article))
+        if stored is None and not article:
+            raise ValidationError("Unknown 'article_id'")
+
+        article, tokens, truncated = self.fit_article(
+            stored.article if stored else article
+        )
+        return SummaryEvaluationRequest(
+            article=article,
+            summary=summary,
+            stored=stored,
+            article_tokens=tokens,
+            truncated=truncated,
+        )
+
+    def fit_article(self, article: str) -> Tuple[str, int, bool]:
+        """
+        Checks an article against the token limit, truncating it if configured.
 
         Returns:
-            A dictionary containing the evaluation results.
+            The article, its estimated token count and whether it was truncated
 
         Raises:
-            Exception: If the response from OpenAI cannot be parsed.
+            ValidationError: If the article is over the limit and not truncated
         """
+        limit = self.article_limits.max_article_tokens
+        tokens = estimate_tokens(article, stop_above=limit)
+        if tokens <= limit:
+            return article, tokens, False
+        if not self.article_limits.truncate:
+            raise ValidationError(f"'article' is longer than {limit} tokens")
+        article = truncate_to_tokens(article, limit)
+        return article, estimate_tokens(article), True
+
+    async def find_article(self, article_id: str) -> Optional[StoredArticle]:
+        """Looks an article up in the store, treating store errors as a miss."""
         try:
-            prompt = (
-                f"Evaluate the following summary of an article based on two categories:\n\n"
-                f"Original Article:\n{request.article}\n\n"
-                f"User's Summary:\n{request.summary}\n\n"
-                "Provide an evaluation with this structure:\n"
-                "Grammar & Spelling: (0-100), Feedback: <your feedback>\n"
-                "Coherence: (0-100), Feedback: <your feedback>"
+            return await asyncio.to_thread(self.article_store.get, article_id)
+        except Exception as e:
+            logger.warning(f"Article store unavailable: {str(e)}")
+            return None
+
+    def flight_key(self, request: SummaryEvaluationRequest) -> Optional[str]:
+        """Identical summaries of the same article share one evaluation."""
+        return make_cache_key(
+            type(self).__name__,
+            self.model_signature,
+            self.PROMPT_VERSION,
+            {
+                "article": article_id_for(request.article),
+                "summary": normalize_text(request.summary),
+            },
+        )
+
+    async def store_digest(
+        self, stored: StoredArticle, source: Optional[str] = None
+    ) -> None:
+        """
+        Computes and stores the digest of a stored article, best effort.
+
+        Args:
+            stored: The article
+            source: Condensed notes to digest instead of the article text
+        """
+        try:
+            stored.digest, _ = await self.single_flight.run_async(
+                f"digest:{stored.article_id}",
+                lambda: self.create_structured(
+                    digest_messages(source or stored.article),
+                    ArticleDigest,
+                    temperature=0,
+                ),
             )
+            await asyncio.to_thread(self.article_store.put, stored)
+        except Exception as e:
+            logger.warning(f"Failed to digest article {stored.article_id}: {str(e)}")
 
-            response = self.openai_client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an AI writing evaluator. Respond strictly following the required format.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.3,
+    async def condense_chunk(self, chunk: str, max_notes: int) -> List[str]:
+        """
+        Condenses one chunk of a long article into notes.
+
+        Notes are cached by chunk content, and identical chunks in flight
+        share one call; a chunk the model fails on is kept as its opening
+        text instead, so one failure does not fail the evaluation.
+        """
+        key = make_cache_key(
+            "ArticleNotes",
+            self.model_signature,
+            self.PROMPT_VERSION,
+            {"chunk": article_id_for(chunk), "max_notes": max_notes},
+        )
+        cached = await asyncio.to_thread(self.result_cache.get, key, self.metrics)
+        if cached is not None:
+            self.metrics.increment("ArticleChunkCacheHits")
+            return cached["notes"]
+        try:
+            notes, _ = await self.single_flight.run_async(
+                key,
+                lambda: self.create_structured(
+                    condense_messages(chunk, max_notes),
+                    ArticleNotes,
+                    temperature=0,
+                    max_tokens=self.NOTES_MAX_TOKENS,
+                ),
+            )
+        except Exception as e:
+            logger.warning(f"Failed to condense article chunk: {str(e)}")
+            self.metrics.increment("ArticleChunkFailures")
+            return [truncate_to_tokens(chunk, self.NOTES_MAX_TOKENS)]
+        await asyncio.to_thread(
+            self.result_cache.put, key, {"notes": notes.notes}, self.metrics
+        )
+        return notes.notes
+
+    async def condense_article(self, article: str) -> str:
+        """
+        Condenses a long article into notes, all chunks in parallel (map),
+        for the evaluation call to grade against (reduce).
+        """
+        limits = self.article_limits
+        chunks = split_into_chunks(article, limits.chunk_tokens, limits.max_chunks)
+        max_notes = max(self.MIN_CHUNK_NOTES, self.MAX_ARTICLE_NOTES // len(chunks))
+        self.metrics.put_metric("ArticleChunks", len(chunks))
+        with self.metrics.span("condense"):
+            parts = await asyncio.gather(
+                *(self.condense_chunk(chunk, max_notes) for chunk in chunks)
             )
+        return "\n".join(f"- {note}" for notes in parts for note in notes)
 
-            evaluation_text = response.choices[0].message.content.strip()
+    @staticmethod
+    def reference_material(
+        article: str,
+        digest: Optional[ArticleDigest] = None,
+        notes: Optional[str] = None,
+    ) -> str:
+        """
+        Renders the reference material for the prompt: the digest when
+        available, else the notes of a long article, else the article.
+        """
+        if digest is None and notes is not None:
+            return f"Article Notes (condensed from the whole article):\n{notes}"
+        if digest is None:
+            return f"Original Article:\n{article}"
+        key_points = "\n".join(f"- {point}" for point in digest.key_points)
+        return (
+            f"Key Points:\n{key_points}\n\n"
+            f"Reference Summary:\n{digest.reference_summary}"
+        )
 
-            # Extract evaluation details using regex
-            grammar_match = re.search(
-                r"Grammar & Spelling: (\d+), Feedback: (.+)", evaluation_text
+    def evaluation_messages(
+        self, request: SummaryEvaluationRequest
+    ) -> List[Dict[str, str]]:
+        """Builds the prompt: instructions, then reference material, then summary."""
+        digest = request.stored.digest if request.stored else None
+        self.metrics.put_metric("ArticleDigestUsed", int(digest is not None))
+        reference = self.reference_material(request.article, digest, request.notes)
+        system = self.SYSTEM_PROMPT
+        if self.SPELLING_PRECHECK:
+            system += self.PRECHECK_PROMPT
+        messages = [
+            {"role": "system", "content": system},
+            {"role": "user", "content": reference},
+            {"role": "user", "content": f"User's Summary:\n{request.summary}"},
+        ]
+        if self.SPELLING_PRECHECK:
+            hints = dumps(issue_hints(request.issues))
+            messages.append(
+                {"role": "user", "content": f"Spell Checker Issues:\n{hints}"}
             )
-            coherence_match = re.search(
-                r"Coherence: (\d+), Feedback: (.+)", evaluation_text
+        return messages
+
+    def precheck(self, request: SummaryEvaluationRequest) -> None:
+        """Runs the local checks on the summary, accepting the article's words."""
+        with self.metrics.span("precheck"):
+            request.issues = check_writing(
+                request.summary, vocabulary(request.article)
             )
+        unsure = sum(not issue.confident for issue in request.issues)
+        self.metrics.put_metric("PrecheckIssues", len(request.issues) - unsure)
+        self.metrics.put_metric("PrecheckUnsureIssues", unsure)
+
+    async def process_request(self, request: SummaryEvaluationRequest) -> Dict[str, Any]:
+        """
+        Processes the summary evaluation request by constructing the prompt, calling the OpenAI API,
+        and parsing the response.
+
+        Args:
+            request: The validated SummaryEvaluationRequest object.
 
-            if not grammar_match or not coherence_match:
-                logger.error(f"Could not parse evaluation results: {evaluation_text}")
-                raise Exception("Could not parse evaluation results.")
-
-            evaluation_result = {
-                "grammar_spelling": {
-                    "score": int(grammar_match.group(1)),
-                    "feedback": grammar_match.group(2).strip(),
-                },
-                "coherence": {
-                    "score": int(coherence_match.group(1)),
-                    "feedback": coherence_match.group(2).strip(),
-                },
-            }
-            return evaluation_result
+        Returns:
+            A dictionary containing the evaluation results.
+
+        Raises:
+            StructuredOutputError: If the model does not return a valid evaluation.
+        """
+        try:
+            self.metrics.put_metric("ArticleTokens", request.article_tokens)
+            self.metrics.put_metric("ArticleTruncated", int(request.truncated))
+            if self.SPELLING_PRECHECK:
+                self.precheck(request)
+            stored = request.stored
+            digest = stored.digest if stored else None
+            if (
+                digest is None
+                and request.article_tokens > self.article_limits.chunk_above_tokens
+            ):
+                request.notes = await self.condense_article(request.article)
+            evaluation = self.create_cascaded(
+                self.evaluation_messages(request),
+                SummaryEvaluationResult,
+                accept=has_feedback,
+                temperature=0.3,
+            )
+            if stored is not None and digest is None and not request.truncated:
+                # Grade against the full article while the digest is computed
+                result, _ = await asyncio.gather(
+                    evaluation, self.store_digest(stored, request.notes)
+                )
+            else:
+                result = await evaluation
+            if request.issues:
+                grammar = result.grammar_spelling
+                grammar.feedback = (
+                    f"{describe_issues(request.issues)} {grammar.feedback}".strip()
+                )
+            return asdict(result)
 
         except Exception as e:
             logger.error(f"Error processing request: {str(e)}")
@@ -131,7 +429,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     AWS Lambda entry point.
 
-    Instantiates the SummaryEvaluationHandler and delegates the event handling.
+    Reuses the container-wide SummaryEvaluationHandler and delegates the event handling.
     """
-    handler = SummaryEvaluationHandler()
+    handler = get_handler(SummaryEvaluationHandler)
     return handler.handle(event, context)
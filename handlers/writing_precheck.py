@@ -0,0 +1,416 @@
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Set, Iterable, Iterator, Tuple
+
+from word_precheck import TOKEN_PATTERN
+
+WORDS_PATH = os.path.join(os.path.dirname(__file__), "data", "english_words.txt")
+
+# Edits allowed between a misspelling and its correction; words shorter than
+# LONG_WORD_LENGTH letters allow one, as two edits turn them into too much
+# ("selfies" -> "series", "tiktok" -> "tito")
+MAX_EDIT_DISTANCE = 2
+LONG_WORD_LENGTH = 8
+# Only the first letters of a word are indexed; longer words are told apart
+# by edit distance at lookup (SymSpell's prefix length)
+PREFIX_LENGTH = 7
+# Shorter unknown words (abbreviations, interjections) are not checked
+MIN_CHECKED_LENGTH = 3
+# Findings beyond this are dropped, so a garbled text cannot blow up the prompt
+MAX_ISSUES = 20
+
+# Regular endings stripped to find the stem of an unlisted word: (ending,
+# inflection it forms, letters it replaced), e.g. "studies" -> "study"
+INFLECTION_ENDINGS = (
+    ("ies", "s", "y"),
+    ("es", "s", ""),
+    ("s", "s", ""),
+    ("ied", "ed", "y"),
+    ("ed", "ed", ""),
+    ("ed", "ed", "e"),
+    ("ing", "ing", ""),
+    ("ing", "ing", "e"),
+)
+VOWELS = frozenset("aeiou")
+
+# Words that are correct twice in a row ("had had", "that that")
+REPEATABLE_WORDS = frozenset({"had", "that"})
+OPENING_MARKS = "\"'“‘(["
+# A sentence ends with . ! ? or … , possibly followed by closing quotes
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?…])[\"'”’)\]]*\s+")
+SENTENCE_END = re.compile(r"[.!?…][\"'”’)\]]*$")
+
+
+@dataclass
+class WritingIssue:
+    """
+    A problem found in a text without the model.
+
+    Attributes:
+        kind (str): "spelling", "repeated_word", "capitalization" or "punctuation".
+        text (str): The text as written.
+        suggestion (str): The corrected text.
+        confident (bool): False for spelling suggestions that may be wrong (a
+            name, slang or a new word close to a listed one), which are left
+            to the model instead of being shown to the user.
+    """
+
+    kind: str
+    text: str
+    suggestion: str
+    confident: bool = True
+
+
+def delete_variants(word: str, distance: int) -> Set[str]:
+    """Returns the word and every string up to ``distance`` deletions from it."""
+    variants, frontier = {word}, {word}
+    for _ in range(distance):
+        frontier = {
+            variant[:i] + variant[i + 1 :]
+            for variant in frontier
+            if len(variant) > 1
+            for i in range(len(variant))
+        } - variants
+        variants |= frontier
+    return variants
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Returns the optimal string alignment distance between two words
+    (insertions, deletions, substitutions and adjacent transpositions), or
+    ``limit + 1`` as soon as it must exceed ``limit``.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(
+                previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost
+            )
+            if (
+                i > 1
+                and j > 1
+                and a[i - 1] == b[j - 2]
+                and a[i - 2] == b[j - 1]
+            ):
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class SpellingIndex:
+    """
+    Symmetric-delete spelling index (SymSpell).
+
+    Each word is stored under the first ``PREFIX_LENGTH`` letters of itself
+    and of every string one deletion away. A misspelling is looked up under
+    its own prefix with up to two deletions, so the candidates come from a
+    few dictionary lookups instead of generating every possible edit; they
+    are then confirmed by edit distance. This finds every word one edit away
+    and most words two edits away, for a quarter of the memory and build
+    time of indexing two deletions.
+    """
+
+    def __init__(self, words: Iterable[str]):
+        # Rank by position: the word list is ordered most frequent first
+        self.ranks: Dict[str, int] = {}
+        self.deletes: Dict[str, List[str]] = {}
+        for word in words:
+            if word in self.ranks:
+                continue
+            self.ranks[word] = len(self.ranks)
+            for variant in delete_variants(word[:PREFIX_LENGTH], 1):
+                self.deletes.setdefault(variant, []).append(word)
+
+    @classmethod
+    def from_file(cls, path: str) -> "SpellingIndex":
+        """Loads a word list of one word per line; ``#`` starts a comment."""
+        with open(path, encoding="utf-8") as f:
+            return cls(
+                line.strip() for line in f if line.strip() and not line.startswith("#")
+            )
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.ranks
+
+    def __len__(self) -> int:
+        return len(self.ranks)
+
+    def candidates(self, word: str) -> Set[str]:
+        """Returns the indexed words that may be within two edits of ``word``."""
+        found: Set[str] = set()
+        for variant in delete_variants(word[:PREFIX_LENGTH], MAX_EDIT_DISTANCE):
+            found.update(self.deletes.get(variant, ()))
+        return found
+
+    def suggest(
+        self, word: str, extra_words: Iterable[str] = ()
+    ) -> Optional[Tuple[str, int]]:
+        """
+        Returns the most likely correction of a word and its edit distance.
+
+        The closest word wins; among equally close words, ``extra_words``
+        (e.g. the vocabulary of the text being summarized) come first, then
+        the most frequent.
+
+        Args:
+            word: A lowercase word not in the index
+            extra_words: Lowercase words to consider besides the index
+
+        Returns:
+            (correction, distance), or None when nothing is close enough
+        """
+        limit = MAX_EDIT_DISTANCE if len(word) >= LONG_WORD_LENGTH else 1
+        extra = set(extra_words)
+        best: Optional[Tuple[int, int, int, str]] = None
+        for candidate in self.candidates(word) | extra:
+            distance = edit_distance(word, candidate, limit)
+            if distance > limit or candidate == word:
+                continue
+            key = (
+                distance,
+                candidate not in extra,
+                self.ranks.get(candidate, len(self.ranks)),
+                candidate,
+            )
+            if best is None or key < best:
+                best = key
+        return (best[3], best[0]) if best else None
+
+
+@lru_cache(maxsize=1)
+def spelling_index() -> SpellingIndex:
+    """
+    The index of the bundled word list.
+
+    Built on first use (a few hundred milliseconds), so importing the handler
+    stays cheap; warm invocations reuse it.
+    """
+    return SpellingIndex.from_file(WORDS_PATH)
+
+
+def vocabulary(text: str) -> Set[str]:
+    """Returns the lowercased words of a text, for ``check_writing``."""
+    return {normalize_word(token) for token in TOKEN_PATTERN.findall(text)}
+
+
+def normalize_word(token: str) -> str:
+    return token.lower().replace("’", "'")
+
+
+def inflection_stems(word: str) -> Iterator[Tuple[str, str]]:
+    """Yields the (stem, inflection) pairs a word may be a regular form of."""
+    for ending, inflection, replaced in INFLECTION_ENDINGS:
+        if not word.endswith(ending) or len(word) - len(ending) < 2:
+            continue
+        base = word[: -len(ending)]
+        yield base + replaced, inflection
+        # A doubled final consonant: "stopped" -> "stop"
+        if not replaced and base[-1] == base[-2] and base[-1] not in VOWELS:
+            yield base[:-1], inflection
+
+
+def inflected_forms(stem: str, inflection: str) -> Set[str]:
+    """Returns every spelling a regular inflection of ``stem`` could take."""
+    if inflection == "s":
+        forms = {stem + "s", stem + "es"}
+    else:
+        forms = {stem + inflection, stem + stem[-1] + inflection}
+        if stem.endswith("e"):
+            forms.add(stem[:-1] + inflection)
+    if stem.endswith("y") and inflection != "ing":
+        forms.add(stem[:-1] + ("ies" if inflection == "s" else "ied"))
+    return forms
+
+
+def is_known(word: str, known: Set[str], index: SpellingIndex) -> bool:
+    """
+    Tells whether a word is listed, or a possessive or regular inflection of a
+    listed word.
+
+    Inflections of listed stems are accepted only when the list has no form
+    of that inflection for any of them, so "heatwaves" is accepted but
+    "familys" (for "families"), "programing" (for "programming") and
+    "runing" (for "running", though "rune" is listed too) are not.
+    """
+
+    def listed(candidate: str) -> bool:
+        return candidate in index or candidate in known
+
+    if listed(word):
+        return True
+    # Possessives: "teacher's", "students'"
+    stem = word[:-2] if word.endswith("'s") else word.rstrip("'")
+    if stem != word and listed(stem):
+        return True
+    stems = [
+        (stem, inflection)
+        for stem, inflection in inflection_stems(word)
+        if listed(stem)
+    ]
+    return bool(stems) and not any(
+        listed(form)
+        for stem, inflection in stems
+        for form in inflected_forms(stem, inflection) - {word}
+    )
+
+
+def is_confident(word: str, correction: str, distance: int) -> bool:
+    """
+    Tells whether a correction is safe to show as is: one edit away and
+    keeping the first letter, which typos rarely change ("vlogs" is not
+    "blogs").
+    """
+    return distance == 1 and correction[0] == word[0]
+
+
+def sentences(line: str) -> List[Tuple[int, str]]:
+    """Splits a line into (offset, sentence) pairs."""
+    found, start = [], 0
+    for boundary in SENTENCE_BOUNDARY.finditer(line):
+        found.append((start, line[start : boundary.start()]))
+        start = boundary.end()
+    if line[start:].strip():
+        found.append((start, line[start:]))
+    return found
+
+
+def check_writing(text: str, known_words: Iterable[str] = ()) -> List[WritingIssue]:
+    """
+    Finds spelling, repetition, capitalization and punctuation problems.
+
+    Misspellings are words in neither the bundled word list nor
+    ``known_words``, nor regular inflections of their words, that are close
+    to a word in one of them; unknown words with nothing close (names, rare
+    words) are left alone, as are capitalized words inside a sentence and
+    words with digits or accents. Corrections that ``is_confident`` doubts
+    are returned with ``confident=False``.
+    A word repeated twice in a row, a sentence or "I" in lowercase, and a
+    line without final punctuation are reported as well.
+
+    Args:
+        text: The text to check
+        known_words: Lowercase words to accept, e.g. ``vocabulary(article)``
+
+    Returns:
+        The issues found, in text order, at most ``MAX_ISSUES``
+    """
+    index = spelling_index()
+    known = set(known_words)
+    issues: List[WritingIssue] = []
+    suggestions: Dict[str, Optional[Tuple[str, int]]] = {}
+
+    for line in text.splitlines():
+        for _, sentence in sentences(line):
+            tokens = list(TOKEN_PATTERN.finditer(sentence))
+            opening = len(sentence) - len(sentence.lstrip().lstrip(OPENING_MARKS))
+            for position, match in enumerate(tokens):
+                token = match.group()
+                word = normalize_word(token)
+                first = match.start() == opening
+
+                # A lowercase sentence start, or "i", "i'm", "i've"...
+                if (first and token[0].islower()) or (
+                    token[0] == "i" and (word == "i" or word.startswith("i'"))
+                ):
+                    capitalized = token[0].upper() + token[1:]
+                    issues.append(WritingIssue("capitalization", token, capitalized))
+
+                previous = tokens[position - 1] if position else None
+                if (
+                    previous is not None
+                    and normalize_word(previous.group()) == word
+                    and word not in REPEATABLE_WORDS
+                    and not sentence[previous.end() : match.start()].strip()
+                ):
+                    issues.append(
+                        WritingIssue(
+                            "repeated_word",
+                            sentence[previous.start() : match.end()],
+                            previous.group(),
+                        )
+                    )
+
+                if (
+                    len(word) < MIN_CHECKED_LENGTH
+                    or not word.replace("'", "").isascii()
+                    or (token[0].isupper() and not first)
+                    or is_known(word, known, index)
+                ):
+                    continue
+                if word not in suggestions:
+                    suggestions[word] = index.suggest(word, known)
+                suggestion = suggestions[word]
+                if suggestion is not None:
+                    correction, distance = suggestion
+                    confident = is_confident(word, correction, distance)
+                    if token[0].isupper():
+                        correction = correction[0].upper() + correction[1:]
+                    issues.append(
+                        WritingIssue("spelling", token, correction, confident)
+                    )
+
+        last = line.rstrip()
+        if TOKEN_PATTERN.search(last) and not SENTENCE_END.search(last):
+            final = TOKEN_PATTERN.findall(last)[-1]
+            issues.append(WritingIssue("punctuation", final, f"{final}."))
+
+    return issues[:MAX_ISSUES]
+
+
+def describe_issues(issues: List[WritingIssue]) -> str:
+    """Renders confident issues as feedback for the user, one sentence per kind."""
+    by_kind: Dict[str, List[WritingIssue]] = {}
+    for issue in issues:
+        if issue.confident:
+            by_kind.setdefault(issue.kind, []).append(issue)
+
+    def corrections(kind: str) -> str:
+        return ", ".join(
+            f"'{issue.text}' → '{issue.suggestion}'" for issue in by_kind[kind]
+        )
+
+    parts = []
+    if "spelling" in by_kind:
+        parts.append(f"Check the spelling: {corrections('spelling')}.")
+    if "repeated_word" in by_kind:
+        repeated = ", ".join(f"'{issue.text}'" for issue in by_kind["repeated_word"])
+        parts.append(f"Remove the repeated word in {repeated}.")
+    if "capitalization" in by_kind:
+        parts.append(
+            "Start every sentence, and the word 'I', with a capital letter: "
+            f"{corrections('capitalization')}."
+        )
+    if "punctuation" in by_kind:
+        parts.append(
+            "End every sentence with a full stop, question mark or exclamation "
+            f"mark (after {', '.join(repr(i.text) for i in by_kind['punctuation'])})."
+        )
+    return " ".join(parts)
+
+
+def issue_hints(issues: List[WritingIssue]) -> List[Dict[str, Any]]:
+    """
+    Returns issues as compact records for the model prompt; doubtful ones are
+    marked ``"unsure": true``.
+    """
+    hints = []
+    for issue in issues:
+        hint: Dict[str, Any] = {
+            "type": issue.kind,
+            "text": issue.text,
+            "fix": issue.suggestion,
+        }
+        if not issue.confident:
+            hint["unsure"] = True
+        hints.append(hint)
+    return hints
@@ -0,0 +1,351 @@
+"""
+Post-install optimization of the dependency layer.
+
+Runs on a freshly installed layer, before it replaces the deployed one:
+
+1. drops distributions the Lambda runtime already provides (boto3 and its
+   dependencies), whole, using their RECORD files;
+2. strips files never used at run time: test suites, documentation and
+   example folders that are not importable packages, type stubs, C sources
+   and console scripts, plus bytecode compiled for the build machine;
+3. compiles bytecode with the target Python version, so cold starts load
+   ``.pyc`` files instead of compiling every module. The layer is read-only
+   at run time, so Python cannot cache bytecode there itself, and
+   timestamp-checked ``.pyc`` files would be recompiled whenever the
+   packaging changed file times; they are compiled unchecked-hash instead;
+4. reports the size of every distribution before and after, and how long
+   each takes to import from the slimmed layer;
+5. checks that every handler module still imports.
+
+The import report and checks run the target interpreter (``python3.12``, or
+``TARGET_PYTHON``); without it they, and the bytecode step, are skipped with
+a warning.
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+from collections import defaultdict
+
+# Distributions the Lambda Python runtime ships (in /var/runtime)
+RUNTIME_PROVIDED = [
+    "boto3",
+    "botocore",
+    "s3transfer",
+    "jmespath",
+    "python-dateutil",
+    "six",
+    "urllib3",
+]
+# Folders removed wherever they appear inside a distribution
+STRIP_ALWAYS = {"tests", "test", "__pycache__"}
+# Folders removed unless they are importable packages (botocore.docs is code)
+STRIP_UNLESS_PACKAGE = {"docs", "doc", "examples"}
+STRIP_SUFFIXES = (".pyi", ".pyx", ".pxd", ".c", ".h", ".cpp")
+HANDLER_PATTERN = re.compile(r"^\s*Handler:\s*([\w.]+)\.(\w+)\s*$", re.MULTILINE)
+
+VERSION_PROBE = "import sys; print('python%d.%d' % sys.version_info[:2])"
+# Imports a module in a fresh interpreter without the build machine's
+# site-packages and prints the time it took in milliseconds
+IMPORT_PROBE = """
+import importlib, json, sys, time
+sys.path[:0] = {paths!r}
+started = time.perf_counter()
+for name in {modules!r}:
+    module = importlib.import_module(name)
+attribute = {attribute!r}
+if attribute and not callable(getattr(module, attribute, None)):
+    raise SystemExit(f"{{name}} has no callable {{attribute}}")
+print(json.dumps((time.perf_counter() - started) * 1000))
+"""
+
+
+def normalize_name(name):
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def distributions(site_packages):
+    """Maps each installed distribution's normalized name to its dist-info."""
+    found = {}
+    for entry in os.listdir(site_packages):
+        if entry.endswith(".dist-info"):
+            name = entry[: -len(".dist-info")].rsplit("-", 1)[0]
+            found[normalize_name(name)] = os.path.join(site_packages, entry)
+    return found
+
+
+def record_paths(site_packages, dist_info):
+    """Returns the files a distribution installed, from its RECORD."""
+    paths = []
+    with open(os.path.join(dist_info, "RECORD"), encoding="utf-8") as f:
+        for line in f:
+            path = line.rsplit(",", 2)[0]
+            if path:
+                paths.append(os.path.normpath(os.path.join(site_packages, path)))
+    return paths
+
+
+def top_level_modules(site_packages, dist_info):
+    """Returns the importable top-level names of a distribution."""
+    top_level = os.path.join(dist_info, "top_level.txt")
+    if os.path.exists(top_level):
+        with open(top_level, encoding="utf-8") as f:
+            names = [line.strip() for line in f if line.strip()]
+    else:
+        names = []
+        for path in record_paths(site_packages, dist_info):
+            first = os.path.relpath(path, site_packages).split(os.sep)[0]
+            if first.endswith(".dist-info") or first in ("..", "bin", "__pycache__"):
+                continue
+            name = first.split(".")[0]
+            if name not in names:
+                names.append(name)
+    public = [name for name in names if not name.startswith("_")]
+    return public or names
+
+
+def owners(site_packages):
+    """Maps every file of the layer to the distribution that installed it."""
+    owner = {}
+    for name, dist_info in distributions(site_packages).items():
+        for path in record_paths(site_packages, dist_info):
+            owner[path] = name
+        for directory, _, files in os.walk(dist_info):
+            for file in files:
+                owner[os.path.join(directory, file)] = name
+    return owner
+
+
+def distribution_sizes(site_packages):
+    """Returns the bytes on disk of each distribution (and of unowned files)."""
+    owner = owners(site_packages)
+    sizes = defaultdict(int)
+    for directory, _, files in os.walk(site_packages):
+        for file in files:
+            path = os.path.join(directory, file)
+            # Bytecode belongs to the distribution owning its source
+            source = path
+            if os.path.basename(directory) == "__pycache__":
+                module = file.split(".")[0]
+                source = os.path.join(os.path.dirname(directory), f"{module}.py")
+            sizes[owner.get(source, "(other)")] += os.path.getsize(path)
+    return dict(sizes)
+
+
+def remove_distributions(site_packages, names):
+    """Deletes whole distributions by name; returns the names removed."""
+    installed = distributions(site_packages)
+    removed = []
+    for name in sorted({normalize_name(name) for name in names}):
+        dist_info = installed.get(name)
+        if dist_info is None:
+            continue
+        for path in record_paths(site_packages, dist_info):
+            if os.path.isfile(path):
+                os.remove(path)
+        shutil.rmtree(dist_info, ignore_errors=True)
+        removed.append(name)
+    prune_empty_directories(site_packages)
+    return removed
+
+
+def prune_empty_directories(root):
+    for directory, _, _ in sorted(os.walk(root), key=lambda w: -len(w[0])):
+        if directory != root and not os.listdir(directory):
+            os.rmdir(directory)
+
+
+def strip_files(site_packages):
+    """Removes files never used at run time; returns the bytes freed."""
+    freed = 0
+
+    def remove_tree(path):
+        nonlocal freed
+        for directory, _, files in os.walk(path):
+            freed += sum(os.path.getsize(os.path.join(directory, f)) for f in files)
+        shutil.rmtree(path)
+
+    scripts = os.path.join(site_packages, "bin")
+    if os.path.isdir(scripts):
+        remove_tree(scripts)
+    for directory, subdirectories, files in os.walk(site_packages):
+        for name in list(subdirectories):
+            path = os.path.join(directory, name)
+            is_package = os.path.exists(os.path.join(path, "__init__.py"))
+            if name in STRIP_ALWAYS or (
+                name in STRIP_UNLESS_PACKAGE and not is_package
+            ):
+                remove_tree(path)
+                subdirectories.remove(name)
+        for name in files:
+            if name.endswith(STRIP_SUFFIXES):
+                path = os.path.join(directory, name)
+                freed += os.path.getsize(path)
+                os.remove(path)
+    return freed
+
+
+def find_interpreter(python_version):
+    """
+    Returns the target Python (``TARGET_PYTHON`` or e.g. ``python3.12``), or
+    None if neither runs as that version.
+    """
+    for candidate in (os.environ.get("TARGET_PYTHON"), shutil.which(python_version)):
+        if not candidate:
+            continue
+        try:
+            version = subprocess.run(
+                [candidate, "-c", VERSION_PROBE],
+                capture_output=True,
+                text=True,
+                timeout=30,
+            ).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            continue
+        if version == python_version:
+            return candidate
+    return None
+
+
+def compile_bytecode(interpreter, site_packages):
+    """Compiles every module of the layer with the target interpreter."""
+    subprocess.check_call(
+        [
+            interpreter,
+            "-m",
+            "compileall",
+            "-q",
+            "-j",
+            "0",
+            "--invalidation-mode",
+            "unchecked-hash",
+            site_packages,
+        ]
+    )
+
+
+def probe_import(interpreter, paths, modules, attribute=None):
+    """
+    Imports modules in a fresh target interpreter that sees only ``paths``
+    and the standard library.
+
+    Returns:
+        (milliseconds, None) on success, or (None, the error output)
+    """
+    code = IMPORT_PROBE.format(paths=paths, modules=modules, attribute=attribute)
+    result = subprocess.run(
+        [interpreter, "-S", "-c", code], capture_output=True, text=True
+    )
+    if result.returncode:
+        return None, (result.stderr or result.stdout).strip().splitlines()[-1]
+    return round(json.loads(result.stdout), 1), None
+
+
+def import_times(interpreter, site_packages):
+    """Returns how long each distribution takes to import from the layer."""
+    times = {}
+    for name, dist_info in sorted(distributions(site_packages).items()):
+        modules = top_level_modules(site_packages, dist_info)
+        elapsed, error = probe_import(interpreter, [site_packages], modules)
+        times[name] = elapsed if error is None else f"error: {error}"
+    return times
+
+
+def handler_modules(template_path):
+    """Returns the (module, function) of every handler in a SAM template."""
+    with open(template_path, encoding="utf-8") as f:
+        return sorted(set(HANDLER_PATTERN.findall(f.read())))
+
+
+def check_handlers(interpreter, site_packages, handlers_dir, template_path):
+    """
+    Imports every handler module against the layer alone.
+
+    Packages the runtime provides are not on the path, so this also catches
+    a handler importing boto3 at module load (which it must not, for cold
+    start time).
+
+    Returns:
+        (import times by module, failures by module)
+    """
+    times, failures = {}, {}
+    for module, function in handler_modules(template_path):
+        elapsed, error = probe_import(
+            interpreter, [handlers_dir, site_packages], [module], function
+        )
+        if error is None:
+            times[module] = elapsed
+        else:
+            failures[module] = error
+    return times, failures
+
+
+def print_report(before, after, times):
+    print(f"{'distribution':<24}{'before KB':>11}{'after KB':>10}{'import ms':>11}")
+    for name in sorted(set(before) | set(after), key=lambda n: -before.get(n, 0)):
+        was, now = before.get(name, 0) / 1024, after.get(name, 0) / 1024
+        took = times.get(name, "")
+        took = f"{took:.1f}" if isinstance(took, float) else (took or "-")
+        print(f"{name:<24}{was:>11.0f}{now:>10.0f}{took:>11}")
+    total_before, total_after = sum(before.values()), sum(after.values())
+    print(
+        f"{'total':<24}{total_before / 1024:>11.0f}{total_after / 1024:>10.0f}"
+        f"   ({1 - total_after / max(total_before, 1):.0%} smaller)"
+    )
+
+
+def optimize_layer(
+    site_packages,
+    python_version,
+    handlers_dir="handlers",
+    template_path="template.yaml",
+    runtime_provided=RUNTIME_PROVIDED,
+):
+    """
+    Slims and precompiles an installed layer, then checks the handlers.
+
+    Returns:
+        A summary of the optimization, for the layer stamp
+
+    Raises:
+        RuntimeError: If a handler no longer imports from the layer
+    """
+    before = distribution_sizes(site_packages)
+    removed = remove_distributions(site_packages, runtime_provided)
+    if removed:
+        print(f"Dropped runtime-provided distributions: {', '.join(removed)}")
+    freed = strip_files(site_packages)
+    print(f"Stripped {freed / 1024:.0f} KB of tests, docs, stubs and scripts.")
+
+    interpreter = find_interpreter(python_version)
+    times, handler_times = {}, {}
+    if interpreter is None:
+        print(
+            f"WARNING: {python_version} not found (set TARGET_PYTHON); skipping "
+            "bytecode compilation and import checks."
+        )
+    else:
+        print(f"Compiling bytecode with {interpreter}...")
+        compile_bytecode(interpreter, site_packages)
+        times = import_times(interpreter, site_packages)
+        handler_times, failures = check_handlers(
+            interpreter, site_packages, handlers_dir, template_path
+        )
+        if failures:
+            details = "; ".join(f"{m}: {e}" for m, e in sorted(failures.items()))
+            raise RuntimeError(f"Handlers fail to import from the layer: {details}")
+
+    after = distribution_sizes(site_packages)
+    print_report(before, after, times)
+    if handler_times:
+        imports = ", ".join(f"{m} {t} ms" for m, t in handler_times.items())
+        print(f"Handler imports: {imports}")
+    return {
+        "removed": removed,
+        "size_before": sum(before.values()),
+        "size_after": sum(after.values()),
+        "precompiled": interpreter is not None,
+        "handler_import_ms": handler_times,
+    }